@@ -16,7 +16,8 @@ Self-hosted, privacy-first, 100% open source.
 
 __version__ = "0.2.2a1"
 
-from .parser import parse_postgres_log
+from .parser import parse_postgres_log, parse_postgres_logs
+from .follow import LogCheckpoint, follow_postgres_log, read_new_entries
 from .analyzer import run_slow_query_analysis, normalize_query
 from .llm_client import LLMClient, LLMConfig
 from .report_generator import ReportGenerator
@@ -29,6 +30,10 @@ from .antipatterns import (
 
 __all__ = [
     "parse_postgres_log",
+    "parse_postgres_logs",
+    "LogCheckpoint",
+    "follow_postgres_log",
+    "read_new_entries",
     "run_slow_query_analysis",
     "normalize_query",
     "LLMClient",
@@ -0,0 +1,173 @@
+"""
+Streaming aggregation of slow query entries into query groups.
+
+A ``GroupAccumulator`` holds everything the analysis reports about one
+normalized query: entry count, total, min and max duration, first and last
+seen timestamps, one example query, a ``DurationSketch`` of the durations
+and the summary of its auto_explain plans. Entries are added one at a time
+and nothing per entry is kept, so memory grows with the number of distinct
+queries rather than with the number of log entries.
+
+``merge`` is associative: ``--follow`` accumulates each batch of new
+entries separately and combines it with the groups of the earlier batches
+(``analyzer.IncrementalAnalysis``), giving the same groups as accumulating
+every entry in one pass (the example query and timestamps of the left
+operand win ties, as the earlier entries do).
+"""
+
+import math
+from typing import Dict, Iterable, Optional, Tuple
+
+from .explain import PlanStats, PlanSummary
+from .quantile_sketch import DurationSketch
+
+
+class TimingStats:
+    """Durations of the entries of one kind (statement or plan) in a group."""
+
+    __slots__ = (
+        "entries",
+        "total",
+        "minimum",
+        "maximum",
+        "first_seen",
+        "last_seen",
+        "example",
+        "moments",
+        "sketch",
+    )
+
+    def __init__(self) -> None:
+        self.entries = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.first_seen: Optional[str] = None
+        self.last_seen: Optional[str] = None
+        self.example: Optional[str] = None
+        # (rows, sum, sum of squares) of the durations per sample weight,
+        # for estimates from sampled logs (sampling.estimate_from_moments)
+        self.moments: Dict[float, Tuple[float, float, float]] = {}
+        self.sketch = DurationSketch()
+
+    def add(self, raw: str, duration: float, timestamp: str, weight: float) -> None:
+        """Count one entry."""
+        self.entries += 1
+        self.total += duration
+        if duration < self.minimum:
+            self.minimum = duration
+        if duration > self.maximum:
+            self.maximum = duration
+        if self.first_seen is None or timestamp < self.first_seen:
+            self.first_seen = timestamp
+        if self.last_seen is None or timestamp > self.last_seen:
+            self.last_seen = timestamp
+        if self.example is None:
+            self.example = raw
+        rows, total, squares = self.moments.get(weight, (0.0, 0.0, 0.0))
+        self.moments[weight] = (
+            rows + 1.0,
+            total + duration,
+            squares + duration * duration,
+        )
+        self.sketch.add(duration, weight)
+
+    def merge(self, other: "TimingStats") -> None:
+        """Fold the entries counted by ``other`` into this one."""
+        if not other.entries:
+            return
+        self.entries += other.entries
+        self.total += other.total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        if other.first_seen is not None and (
+            self.first_seen is None or other.first_seen < self.first_seen
+        ):
+            self.first_seen = other.first_seen
+        if other.last_seen is not None and (
+            self.last_seen is None or other.last_seen > self.last_seen
+        ):
+            self.last_seen = other.last_seen
+        if self.example is None:
+            self.example = other.example
+        for weight, (rows, total, squares) in other.moments.items():
+            own = self.moments.get(weight, (0.0, 0.0, 0.0))
+            self.moments[weight] = (own[0] + rows, own[1] + total, own[2] + squares)
+        self.sketch.merge(other.sketch)
+
+    @property
+    def frequency_moments(self) -> Dict[float, Tuple[float, float, float]]:
+        """``moments`` of a value of 1 per entry, to estimate the frequency."""
+        return {
+            weight: (rows, rows, rows) for weight, (rows, _, _) in self.moments.items()
+        }
+
+
+class GroupAccumulator:
+    """Incremental statistics of one query group."""
+
+    __slots__ = ("query_hash", "normalized", "statements", "plan_entries", "plans")
+
+    def __init__(self, query_hash: str, normalized: str) -> None:
+        self.query_hash = query_hash
+        self.normalized = normalized
+        self.statements = TimingStats()
+        # With both log_min_duration_statement and auto_explain enabled each
+        # execution is logged twice; plan entries only time groups that have
+        # no statement entries
+        self.plan_entries = TimingStats()
+        self.plans: Optional[PlanSummary] = None
+
+    def add(
+        self,
+        raw: str,
+        duration: float,
+        timestamp: str,
+        weight: float = 1.0,
+        plan: Optional[PlanStats] = None,
+    ) -> None:
+        """Count one log entry of the group."""
+        if plan is None:
+            self.statements.add(raw, duration, timestamp, weight)
+            return
+        self.plan_entries.add(raw, duration, timestamp, weight)
+        if self.plans is None:
+            self.plans = PlanSummary()
+        self.plans.add(plan)
+
+    def merge(self, other: "GroupAccumulator") -> None:
+        """Fold a partial result of the same group into this one."""
+        if other.query_hash != self.query_hash:
+            raise ValueError("Cannot merge accumulators of different query groups")
+        self.statements.merge(other.statements)
+        self.plan_entries.merge(other.plan_entries)
+        if other.plans is not None:
+            if self.plans is None:
+                self.plans = PlanSummary()
+            self.plans.merge(other.plans)
+
+    @property
+    def timing(self) -> TimingStats:
+        """The entries the group is timed by."""
+        return self.statements if self.statements.entries else self.plan_entries
+
+
+def merge_groups(
+    groups: Dict[str, GroupAccumulator], others: Iterable[GroupAccumulator]
+) -> Dict[str, GroupAccumulator]:
+    """
+    Merge partial groups into ``groups``, keyed by query hash
+
+    ``others`` are taken over as they are when their group is new, so they
+    should not be updated afterwards.
+
+    Returns:
+        ``groups``, updated in place
+    """
+    for other in others:
+        group = groups.get(other.query_hash)
+        if group is None:
+            groups[other.query_hash] = other
+        else:
+            group.merge(other)
+    return groups
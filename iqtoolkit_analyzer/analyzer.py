@@ -1,13 +1,16 @@
-import hashlib  # This import is used for generating query hashes
+import heapq  # This import is used for selecting the top query groups
 import logging  # This import is used for logging warnings and info
-import math  # This import is used for mathematical computations
 import re  # this import is used for regular expressions
-from collections import defaultdict  # This import is used for grouping queries
 from dataclasses import dataclass, field  # This import is used for data classes
+from functools import partial  # This import is used for binding normalize modes
 from typing import (
     Any,
     Dict,
+    Iterable,
     List,
+    NamedTuple,
+    NotRequired,
+    Optional,
     Sequence,
     Tuple,
     TypedDict,
@@ -15,26 +18,88 @@ from typing import (
     cast,
 )  # This import is used for type hinting
 
+import numpy as np  # This import is used for columnar group statistics
 import pandas as pd  # This import is used for data manipulation and analysis
 
 from .antipatterns import (
     StaticQueryRewriter,
     AntiPatternMatch,
+    format_rewrite_report,
 )  # This import is used for query rewriting and anti-pattern detection
+from .aggregation import (
+    GroupAccumulator,
+    merge_groups,
+)  # This import is used for streaming, mergeable group statistics
+from .explain import (
+    PlanStats,
+    PlanSummary,
+    summarize_plans,
+)  # This import is used for auto_explain plan statistics
+from .parse_errors import (
+    CATEGORIES,
+    PARSE_ERRORS_ATTR,
+)  # This import is used for reporting malformed log entries
+from .sql_normalizer import (
+    fingerprint_query,
+)  # This import is used for single-pass query normalization
+from .normalize_cache import (
+    NormalizeCache,
+)  # This import is used for memoizing normalization of repeated statements
+from .quantile_sketch import (
+    DurationSketch,
+    grouped_quantiles,
+)  # This import is used for per-group and large-input latency percentiles
+from .sampling import (
+    SAMPLE_WEIGHT_COLUMN,
+    estimate_from_moments,
+    estimate_total,
+    stratum_sizes,
+    weighted_percentile,
+)  # This import is used for estimates from sampled logs
 
 logger = logging.getLogger(__name__)
 
+# Parser columns run_slow_query_analysis reads; others need not be loaded
+ANALYSIS_COLUMNS = ("timestamp", "duration_ms", "query", "plan", SAMPLE_WEIGHT_COLUMN)
 
-def normalize_query(query: str) -> str:
+
+# "columnar" groups a parsed frame with one groupby; "records" converts it to
+# per-entry dicts first, like list input
+ANALYSIS_ENGINES = ("columnar", "records")
+
+# Latency percentiles reported per query group (SlowQuery field and report
+# column -> quantile), read from the group's DurationSketch
+GROUP_PERCENTILES = {
+    "p50_duration": 0.50,
+    "p90_duration": 0.90,
+    "p95_duration": 0.95,
+    "p99_duration": 0.99,
+}
+
+# From this many entries on, summary percentiles come from a DurationSketch
+# (1% relative accuracy) instead of sorting every duration
+SKETCH_PERCENTILE_THRESHOLD = 1_000_000
+
+# "fingerprint" lexes queries in one pass (see sql_normalizer.py); "legacy"
+# keeps the original regex substitutions and their groupings
+NORMALIZE_MODES = ("fingerprint", "legacy")
+
+
+def normalize_query(query: str, mode: str = "fingerprint") -> str:
     """
     Normalizes SQL query by removing literals for better grouping
 
     Args:
         query: Raw SQL query string
+        mode: One of NORMALIZE_MODES
 
     Returns:
         Normalized query string
     """
+    if mode == "fingerprint":
+        return fingerprint_query(query)
+    if mode != "legacy":
+        raise ValueError(f"Unsupported normalize mode: {mode}")
     try:
         # Replace string literals
         query = re.sub(r"'[^']*'", "'?'", query)
@@ -50,7 +115,30 @@ def normalize_query(query: str) -> str:
         return query.lower()
 
 
-@dataclass
+# One cache per normalize mode, shared by every analysis in the process
+_NORMALIZE_CACHES: Dict[str, NormalizeCache] = {}
+
+
+def shared_normalize_cache(mode: str = "fingerprint") -> NormalizeCache:
+    """
+    The process-wide normalization cache of a normalize mode
+
+    Args:
+        mode: One of NORMALIZE_MODES
+
+    Returns:
+        NormalizeCache reused by every SlowQueryAnalyzer of that mode
+    """
+    if mode not in NORMALIZE_MODES:
+        raise ValueError(f"Unsupported normalize mode: {mode}")
+    cache = _NORMALIZE_CACHES.get(mode)
+    if cache is None:
+        cache = NormalizeCache(partial(normalize_query, mode=mode), mode)
+        _NORMALIZE_CACHES[mode] = cache
+    return cache
+
+
+@dataclass(slots=True)
 class SlowQuery:
     """Represents a slow query with analysis metadata."""
 
@@ -61,9 +149,16 @@ class SlowQuery:
     max_duration: float = 0.0
     min_duration: float = 0.0
     total_duration: float = 0.0
+    # Latency percentiles of the group, see GROUP_PERCENTILES
+    p50_duration: float = 0.0
+    p90_duration: float = 0.0
+    p95_duration: float = 0.0
+    p99_duration: float = 0.0
     first_seen: str = ""
     last_seen: str = ""
     frequency: int = 1
+    # The group's total duration (estimated in sampled logs), which groups
+    # are ranked by
     impact_score: float = 0.0
     query_hash: str = ""
 
@@ -72,7 +167,19 @@ class SlowQuery:
         default_factory=lambda: cast(List[AntiPatternMatch], [])
     )
     optimization_score: float = 1.0
-    static_analysis_report: str = ""
+
+    # auto_explain plans logged for this query, if any
+    plan_summary: Optional[PlanSummary] = None
+
+    # 95% intervals of the estimated frequency and total duration when the
+    # log was sampled; frequency and durations are then estimates too
+    frequency_ci: Optional[Tuple[float, float]] = None
+    total_duration_ci: Optional[Tuple[float, float]] = None
+
+    @property
+    def static_analysis_report(self) -> str:
+        """Markdown report of antipattern_matches, rendered when read."""
+        return format_rewrite_report(self.antipattern_matches)
 
 
 class QueryRecord(TypedDict):
@@ -81,26 +188,41 @@ class QueryRecord(TypedDict):
     statement: str
     duration: float
     timestamp: str
+    plan: NotRequired[Optional[PlanStats]]
+    # Log entries this record stands for in a sampled log
+    weight: NotRequired[float]
 
 
-class NormalizedQueryRecord(TypedDict):
-    """Represents a normalized query record."""
+class FrameAnalysis(NamedTuple):
+    """Query groups of a parsed frame and the entries its summary describes."""
 
-    raw: str
-    normalized: str
-    duration: float
-    timestamp: str
-    hash: str
+    # SlowQuery objects of the top groups, sorted by impact score
+    queries: List[SlowQuery]
+    # Durations of the entries the overall summary describes
+    durations: np.ndarray
+    # Their sample weights, or None when the log was not sampled
+    weights: Optional[np.ndarray]
+    # Number of query groups, including those not in queries
+    unique_queries: int
 
 
 class SlowQueryAnalyzer:
     """Analyzes slow queries and calculates impact scores."""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        normalize_mode: str = "fingerprint",
+        normalize_cache: Optional[NormalizeCache] = None,
+    ) -> None:
+        self.normalize_cache = normalize_cache or shared_normalize_cache(normalize_mode)
+        self.normalize_mode = normalize_mode
         self.query_rewriter = StaticQueryRewriter()  # Initialize the query rewriter
 
     def analyze_slow_queries(
-        self, queries: Sequence[QueryRecord], min_duration: float = 1000
+        self,
+        queries: Sequence[QueryRecord],
+        min_duration: float = 1000,
+        top_n: int = 0,
     ) -> List[SlowQuery]:
         """
         Analyze slow queries and calculate impact scores with anti-pattern detection.
@@ -108,6 +230,7 @@ class SlowQueryAnalyzer:
         Args:
             queries: List of query dicts from log parser
             min_duration: Minimum duration in ms to consider slow
+            top_n: Only analyze the top_n groups by impact score (0 for all)
 
         Returns:
             List of analyzed SlowQuery objects sorted by impact score
@@ -123,60 +246,141 @@ class SlowQueryAnalyzer:
         if not slow_queries:
             return []
 
-        query_groups: defaultdict[str, List[NormalizedQueryRecord]] = defaultdict(list)
+        # Sampled rows per weight, for the confidence intervals of estimates
+        sampled = any("weight" in query for query in queries)
+        strata = (
+            stratum_sizes([query.get("weight", 1.0) for query in queries])
+            if sampled
+            else None
+        )
+        groups = self.accumulate(slow_queries)
+        return self.summarize_groups(groups.values(), strata, top_n)
+
+    def accumulate(
+        self,
+        queries: Iterable[QueryRecord],
+        groups: Optional[Dict[str, GroupAccumulator]] = None,
+    ) -> Dict[str, GroupAccumulator]:
+        """
+        Fold query records into per-group accumulators, one at a time
 
-        for query in slow_queries:
-            normalized = normalize_query(query["statement"])
-            query_hash = hashlib.md5(normalized.encode()).hexdigest()
+        Args:
+            queries: Query dicts from the log parser, already filtered
+            groups: Accumulators of earlier records to update, if any
 
-            record: NormalizedQueryRecord = {
-                "raw": query["statement"],
-                "normalized": normalized,
-                "duration": float(query["duration"]),
-                "timestamp": str(query["timestamp"]),
-                "hash": query_hash,
-            }
-            query_groups[query_hash].append(record)
+        Returns:
+            Accumulators keyed by query hash, in order of first appearance;
+            partial results combine with aggregation.merge_groups
+        """
+        return self.accumulate_entries(
+            (
+                (
+                    query["statement"],
+                    float(query["duration"]),
+                    str(query["timestamp"]),
+                    float(query.get("weight", 1.0)),
+                    query.get("plan"),
+                )
+                for query in queries
+            ),
+            groups,
+        )
 
-        analyzed_queries: List[SlowQuery] = []
+    def accumulate_entries(
+        self,
+        entries: Iterable[Tuple[str, float, str, float, Optional[PlanStats]]],
+        groups: Optional[Dict[str, GroupAccumulator]] = None,
+    ) -> Dict[str, GroupAccumulator]:
+        """
+        accumulate() for entries given as typed tuples instead of dicts
 
-        for query_hash, group in query_groups.items():
-            durations: List[float] = [q["duration"] for q in group]
-            frequency = len(group)
-            avg_duration = sum(durations) / frequency
-            total_duration = sum(durations)
-            max_duration = max(durations)
-            min_duration = min(durations)
-            timestamps = [q["timestamp"] for q in group]
-            first_seen = min(timestamps)
-            last_seen = max(timestamps)
-
-            impact_score = avg_duration * frequency
-
-            representative_query = group[0]["normalized"]
-            antipattern_matches, static_report = self.query_rewriter.analyze_query(
-                representative_query
-            )
-            optimization_score = self.query_rewriter.get_optimization_score(
-                antipattern_matches
+        Args:
+            entries: (statement, duration in ms, timestamp, sample weight,
+                auto_explain plan or None) of each entry, e.g. a zip of
+                parsed columns
+            groups: Accumulators of earlier entries to update, if any
+
+        Returns:
+            Accumulators keyed by query hash, as for accumulate()
+        """
+        if groups is None:
+            groups = {}
+        lookup = self.normalize_cache.lookup
+        for statement, duration, timestamp, weight, plan in entries:
+            normalized, query_hash = lookup(statement)
+            group = groups.get(query_hash)
+            if group is None:
+                group = groups[query_hash] = GroupAccumulator(query_hash, normalized)
+            group.add(statement, duration, timestamp, weight, plan)
+        return groups
+
+    def summarize_groups(
+        self,
+        groups: Iterable[GroupAccumulator],
+        strata: Optional[Dict[float, int]] = None,
+        top_n: int = 0,
+    ) -> List[SlowQuery]:
+        """
+        SlowQuery objects of accumulated groups
+
+        Groups are ranked by impact score before any per-group work, so
+        the static analysis only runs on the ``top_n`` that are reported.
+
+        Args:
+            groups: Group accumulators
+            strata: Sampled rows per weight when the log was sampled; the
+                frequencies and durations are then estimates
+            top_n: Only summarize the top_n groups by impact score (0 for all)
+
+        Returns:
+            List of analyzed SlowQuery objects sorted by impact score
+        """
+        if top_n > 0:
+            groups = heapq.nlargest(
+                top_n, groups, key=partial(_impact_score, sampled=strata is not None)
             )
+        analyzed_queries: List[SlowQuery] = []
 
-            slow_query = SlowQuery(
-                raw_query=group[0]["raw"],
-                normalized_query=representative_query,
+        for group in groups:
+            timing = group.timing
+            first_seen = timing.first_seen or ""
+            frequency = timing.entries
+            total_duration = timing.total
+            avg_duration = total_duration / frequency
+            frequency_ci: Optional[Tuple[float, float]] = None
+            total_duration_ci: Optional[Tuple[float, float]] = None
+            if strata is not None:
+                count, low, high = estimate_from_moments(
+                    timing.frequency_moments, strata
+                )
+                frequency_ci = (low, high)
+                total_duration, low, high = estimate_from_moments(
+                    timing.moments, strata
+                )
+                total_duration_ci = (low, high)
+                frequency = max(1, round(count))
+                avg_duration = total_duration / count
+
+            slow_query = self._slow_query(
+                raw_query=timing.example or "",
+                normalized_query=group.normalized,
                 duration=avg_duration,
                 timestamp=first_seen,
                 frequency=frequency,
-                impact_score=impact_score,
-                query_hash=query_hash,
-                antipattern_matches=antipattern_matches or [],
-                optimization_score=optimization_score,
-                static_analysis_report=static_report,
-                max_duration=max_duration,
-                min_duration=min_duration,
+                impact_score=total_duration,
+                query_hash=group.query_hash,
+                max_duration=timing.maximum,
+                min_duration=timing.minimum,
                 total_duration=total_duration,
                 first_seen=first_seen,
-                last_seen=last_seen,
+                last_seen=timing.last_seen or "",
+                plan_summary=group.plans,
+                frequency_ci=frequency_ci,
+                total_duration_ci=total_duration_ci,
+                **{
+                    name: timing.sketch.quantile(q) or 0.0
+                    for name, q in GROUP_PERCENTILES.items()
+                },
             )
 
             analyzed_queries.append(slow_query)
@@ -185,34 +389,248 @@ class SlowQueryAnalyzer:
             analyzed_queries, key=lambda query: query.impact_score, reverse=True
         )
 
+    def analyze_frame(
+        self, df: pd.DataFrame, min_duration: float = 0.0, top_n: int = 0
+    ) -> FrameAnalysis:
+        """
+        Columnar counterpart of analyze_slow_queries for parsed log frames
+
+        Each distinct statement is normalized once, and the statistics of
+        every group come from one groupby over numpy columns instead of
+        per-entry records. Groups are then ranked by impact score, and plan
+        summaries, intervals, percentiles and static analysis are only
+        computed for the top_n groups.
+
+        Args:
+            df: Parsed log with timestamp, duration_ms and query columns, and
+                optionally plan and sample_weight
+            min_duration: Minimum duration in ms to consider slow
+            top_n: Only analyze the top_n groups by impact score (0 for all)
+
+        Returns:
+            FrameAnalysis of the top groups
+        """
+        durations = pd.to_numeric(df["duration_ms"], errors="coerce").to_numpy(
+            dtype=np.float64
+        )
+        # NaN durations compare False, so unparsable ones are dropped too
+        keep = (
+            (durations >= min_duration)
+            & df["timestamp"].notna().to_numpy()
+            & df["query"].notna().to_numpy()
+        )
+        if not keep.any():
+            return FrameAnalysis([], np.empty(0), None, 0)
+        frame = df[keep]
+        durations = durations[keep]
+        weights = (
+            frame[SAMPLE_WEIGHT_COLUMN].to_numpy(dtype=np.float64)
+            if SAMPLE_WEIGHT_COLUMN in frame.columns
+            else None
+        )
+        is_plan = (
+            frame["plan"].notna().to_numpy()
+            if "plan" in frame.columns
+            else np.zeros(len(frame), dtype=bool)
+        )
+
+        # Group codes number groups in order of first appearance, like the
+        # insertion order of analyze_slow_queries
+        statement_codes, statements = pd.factorize(frame["query"])
+        normalized_by_hash: Dict[str, str] = {}
+        statement_hashes = np.empty(len(statements), dtype=object)
+        for i, statement in enumerate(statements):
+            normalized, query_hash = self.normalize_cache.lookup(str(statement))
+            normalized_by_hash.setdefault(query_hash, normalized)
+            statement_hashes[i] = query_hash
+        group_codes, hashes = pd.factorize(statement_hashes[statement_codes])
+
+        # auto_explain entries only time groups without statement entries
+        has_statements = np.bincount(group_codes[~is_plan], minlength=len(hashes)) > 0
+        used = ~is_plan | ~has_statements[group_codes]
+        rows = np.flatnonzero(used)
+        columns: Dict[str, Any] = {
+            "group": group_codes[used],
+            "duration": durations[used],
+            "timestamp": frame["timestamp"].array[used],
+            "row": rows,
+        }
+        if weights is not None:
+            columns["weight"] = weights[used]
+            columns["weighted"] = durations[used] * weights[used]
+        aggregations: Dict[str, Tuple[str, str]] = {
+            "frequency": ("duration", "size"),
+            "total_duration": ("duration", "sum"),
+            "min_duration": ("duration", "min"),
+            "max_duration": ("duration", "max"),
+            "first_seen": ("timestamp", "min"),
+            "last_seen": ("timestamp", "max"),
+            "example_row": ("row", "first"),
+        }
+        if weights is not None:
+            aggregations["count"] = ("weight", "sum")
+            aggregations["total_estimate"] = ("weighted", "sum")
+        stats = pd.DataFrame(columns).groupby("group", sort=True).agg(**aggregations)
+
+        # The impact score of a group is its (estimated) total duration
+        impacts = stats[
+            "total_estimate" if weights is not None else "total_duration"
+        ].to_numpy()
+        top = _top_groups(impacts, top_n)
+        stats = stats.iloc[top]
+        # Position of each group among the top groups, -1 for the others
+        position = np.full(len(hashes), -1)
+        position[top] = np.arange(len(top))
+        in_top = position[columns["group"]] >= 0
+
+        plan_summaries: Dict[int, PlanSummary] = {}
+        plan_rows = is_plan & (position[group_codes] >= 0)
+        if plan_rows.any():
+            plans = pd.Series(frame["plan"].to_numpy()[plan_rows])
+            for code, group_plans in plans.groupby(group_codes[plan_rows]):
+                plan_summaries[int(code)] = summarize_plans(group_plans.tolist())
+
+        intervals = (
+            _group_intervals(
+                columns["group"][in_top],
+                columns["duration"][in_top],
+                columns["weight"][in_top],
+                stratum_sizes(weights),
+            )
+            if weights is not None
+            else {}
+        )
+
+        percentiles = grouped_quantiles(
+            position[columns["group"][in_top]],
+            columns["duration"][in_top],
+            columns["weight"][in_top] if weights is not None else None,
+            list(GROUP_PERCENTILES.values()),
+        )
+
+        analyzed_queries: List[SlowQuery] = []
+        examples = frame["query"].to_numpy()
+        for code, frequency, total, low, high, first, last, example in zip(
+            stats.index,
+            stats["frequency"].tolist(),
+            stats["total_duration"].tolist(),
+            stats["min_duration"].tolist(),
+            stats["max_duration"].tolist(),
+            stats["first_seen"].tolist(),
+            stats["last_seen"].tolist(),
+            stats["example_row"].tolist(),
+        ):
+            query_hash = hashes[code]
+            frequency_ci, total_duration_ci = intervals.get(code, (None, None))
+            if total_duration_ci is not None:
+                count = float(stats.at[code, "count"])
+                total = float(stats.at[code, "total_estimate"])
+                frequency = max(1, round(count))
+                avg_duration = total / count
+            else:
+                avg_duration = total / frequency
+            analyzed_queries.append(
+                self._slow_query(
+                    raw_query=str(examples[example]),
+                    normalized_query=normalized_by_hash[query_hash],
+                    duration=avg_duration,
+                    timestamp=str(first),
+                    frequency=int(frequency),
+                    impact_score=float(total),
+                    query_hash=query_hash,
+                    max_duration=float(high),
+                    min_duration=float(low),
+                    total_duration=float(total),
+                    first_seen=str(first),
+                    last_seen=str(last),
+                    plan_summary=plan_summaries.get(int(code)),
+                    frequency_ci=frequency_ci,
+                    total_duration_ci=total_duration_ci,
+                    **dict(
+                        zip(GROUP_PERCENTILES, percentiles[position[code]].tolist())
+                    ),
+                )
+            )
+
+        # The overall summary describes statement entries, or the
+        # auto_explain entries when there are no statement entries at all
+        summary_rows = ~is_plan if (~is_plan).any() else is_plan
+        return FrameAnalysis(
+            sorted(
+                analyzed_queries, key=lambda query: query.impact_score, reverse=True
+            ),
+            durations[summary_rows],
+            weights[summary_rows] if weights is not None else None,
+            len(hashes),
+        )
+
+    def _slow_query(self, **fields: Any) -> SlowQuery:
+        """SlowQuery of one group, with the static analysis of its query."""
+        antipattern_matches = self.query_rewriter.find_antipatterns(
+            fields["normalized_query"]
+        )
+        return SlowQuery(
+            antipattern_matches=antipattern_matches,
+            optimization_score=self.query_rewriter.get_optimization_score(
+                antipattern_matches
+            ),
+            **fields,
+        )
 
-def _compute_percentile(values: Sequence[float], percentile: float) -> float:
-    if not values:
-        return 0.0
 
-    sorted_vals = sorted(values)
-    if len(sorted_vals) == 1:
-        return float(sorted_vals[0])
+def _impact_score(group: GroupAccumulator, sampled: bool = False) -> float:
+    """Impact score summarize_groups gives a group, without the per-group work."""
+    timing = group.timing
+    if sampled:
+        # The estimated total duration, summed as in estimate_from_moments
+        estimate = 0.0
+        for weight, (_, total, _) in timing.moments.items():
+            estimate += weight * total
+        return estimate
+    return timing.total
 
-    position = (len(sorted_vals) - 1) * percentile
-    lower_index = math.floor(position)
-    upper_index = math.ceil(position)
-    lower_val = sorted_vals[lower_index]
-    upper_val = sorted_vals[upper_index]
 
-    if lower_index == upper_index:
-        return float(lower_val)
+def _top_groups(impacts: np.ndarray, top_n: int) -> np.ndarray:
+    """
+    Codes of the top_n groups by impact score, with a bounded heap
 
-    weight = position - lower_index
-    return float(lower_val + (upper_val - lower_val) * weight)
+    Ties keep the order of first appearance, as the stable sort of all
+    groups would. All codes are returned when top_n is 0.
+    """
+    if top_n <= 0 or top_n >= impacts.size:
+        return np.arange(impacts.size)
+    scores = impacts.tolist()
+    return np.array(heapq.nlargest(top_n, range(len(scores)), key=scores.__getitem__))
+
+
+def _group_intervals(
+    groups: np.ndarray,
+    durations: np.ndarray,
+    weights: np.ndarray,
+    strata: Dict[float, int],
+) -> Dict[int, Tuple[Tuple[float, float], Tuple[float, float]]]:
+    """95% intervals of the frequency and total duration of each group."""
+    order = np.argsort(groups, kind="stable")
+    bounds = np.flatnonzero(np.diff(groups[order])) + 1
+    intervals: Dict[int, Tuple[Tuple[float, float], Tuple[float, float]]] = {}
+    for rows in np.split(order, bounds):
+        group_weights = weights[rows]
+        _, low, high = estimate_total(np.ones(len(rows)), group_weights, strata)
+        _, total_low, total_high = estimate_total(
+            durations[rows], group_weights, strata
+        )
+        intervals[int(groups[rows[0]])] = ((low, high), (total_low, total_high))
+    return intervals
 
 
 def _build_summary(
-    durations: Sequence[float], analyzed_queries: List[SlowQuery]
+    durations: Union[Sequence[float], np.ndarray],
+    unique_queries: int,
+    weights: Optional[Union[Sequence[float], np.ndarray]] = None,
 ) -> Dict[str, float]:
-    duration_list = list(durations)
+    duration_array = np.asarray(durations, dtype=np.float64)
 
-    if not duration_list:
+    if duration_array.size == 0:
         return {
             "total_queries": 0.0,
             "unique_queries": 0.0,
@@ -223,21 +641,115 @@ def _build_summary(
             "total_time_spent": 0.0,
         }
 
-    total_time = float(sum(duration_list))
-    total_queries = len(duration_list)
+    if weights is not None:
+        return _build_sampled_summary(
+            duration_array, unique_queries, np.asarray(weights, dtype=np.float64)
+        )
+
+    total_time = float(duration_array.sum())
+    total_queries = duration_array.size
+    p95, p99 = _summary_percentiles(duration_array)
 
     return {
         "total_queries": float(total_queries),
-        "unique_queries": float(len(analyzed_queries)),
+        "unique_queries": float(unique_queries),
         "avg_duration_overall": total_time / total_queries,
-        "max_duration_overall": float(max(duration_list)),
-        "p95_duration": _compute_percentile(duration_list, 0.95),
-        "p99_duration": _compute_percentile(duration_list, 0.99),
+        "max_duration_overall": float(duration_array.max()),
+        "p95_duration": float(p95),
+        "p99_duration": float(p99),
         "total_time_spent": total_time,
     }
 
 
+def _build_sampled_summary(
+    durations: np.ndarray, unique_queries: int, weights: np.ndarray
+) -> Dict[str, float]:
+    """Summary of a sampled log: weighted estimates with a 95% interval."""
+    total_queries = float(weights.sum())
+    total_time, low, high = estimate_total(durations, weights, stratum_sizes(weights))
+    p95, p99 = _summary_percentiles(durations, weights)
+    return {
+        "total_queries": total_queries,
+        "unique_queries": float(unique_queries),
+        "avg_duration_overall": total_time / total_queries,
+        "max_duration_overall": float(durations.max()),
+        "p95_duration": p95,
+        "p99_duration": p99,
+        "total_time_spent": total_time,
+        "total_time_spent_ci_low": low,
+        "total_time_spent_ci_high": high,
+        "sampled_entries": float(len(durations)),
+        "sample_fraction": len(durations) / total_queries,
+    }
+
+
+def _summary_percentiles(
+    durations: np.ndarray, weights: Optional[np.ndarray] = None
+) -> Tuple[float, float]:
+    """p95 and p99 of all durations, from a sketch for large inputs."""
+    if durations.size >= SKETCH_PERCENTILE_THRESHOLD:
+        sketch = DurationSketch()
+        sketch.add_many(durations, weights)
+        return sketch.quantile(0.95) or 0.0, sketch.quantile(0.99) or 0.0
+    if weights is not None:
+        return (
+            weighted_percentile(durations, weights, 0.95),
+            weighted_percentile(durations, weights, 0.99),
+        )
+    # Linear interpolation between closest ranks
+    p95, p99 = np.percentile(durations, [95, 99])
+    return float(p95), float(p99)
+
+
+def _parse_error_summary(counts: Dict[str, int]) -> Dict[str, float]:
+    """Summary entries for the malformed entries the parser counted."""
+    if not any(counts.values()):
+        return {}
+    return {
+        "parse_errors": float(sum(counts.values())),
+        **{
+            f"parse_errors_{category}": float(counts.get(category, 0))
+            for category in CATEGORIES
+        },
+    }
+
+
+def _plan_columns(summary: Optional[PlanSummary]) -> Dict[str, Any]:
+    """Report columns describing the auto_explain plans of one query group."""
+    if summary is None:
+        return {"plan_count": 0}
+    node_types = sorted(summary.node_types.items(), key=lambda item: -item[1])
+    return {
+        "plan_count": summary.plans,
+        "plan_shapes": len(summary.fingerprints),
+        "plan_node_types": ", ".join(f"{name} x{n}" for name, n in node_types),
+        "shared_hit_blocks": summary.shared_hit_blocks,
+        "shared_read_blocks": summary.shared_read_blocks,
+        "cache_hit_ratio": summary.cache_hit_ratio,
+        "temp_written_blocks": summary.temp_written_blocks,
+        "max_row_misestimate": summary.max_row_misestimate,
+        "sort_spills": summary.sort_spills,
+        "hash_spills": summary.hash_spills,
+    }
+
+
+def _interval_columns(query: SlowQuery) -> Dict[str, Any]:
+    """Report columns with the 95% intervals of a sampled query group."""
+    frequency_ci = query.frequency_ci or (query.frequency, query.frequency)
+    total_ci = query.total_duration_ci or (query.total_duration, query.total_duration)
+    return {
+        "frequency_ci_low": frequency_ci[0],
+        "frequency_ci_high": frequency_ci[1],
+        "total_duration_ci_low": total_ci[0],
+        "total_duration_ci_high": total_ci[1],
+    }
+
+
 def _build_dataframe(queries: List[SlowQuery]) -> pd.DataFrame:
+    # Plan columns are only added when the log had auto_explain entries,
+    # and interval columns when it was sampled
+    with_plans = any(query.plan_summary is not None for query in queries)
+    sampled = any(query.frequency_ci is not None for query in queries)
     rows: List[Dict[str, Any]] = []
     for query in queries:
         rows.append(
@@ -248,12 +760,14 @@ def _build_dataframe(queries: List[SlowQuery]) -> pd.DataFrame:
                 "max_duration": query.max_duration,
                 "min_duration": query.min_duration,
                 "total_duration": query.total_duration,
+                **{name: getattr(query, name) for name in GROUP_PERCENTILES},
                 "frequency": query.frequency,
                 "impact_score": query.impact_score,
                 "first_seen": query.first_seen,
                 "last_seen": query.last_seen,
                 "optimization_score": query.optimization_score,
-                "static_analysis_report": query.static_analysis_report,
+                **(_plan_columns(query.plan_summary) if with_plans else {}),
+                **(_interval_columns(query) if sampled else {}),
             }
         )
 
@@ -266,31 +780,120 @@ def _build_dataframe(queries: List[SlowQuery]) -> pd.DataFrame:
                 "max_duration",
                 "min_duration",
                 "total_duration",
+                *GROUP_PERCENTILES,
                 "frequency",
                 "impact_score",
                 "first_seen",
                 "last_seen",
                 "optimization_score",
-                "static_analysis_report",
             ]
         )
 
     return pd.DataFrame(rows)
 
 
+class IncrementalAnalysis:
+    """
+    Analysis of a log read in batches, as by ``--follow``
+
+    Each batch is folded into GroupAccumulators of its own and merged into
+    the groups of the earlier batches with ``merge_groups``; the overall
+    summary is kept as running totals and a DurationSketch (so its p95/p99
+    are within the sketch's 1% accuracy). Adding a batch costs time in the
+    batch's entries, not in everything read before it. Sample weights are
+    counted, but no confidence intervals are computed.
+    """
+
+    def __init__(
+        self, normalize_mode: str = "fingerprint", min_duration: float = 0.0
+    ) -> None:
+        self.analyzer = SlowQueryAnalyzer(normalize_mode)
+        self.min_duration = min_duration
+        self.groups: Dict[str, GroupAccumulator] = {}
+        # Durations of statement entries and of auto_explain entries, with
+        # their total; the summary describes the statements if there are any
+        self.statements = DurationSketch()
+        self.plan_entries = DurationSketch()
+        self.statement_time = 0.0
+        self.plan_time = 0.0
+        self.parse_errors: Dict[str, int] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def add_frame(self, df: pd.DataFrame) -> None:
+        """Fold the entries of a parsed batch into the analysis."""
+        cache = self.analyzer.normalize_cache
+        hits, misses = cache.hits, cache.misses
+        groups, durations, weights, is_plan = _accumulate_frame(
+            self.analyzer, df, self.min_duration
+        )
+        self.cache_hits += cache.hits - hits
+        self.cache_misses += cache.misses - misses
+        merge_groups(self.groups, groups.values())
+        weighted = durations * weights if weights is not None else durations
+        for rows, sketch in ((~is_plan, self.statements), (is_plan, self.plan_entries)):
+            sketch.add_many(
+                durations[rows], weights[rows] if weights is not None else None
+            )
+        self.statement_time += float(weighted[~is_plan].sum())
+        self.plan_time += float(weighted[is_plan].sum())
+        for category, count in df.attrs.get(PARSE_ERRORS_ATTR, {}).items():
+            self.parse_errors[category] = self.parse_errors.get(category, 0) + count
+
+    def summary(self) -> Dict[str, float]:
+        """Overall summary, with the keys run_slow_query_analysis reports."""
+        if self.statements.count:
+            sketch, total_time = self.statements, self.statement_time
+        else:
+            sketch, total_time = self.plan_entries, self.plan_time
+        if not sketch.count:
+            return _build_summary(np.empty(0), 0)
+        summary = {
+            "total_queries": sketch.count,
+            "unique_queries": float(len(self.groups)),
+            "avg_duration_overall": total_time / sketch.count,
+            "max_duration_overall": sketch.maximum,
+            "p95_duration": sketch.quantile(0.95) or 0.0,
+            "p99_duration": sketch.quantile(0.99) or 0.0,
+            "total_time_spent": total_time,
+        }
+        summary.update(_parse_error_summary(self.parse_errors))
+        summary["normalize_cache_hits"] = float(self.cache_hits)
+        summary["normalize_cache_misses"] = float(self.cache_misses)
+        return summary
+
+    def result(self, top_n: int = 5) -> Tuple[pd.DataFrame, Dict[str, float]]:
+        """
+        Top query groups and summary of every batch added so far
+
+        Returns:
+            (top_queries_df, summary_dict), as run_slow_query_analysis
+        """
+        queries = self.analyzer.summarize_groups(self.groups.values(), top_n=top_n)
+        if not queries:
+            raise ValueError("No slow queries matched the analysis criteria.")
+        return _build_dataframe(queries), self.summary()
+
+
 def run_slow_query_analysis(
     data: Union[pd.DataFrame, Sequence[QueryRecord]],
     top_n: int = 5,
     min_duration: float = 0.0,
+    normalize_mode: str = "fingerprint",
+    engine: str = "columnar",
 ) -> Union[List[SlowQuery], Tuple[pd.DataFrame, Dict[str, float]]]:
     """Analyze slow queries.
 
     If a list of query dicts is provided, returns a list of SlowQuery objects
     for backward compatibility. If a DataFrame is provided, returns a tuple of
-    (top_queries_df, summary_dict) suitable for reporting.
+    (top_queries_df, summary_dict) suitable for reporting. Queries are
+    grouped by ``normalize_query(query, normalize_mode)``; a DataFrame is
+    grouped by one of ANALYSIS_ENGINES, which give the same result.
     """
 
-    analyzer = SlowQueryAnalyzer()
+    analyzer = SlowQueryAnalyzer(normalize_mode)
+    if engine not in ANALYSIS_ENGINES:
+        raise ValueError(f"Unsupported analysis engine: {engine}")
 
     # Backward compatibility path for iterable query records
     if isinstance(data, Sequence) and not isinstance(data, pd.DataFrame):
@@ -308,57 +911,118 @@ def run_slow_query_analysis(
         missing = required_columns - columns
         raise ValueError(f"Log DataFrame missing required columns: {missing}")
 
-    to_dict_method = getattr(log_df, "to_dict", None)
-    if not callable(to_dict_method):
-        raise ValueError("Log DataFrame cannot be converted to records for analysis.")
+    cache = analyzer.normalize_cache
+    hits, misses = cache.hits, cache.misses
+    # Only the top_n groups get SlowQuery objects and static analysis
+    if engine == "columnar":
+        analysis = analyzer.analyze_frame(log_df, min_duration, top_n)
+        if len(analysis.durations) == 0:
+            raise ValueError(
+                "No slow query entries meet the minimum duration threshold."
+            )
+    else:
+        analysis = _analyze_records(analyzer, log_df, min_duration, top_n)
+    hits, misses = cache.hits - hits, cache.misses - misses
+    logger.debug(
+        f"Normalize cache: {hits} hits, {misses} misses, {len(cache)} statements"
+    )
 
-    raw_records = to_dict_method(orient="records")
-    records = cast(List[Dict[str, Any]], raw_records or [])
+    if not analysis.queries:
+        raise ValueError("No slow queries matched the analysis criteria.")
 
-    query_dicts: List[QueryRecord] = []
-    durations_for_summary: List[float] = []
+    summary = _build_summary(
+        analysis.durations, analysis.unique_queries, analysis.weights
+    )
+    summary.update(
+        _parse_error_summary(getattr(log_df, "attrs", {}).get(PARSE_ERRORS_ATTR, {}))
+    )
+    summary["normalize_cache_hits"] = float(hits)
+    summary["normalize_cache_misses"] = float(misses)
 
-    for entry in records:
+    result_df = _build_dataframe(analysis.queries)
+    result_df = result_df.sort_values("impact_score", ascending=False, kind="stable")
 
-        try:
-            duration = float(entry["duration_ms"])
-        except (KeyError, TypeError, ValueError):
-            continue
+    if top_n > 0:
+        result_df = result_df.head(top_n)
 
-        if duration < min_duration:
-            continue
+    result_df = result_df.reset_index(drop=True)
 
-        timestamp = entry.get("timestamp")
-        query_text = entry.get("query")
+    return result_df, summary
 
-        if timestamp is None or query_text is None:
-            continue
 
-        record: QueryRecord = {
-            "statement": str(query_text),
-            "duration": duration,
-            "timestamp": str(timestamp),
-        }
+def _analyze_records(
+    analyzer: SlowQueryAnalyzer,
+    log_df: pd.DataFrame,
+    min_duration: float,
+    top_n: int = 0,
+) -> FrameAnalysis:
+    """
+    Analyze a parsed frame by folding its entries into GroupAccumulators
 
-        query_dicts.append(record)
-        durations_for_summary.append(duration)
+    Entries are read from typed columns, one at a time, without a dict per
+    entry.
 
-    if not query_dicts:
+    Returns:
+        FrameAnalysis, as SlowQueryAnalyzer.analyze_frame
+    """
+    groups, durations, weights, is_plan = _accumulate_frame(
+        analyzer, log_df, min_duration
+    )
+    if not durations.size:
         raise ValueError("No slow query entries meet the minimum duration threshold.")
+    strata = stratum_sizes(weights) if weights is not None else None
+    # auto_explain entries repeat statement entries when both are logged
+    summary_rows = ~is_plan if (~is_plan).any() else is_plan
+    return FrameAnalysis(
+        analyzer.summarize_groups(groups.values(), strata, top_n),
+        durations[summary_rows],
+        weights[summary_rows] if weights is not None else None,
+        len(groups),
+    )
 
-    analyzed_queries = analyzer.analyze_slow_queries(query_dicts, min_duration)
-
-    if not analyzed_queries:
-        raise ValueError("No slow queries matched the analysis criteria.")
-
-    summary = _build_summary(durations_for_summary, analyzed_queries)
-
-    result_df = _build_dataframe(analyzed_queries)
-    result_df = result_df.sort_values("impact_score", ascending=False)
 
-    if top_n > 0:
-        result_df = result_df.head(top_n)
+def _accumulate_frame(
+    analyzer: SlowQueryAnalyzer, log_df: pd.DataFrame, min_duration: float
+) -> Tuple[Dict[str, GroupAccumulator], np.ndarray, Optional[np.ndarray], np.ndarray]:
+    """
+    Fold the slow entries of a parsed frame into new GroupAccumulators
 
-    result_df = result_df.reset_index(drop=True)
+    Returns:
+        The groups, and the durations, sample weights (None when the log was
+        not sampled) and auto_explain flags of the entries folded
+    """
+    durations = pd.to_numeric(log_df["duration_ms"], errors="coerce").to_numpy(
+        dtype=np.float64
+    )
+    # NaN durations compare False, so unparsable ones are dropped too
+    keep = (
+        (durations >= min_duration)
+        & log_df["timestamp"].notna().to_numpy()
+        & log_df["query"].notna().to_numpy()
+    )
+    durations = durations[keep]
+    # Sampled logs (see sampling.py) weigh each entry
+    weights = (
+        log_df[SAMPLE_WEIGHT_COLUMN].to_numpy(dtype=np.float64)[keep]
+        if SAMPLE_WEIGHT_COLUMN in log_df.columns
+        else None
+    )
+    plans = (
+        log_df["plan"].to_numpy()[keep]
+        if "plan" in log_df.columns
+        else np.full(len(durations), None)
+    )
+    is_plan = np.fromiter(
+        (isinstance(plan, PlanStats) for plan in plans), dtype=bool, count=len(plans)
+    )
 
-    return result_df, summary
+    groups = analyzer.accumulate_entries(
+        zip(
+            map(str, log_df["query"].to_numpy()[keep]),
+            durations.tolist(),
+            map(str, log_df["timestamp"].array[keep]),
+            (weights if weights is not None else np.ones(len(durations))).tolist(),
+            np.where(is_plan, plans, None).tolist(),
+        )
+    )
+    return groups, durations, weights, is_plan
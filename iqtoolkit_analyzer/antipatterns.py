@@ -165,27 +165,40 @@ class AntiPatternDetector:
         Returns:
             Formatted report string
         """
-        if not matches:
-            return "✅ No anti-patterns detected in this query."
+        return format_rewrite_report(matches)
 
-        report = f"🔍 **Anti-Pattern Analysis** ({len(matches)} issues found)\n\n"
 
-        for i, match in enumerate(matches, 1):
-            report += (
-                f"### Issue #{i}: "
-                f"{match.pattern_type.value.replace('_', ' ').title()}\n\n"
-            )
-            report += f"**Problem**: {match.problem_description}\n\n"
-            report += f"**Detected Pattern**: `{match.matched_text.strip()}`\n\n"
-            report += f"**Recommendation**: {match.rewrite_suggestion}\n\n"
+def format_rewrite_report(matches: List[AntiPatternMatch]) -> str:
+    """
+    Format detected anti-patterns as a Markdown report with rewrite suggestions.
+
+    Args:
+        matches: List of detected anti-patterns
+
+    Returns:
+        Formatted report string
+    """
+    if not matches:
+        return "✅ No anti-patterns detected in this query."
 
-            if match.example_rewrite:
-                report += f"**Example**:\n```sql\n{match.example_rewrite}\n```\n\n"
+    report = f"🔍 **Anti-Pattern Analysis** ({len(matches)} issues found)\n\n"
 
-            report += f"**Confidence**: {match.confidence_score:.1%}\n\n"
-            report += "---\n\n"
+    for i, match in enumerate(matches, 1):
+        report += (
+            f"### Issue #{i}: "
+            f"{match.pattern_type.value.replace('_', ' ').title()}\n\n"
+        )
+        report += f"**Problem**: {match.problem_description}\n\n"
+        report += f"**Detected Pattern**: `{match.matched_text.strip()}`\n\n"
+        report += f"**Recommendation**: {match.rewrite_suggestion}\n\n"
 
-        return report
+        if match.example_rewrite:
+            report += f"**Example**:\n```sql\n{match.example_rewrite}\n```\n\n"
+
+        report += f"**Confidence**: {match.confidence_score:.1%}\n\n"
+        report += "---\n\n"
+
+    return report
 
 
 class StaticQueryRewriter:
@@ -204,11 +217,23 @@ class StaticQueryRewriter:
         Returns:
             Tuple of (anti-pattern matches, formatted report)
         """
-        matches = self.detector.detect_antipatterns(query)
+        matches = self.find_antipatterns(query)
         report = self.detector.generate_rewrite_report(query, matches)
 
         return matches, report
 
+    def find_antipatterns(self, query: str) -> List[AntiPatternMatch]:
+        """
+        Detect anti-patterns without formatting a report.
+
+        Args:
+            query: SQL query to analyze
+
+        Returns:
+            List of anti-pattern matches; format_rewrite_report renders them
+        """
+        return self.detector.detect_antipatterns(query)
+
     def get_optimization_score(self, matches: List[AntiPatternMatch]) -> float:
         """
         Calculate an optimization score based on detected anti-patterns.
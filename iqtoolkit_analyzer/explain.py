@@ -0,0 +1,284 @@
+"""
+Parsing of auto_explain plans found in PostgreSQL logs.
+
+With ``auto_explain`` loaded, the server logs ``duration: ... ms  plan:``
+entries whose continuation lines hold the plan in text or JSON format.
+Each plan is reduced to a ``PlanStats``: a fingerprint of the plan shape
+(node types, indexes and relations, without costs or row counts), node type
+counts, estimated versus actual rows, shared buffer hits and reads, and
+sort/hash operations that spilled to disk. ``PlanSummary`` accumulates the
+plans of one query group, so I/O-bound and misestimated queries can be found
+from the log alone.
+"""
+
+import hashlib
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# A plan node line of a text plan, e.g.
+# "  ->  Seq Scan on orders o  (cost=0.00..35.50 rows=2550 width=4)
+#  (actual time=0.010..0.200 rows=2500 loops=1)"
+_TEXT_NODE_RE = re.compile(
+    r"^(?P<indent>\s*)(?:->\s+)?(?P<label>[A-Z][^(]*?)\s+"
+    r"\(cost=[\d.]+\.\.[\d.]+ rows=(?P<rows>\d+) width=\d+\)"
+    r"(?: \(actual (?:time=[\d.]+\.\.[\d.]+ )?rows=(?P<actual>\d+)"
+    r" loops=(?P<loops>\d+)\))?"
+)
+# "Index Scan using orders_pkey on orders o" -> type, index, relation
+_TEXT_LABEL_RE = re.compile(
+    r"(?P<type>.+?)(?: using (?P<index>\S+))?(?: on (?P<relation>\S+)(?: \S+)?)?$"
+)
+_TEXT_BUFFERS_RE = re.compile(
+    r"Buffers: shared(?: hit=(?P<hit>\d+))?(?: read=(?P<read>\d+))?"
+)
+_TEXT_TEMP_WRITTEN_RE = re.compile(r"temp(?: read=\d+)? written=(\d+)")
+_TEXT_BATCHES_RE = re.compile(r"Batches: (\d+)")
+
+
+@dataclass
+class PlanStats:
+    """Statistics extracted from one auto_explain plan."""
+
+    fingerprint: str = ""
+    node_types: Dict[str, int] = field(default_factory=dict)
+    estimated_rows: int = 0
+    actual_rows: Optional[int] = None
+    max_row_misestimate: float = 1.0
+    shared_hit_blocks: int = 0
+    shared_read_blocks: int = 0
+    temp_written_blocks: int = 0
+    sort_spills: int = 0
+    hash_spills: int = 0
+
+
+@dataclass
+class PlanSummary:
+    """Plan statistics accumulated over the executions of one query group."""
+
+    plans: int = 0
+    fingerprints: Dict[str, int] = field(default_factory=dict)
+    node_types: Dict[str, int] = field(default_factory=dict)
+    shared_hit_blocks: int = 0
+    shared_read_blocks: int = 0
+    temp_written_blocks: int = 0
+    sort_spills: int = 0
+    hash_spills: int = 0
+    max_row_misestimate: float = 1.0
+
+    def add(self, stats: PlanStats) -> None:
+        """Fold one plan into the summary."""
+        self.plans += 1
+        self.fingerprints[stats.fingerprint] = (
+            self.fingerprints.get(stats.fingerprint, 0) + 1
+        )
+        for node_type, count in stats.node_types.items():
+            self.node_types[node_type] = self.node_types.get(node_type, 0) + count
+        self.shared_hit_blocks += stats.shared_hit_blocks
+        self.shared_read_blocks += stats.shared_read_blocks
+        self.temp_written_blocks += stats.temp_written_blocks
+        self.sort_spills += stats.sort_spills
+        self.hash_spills += stats.hash_spills
+        self.max_row_misestimate = max(
+            self.max_row_misestimate, stats.max_row_misestimate
+        )
+
+    def merge(self, other: "PlanSummary") -> None:
+        """Fold the plans of another summary of the same group into this one."""
+        self.plans += other.plans
+        for fingerprint, count in other.fingerprints.items():
+            self.fingerprints[fingerprint] = (
+                self.fingerprints.get(fingerprint, 0) + count
+            )
+        for node_type, count in other.node_types.items():
+            self.node_types[node_type] = self.node_types.get(node_type, 0) + count
+        self.shared_hit_blocks += other.shared_hit_blocks
+        self.shared_read_blocks += other.shared_read_blocks
+        self.temp_written_blocks += other.temp_written_blocks
+        self.sort_spills += other.sort_spills
+        self.hash_spills += other.hash_spills
+        self.max_row_misestimate = max(
+            self.max_row_misestimate, other.max_row_misestimate
+        )
+
+    @property
+    def cache_hit_ratio(self) -> Optional[float]:
+        """Share of shared buffer accesses served from cache, if any were logged."""
+        total = self.shared_hit_blocks + self.shared_read_blocks
+        return self.shared_hit_blocks / total if total else None
+
+
+def summarize_plans(plans: Iterable[PlanStats]) -> PlanSummary:
+    """Accumulate plans into a PlanSummary."""
+    summary = PlanSummary()
+    for stats in plans:
+        summary.add(stats)
+    return summary
+
+
+def _misestimate(estimated: int, actual: int) -> float:
+    """Ratio between estimated and actual rows, always >= 1."""
+    high, low = max(estimated, actual), min(estimated, actual)
+    return high / max(low, 1)
+
+
+def _fingerprint(shape: List[str]) -> str:
+    return hashlib.md5("\n".join(shape).encode()).hexdigest()[:16]
+
+
+def _strip_continuation(lines: List[str]) -> List[str]:
+    """Drop the tab the server puts in front of continuation lines."""
+    return [line[1:] if line.startswith("\t") else line for line in lines]
+
+
+def parse_text_plan(lines: List[str]) -> Tuple[Optional[str], Optional[PlanStats]]:
+    """
+    Parse an auto_explain plan in text format
+
+    Args:
+        lines: Plan lines following the ``plan:`` header
+
+    Returns:
+        Tuple of (query text, PlanStats); either is None if not found
+    """
+    lines = _strip_continuation(lines)
+    query_lines: List[str] = []
+    in_query = False
+    stats = PlanStats()
+    shape: List[str] = []
+    for line in lines:
+        node = _TEXT_NODE_RE.match(line)
+        if node is None:
+            stripped = line.strip()
+            if stripped.startswith("Query Text:"):
+                in_query = True
+                query_lines.append(line.lstrip()[len("Query Text:") :])
+            elif in_query:
+                query_lines.append(line)
+            elif stripped.startswith("Buffers:"):
+                buffers = _TEXT_BUFFERS_RE.search(stripped)
+                if buffers is not None:
+                    # Buffer counts include child nodes; the root has the total
+                    stats.shared_hit_blocks = max(
+                        stats.shared_hit_blocks, int(buffers.group("hit") or 0)
+                    )
+                    stats.shared_read_blocks = max(
+                        stats.shared_read_blocks, int(buffers.group("read") or 0)
+                    )
+                temp = _TEXT_TEMP_WRITTEN_RE.search(stripped)
+                if temp is not None:
+                    stats.temp_written_blocks = max(
+                        stats.temp_written_blocks, int(temp.group(1))
+                    )
+            elif stripped.startswith("Sort Method:") and "Disk:" in stripped:
+                stats.sort_spills += 1
+            elif stripped.startswith("Buckets:"):
+                batches = _TEXT_BATCHES_RE.search(stripped)
+                if batches is not None and int(batches.group(1)) > 1:
+                    stats.hash_spills += 1
+            continue
+
+        in_query = False
+        label = _TEXT_LABEL_RE.match(node.group("label").strip())
+        node_type = label.group("type") if label else node.group("label")
+        stats.node_types[node_type] = stats.node_types.get(node_type, 0) + 1
+        shape.append(
+            f"{len(node.group('indent'))}:{node_type}"
+            f":{label.group('index') or '' if label else ''}"
+            f":{label.group('relation') or '' if label else ''}"
+        )
+        estimated = int(node.group("rows"))
+        actual = node.group("actual")
+        if len(shape) == 1:
+            stats.estimated_rows = estimated
+            if actual is not None:
+                stats.actual_rows = int(actual) * int(node.group("loops"))
+        if actual is not None:
+            stats.max_row_misestimate = max(
+                stats.max_row_misestimate, _misestimate(estimated, int(actual))
+            )
+
+    query = "".join(query_lines).strip() or None
+    if not shape:
+        return query, None
+    stats.fingerprint = _fingerprint(shape)
+    return query, stats
+
+
+def _walk_json_plan(
+    node: Dict[str, Any], depth: int, stats: PlanStats, shape: List[str]
+) -> None:
+    node_type = str(node.get("Node Type", "?"))
+    stats.node_types[node_type] = stats.node_types.get(node_type, 0) + 1
+    shape.append(
+        f"{depth}:{node_type}:{node.get('Index Name', '')}"
+        f":{node.get('Relation Name', '')}"
+    )
+    estimated = int(node.get("Plan Rows", 0))
+    if "Actual Rows" in node:
+        stats.max_row_misestimate = max(
+            stats.max_row_misestimate,
+            _misestimate(estimated, int(node["Actual Rows"])),
+        )
+    stats.shared_hit_blocks = max(
+        stats.shared_hit_blocks, int(node.get("Shared Hit Blocks", 0))
+    )
+    stats.shared_read_blocks = max(
+        stats.shared_read_blocks, int(node.get("Shared Read Blocks", 0))
+    )
+    stats.temp_written_blocks = max(
+        stats.temp_written_blocks, int(node.get("Temp Written Blocks", 0))
+    )
+    if node.get("Sort Space Type") == "Disk":
+        stats.sort_spills += 1
+    if int(node.get("Hash Batches", 1)) > 1:
+        stats.hash_spills += 1
+    for child in node.get("Plans", []):
+        _walk_json_plan(child, depth + 1, stats, shape)
+
+
+def parse_json_plan(text: str) -> Tuple[Optional[str], Optional[PlanStats]]:
+    """
+    Parse an auto_explain plan in JSON format
+
+    Args:
+        text: JSON document following the ``plan:`` header
+
+    Returns:
+        Tuple of (query text, PlanStats); either is None if not found
+    """
+    try:
+        document = json.loads(text)
+    except ValueError:
+        return None, None
+    if isinstance(document, list):
+        document = document[0] if document else {}
+    query = document.get("Query Text")
+    root = document.get("Plan")
+    if not isinstance(root, dict):
+        return query, None
+    stats = PlanStats()
+    shape: List[str] = []
+    _walk_json_plan(root, 0, stats, shape)
+    stats.estimated_rows = int(root.get("Plan Rows", 0))
+    if "Actual Rows" in root:
+        stats.actual_rows = int(root["Actual Rows"]) * int(root.get("Actual Loops", 1))
+    stats.fingerprint = _fingerprint(shape)
+    return query, stats
+
+
+def parse_plan(lines: List[str]) -> Tuple[Optional[str], Optional[PlanStats]]:
+    """
+    Parse the plan lines of an auto_explain entry, in text or JSON format
+
+    Args:
+        lines: Lines following the ``plan:`` header (continuation lines)
+
+    Returns:
+        Tuple of (query text, PlanStats); either is None if not found
+    """
+    text = "".join(_strip_continuation(lines)).strip()
+    if text.startswith(("{", "[")):
+        return parse_json_plan(text)
+    return parse_text_plan(lines)
@@ -0,0 +1,265 @@
+"""
+Incremental parsing of live plain-text PostgreSQL logs.
+
+A ``LogCheckpoint`` records which file was read (device, inode and a
+checksum of its first bytes, since inode numbers are reused), how far
+(the byte offset of the first entry not yet parsed) and the text of the
+trailing entry, which the server may still be writing. The next run reads
+only the bytes after the offset, so periodic analysis costs O(new bytes)
+instead of O(file).
+
+When the file at the followed path is no longer the checkpointed one, the
+log was rotated: the rest of the old file is read if it is
+still in the same directory under another name, otherwise the saved
+trailing entry is flushed. A file smaller than the checkpoint offset was
+truncated (e.g. by logrotate's ``copytruncate``) and is read from byte 0.
+"""
+
+import json
+import logging
+import os
+import time
+import zlib
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from .log_sources import detect_compression
+from .log_prefix import LogLinePrefix, read_line_block
+from .parse_errors import PARSE_ERRORS_ATTR, ParseErrors
+from .parser import DEFAULT_LINE_PREFIX, LogFilter, parse_plain_log_range
+
+logger = logging.getLogger(__name__)
+
+# The tail of the log is searched backwards in blocks of this size for the
+# start of the last entry
+_TAIL_BLOCK_BYTES = 64 * 1024
+# Blocks overlap by more than the length of an entry timestamp, so a
+# timestamp straddling two blocks is still found
+_TAIL_OVERLAP_BYTES = 64
+# Bytes at the start of the file checksummed to tell a new file that reuses
+# the inode of a deleted one from the file that was checkpointed
+_HEAD_BYTES = 1024
+
+
+@dataclass
+class LogCheckpoint:
+    """Position reached in a followed log file."""
+
+    path: str
+    device: int
+    inode: int
+    offset: int
+    pending: str = ""
+    head_length: int = 0
+    head_checksum: int = 0
+
+    def save(self, checkpoint_path: str) -> None:
+        """Write the checkpoint atomically, so a crash never leaves half a file."""
+        target = Path(checkpoint_path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temporary = target.with_name(target.name + ".tmp")
+        temporary.write_text(json.dumps(asdict(self)))
+        os.replace(temporary, target)
+
+    @classmethod
+    def load(cls, checkpoint_path: str) -> Optional["LogCheckpoint"]:
+        """Read a checkpoint, or return None if there is none yet."""
+        try:
+            with open(checkpoint_path, "r") as f:
+                return cls(**json.load(f))
+        except FileNotFoundError:
+            return None
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable checkpoint {checkpoint_path}: {e}")
+            return None
+
+
+def _find_last_entry_start(
+    f: BinaryIO, start: int, end: int, line_prefix: LogLinePrefix
+) -> int:
+    """
+    Find the offset of the last timestamped line in [start, end)
+
+    ``start`` must be the start of a line. If the range holds no entry start
+    at all, ``start`` is returned: everything in it belongs to an entry that
+    is still being written.
+    """
+    pos = end
+    while pos > start:
+        block_start = max(start, pos - _TAIL_BLOCK_BYTES)
+        data, lead = read_line_block(f, block_start, pos)
+        last = None
+        for last in line_prefix.entry_start_bytes.finditer(data, lead):
+            pass
+        if last is not None:
+            return block_start - lead + last.start()
+        if block_start == start:
+            break
+        pos = block_start + _TAIL_OVERLAP_BYTES
+    return start
+
+
+def _head_checksum(f: BinaryIO, length: int) -> int:
+    """CRC32 of the first ``length`` bytes of a file."""
+    f.seek(0)
+    return zlib.crc32(f.read(length))
+
+
+def _is_checkpointed_file(
+    f: BinaryIO, stat: os.stat_result, checkpoint: LogCheckpoint
+) -> bool:
+    """Whether an open file is the one the checkpoint was taken on."""
+    return (
+        (stat.st_dev, stat.st_ino) == (checkpoint.device, checkpoint.inode)
+        and stat.st_size >= checkpoint.head_length
+        and _head_checksum(f, checkpoint.head_length) == checkpoint.head_checksum
+    )
+
+
+def _find_rotated_file(checkpoint: LogCheckpoint) -> Optional[str]:
+    """Look for the checkpointed inode under another name in the same directory."""
+    directory = os.path.dirname(os.path.abspath(checkpoint.path))
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            try:
+                stat = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            if (stat.st_dev, stat.st_ino) != (checkpoint.device, checkpoint.inode):
+                continue
+            with open(entry.path, "rb") as f:
+                if _is_checkpointed_file(f, stat, checkpoint):
+                    return entry.path
+    return None
+
+
+def _concat_batches(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate parsed frames, adding up their parse error counts."""
+    df = pd.concat(frames, ignore_index=True)
+    # concat drops attrs that differ between frames
+    errors = ParseErrors()
+    for frame in frames:
+        errors.merge(frame.attrs.get(PARSE_ERRORS_ATTR, {}))
+    df.attrs[PARSE_ERRORS_ATTR] = dict(errors.counts)
+    return df
+
+
+def read_new_entries(
+    log_file_path: str,
+    checkpoint: Optional[LogCheckpoint] = None,
+    log_filter: Optional[LogFilter] = None,
+    line_prefix: Optional[LogLinePrefix] = None,
+) -> Tuple[pd.DataFrame, LogCheckpoint]:
+    """
+    Parse the slow query entries appended to a plain log since a checkpoint
+
+    The last entry in the file is held back, since further continuation
+    lines may still be written to it; it is parsed by the next call.
+
+    Args:
+        log_file_path: Path to the active, uncompressed plain-text log
+        checkpoint: Position returned by the previous call, if any
+        log_filter: Optional entry filters
+        line_prefix: Optional compiled log_line_prefix
+
+    Returns:
+        Tuple of (DataFrame with columns [timestamp, duration_ms, query],
+        checkpoint to pass to the next call)
+
+    Raises:
+        FileNotFoundError: If the log file doesn't exist
+        ValueError: If the log file is compressed
+    """
+    if detect_compression(log_file_path) is not None:
+        raise ValueError(f"Cannot follow a compressed log: {log_file_path}")
+
+    line_prefix = line_prefix or DEFAULT_LINE_PREFIX
+    offset = 0
+    # Lines of the checkpointed trailing entry to flush, and the rest of a
+    # rotated file, parsed before the new bytes
+    leading_lines: List[str] = []
+    rotated = None
+    with open(log_file_path, "rb") as f:
+        stat = os.fstat(f.fileno())
+        if checkpoint is not None and not _is_checkpointed_file(f, stat, checkpoint):
+            rotated = _find_rotated_file(checkpoint)
+            if rotated is not None:
+                logger.info(f"Log rotated; reading the rest of {rotated}")
+            else:
+                logger.info(
+                    "Log rotated and the previous file is gone; "
+                    "flushing its last entry"
+                )
+                leading_lines = checkpoint.pending.splitlines(True)
+        elif checkpoint is not None and stat.st_size < checkpoint.offset:
+            logger.info(f"{log_file_path} was truncated; reading from the start")
+            leading_lines = checkpoint.pending.splitlines(True)
+        elif checkpoint is not None:
+            offset = checkpoint.offset
+
+        cut = _find_last_entry_start(f, offset, stat.st_size, line_prefix)
+        f.seek(cut)
+        pending = f.read(stat.st_size - cut).decode("utf-8", errors="ignore")
+        head_length = min(stat.st_size, _HEAD_BYTES)
+        head_checksum = _head_checksum(f, head_length)
+    df = parse_plain_log_range(
+        log_file_path, offset, cut, log_filter, line_prefix, leading_lines
+    )
+    if rotated is not None:
+        previous = parse_plain_log_range(
+            rotated, checkpoint.offset, None, log_filter, line_prefix
+        )
+        df = _concat_batches([previous, df])
+
+    logger.debug(
+        f"Read {stat.st_size - offset} new bytes from {log_file_path}, "
+        f"{len(df)} entries"
+    )
+    return df, LogCheckpoint(
+        path=log_file_path,
+        device=stat.st_dev,
+        inode=stat.st_ino,
+        offset=cut,
+        pending=pending,
+        head_length=head_length,
+        head_checksum=head_checksum,
+    )
+
+
+def follow_postgres_log(
+    log_file_path: str,
+    checkpoint_path: Optional[str] = None,
+    log_filter: Optional[LogFilter] = None,
+    poll_interval: float = 5.0,
+    line_prefix: Optional[LogLinePrefix] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Tail a plain log, yielding each batch of new slow query entries
+
+    The checkpoint, if a path is given, is saved after the consumer has
+    handled each batch, so an interrupted run resumes without losing or
+    repeating entries.
+
+    Args:
+        log_file_path: Path to the active, uncompressed plain-text log
+        checkpoint_path: Optional file the position is loaded from and saved to
+        log_filter: Optional entry filters
+        poll_interval: Seconds to wait between reads
+        line_prefix: Optional compiled log_line_prefix
+
+    Yields:
+        DataFrames with columns [timestamp, duration_ms, query]
+    """
+    checkpoint = LogCheckpoint.load(checkpoint_path) if checkpoint_path else None
+    while True:
+        df, checkpoint = read_new_entries(
+            log_file_path, checkpoint, log_filter, line_prefix
+        )
+        if not df.empty:
+            yield df
+        if checkpoint_path:
+            checkpoint.save(checkpoint_path)
+        time.sleep(poll_interval)
@@ -0,0 +1,247 @@
+"""
+Compiler for PostgreSQL ``log_line_prefix`` settings.
+
+The server's ``log_line_prefix`` (e.g. ``'%m [%p] %q%u@%d '``) is turned once
+into an anchored regular expression with a named group per escape, followed
+by the message severity (``LOG:  ``). The plain parser uses it to recognise
+entry headers and to capture session fields (user, database, application,
+pid, session id, ...) as typed columns while the line is already being
+matched, so identity filters and grouping need no second pass.
+
+Without a configured prefix the parser keeps its built-in matcher, which only
+requires a timestamp at the start of the line.
+"""
+
+import logging
+import mmap
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import BinaryIO, Dict, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+_DATE_TIME = r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}"
+_TIME_ZONE = r"(?: [A-Za-z0-9+\-:]+)?"
+
+# log_line_prefix escape -> (column name, value regex)
+_ESCAPES: Dict[str, Tuple[str, str]] = {
+    "a": ("application_name", r".*?"),
+    "u": ("user", r".*?"),
+    "d": ("database", r".*?"),
+    "r": ("connection_from", r".*?"),
+    "h": ("remote_host", r".*?"),
+    "b": ("backend_type", r".*?"),
+    "p": ("pid", r"\d+"),
+    "P": ("leader_pid", r"\d*"),
+    "t": ("timestamp", _DATE_TIME),
+    "m": ("timestamp", _DATE_TIME + r"\.\d+"),
+    "n": ("epoch", r"\d+(?:\.\d+)?"),
+    "i": ("command_tag", r".*?"),
+    "e": ("sql_state_code", r"[0-9A-Z]{5}"),
+    "c": ("session_id", r"[0-9a-f]+\.[0-9a-f]+"),
+    "l": ("session_line_num", r"\d+"),
+    "s": ("session_start", _DATE_TIME),
+    "v": ("virtual_transaction_id", r"[^\s\]]*"),
+    "x": ("transaction_id", r"\d+"),
+    "Q": ("query_id", r"-?\d+"),
+}
+# Escapes whose value is followed by the time zone abbreviation
+_ZONED_ESCAPES = frozenset("tms")
+
+# Column dtypes for captured fields; everything else stays a plain string
+_INTEGER_FIELDS = frozenset(
+    ["pid", "leader_pid", "session_line_num", "transaction_id", "query_id"]
+)
+_CATEGORY_FIELDS = frozenset(
+    [
+        "application_name",
+        "user",
+        "database",
+        "remote_host",
+        "backend_type",
+        "command_tag",
+        "sql_state_code",
+    ]
+)
+
+# The severity PostgreSQL writes right after the prefix ("LOG:  ", "DEBUG1:  ")
+_SEVERITY = r"[A-Z]+[0-9]?:  "
+
+_ESCAPE_RE = re.compile(r"%(-?\d+)?(.)")
+
+
+@dataclass(frozen=True)
+class LogLinePrefix:
+    """
+    A compiled log_line_prefix
+
+    Attributes:
+        prefix: The log_line_prefix it was compiled from; None for the
+            built-in timestamp-only matcher
+        entry_start: Regex matched at the start of each line; a match opens
+            a new entry
+        entry_start_bytes: Bytes equivalent anchored with "^" (MULTILINE),
+            for scanning raw buffers
+        fields: Names of the captured columns other than the timestamp
+        anchored: Whether the match ends right before the message text
+        user_index: Position of %u in ``fields``, or -1
+        database_index: Position of %d in ``fields``, or -1
+        pid_index: Position of %p in ``fields``, or -1
+    """
+
+    prefix: Optional[str]
+    entry_start: "re.Pattern[str]"
+    entry_start_bytes: "re.Pattern[bytes]"
+    fields: Tuple[str, ...] = ()
+    anchored: bool = False
+    user_index: int = -1
+    database_index: int = -1
+    pid_index: int = -1
+
+    def header_match(
+        self,
+        data: Union[bytes, mmap.mmap],
+        match: "re.Match[bytes]",
+        errors: str = "ignore",
+    ) -> Optional["re.Match[str]"]:
+        """
+        Re-match an entry header found by ``entry_start_bytes`` as text
+
+        Only the (short) header is decoded, with the ``errors`` handler, so
+        its timestamp and fields can be read as text.
+        """
+        text = data[match.start() : match.end()].decode("utf-8", errors=errors)
+        return self.entry_start.match(text)
+
+    def header_timestamp(
+        self, data: Union[bytes, mmap.mmap], match: "re.Match[bytes]"
+    ) -> Optional[str]:
+        """Timestamp of an entry header found by ``entry_start_bytes``."""
+        text_match = self.header_match(data, match)
+        return self.timestamp(text_match) if text_match is not None else None
+
+    def timestamp(self, match: "re.Match[str]") -> Optional[str]:
+        """The entry timestamp as ``YYYY-MM-DD HH:MM:SS[.fff]`` text."""
+        if "timestamp" in self.entry_start.groupindex:
+            return match.group("timestamp")
+        epoch = match.group("epoch")
+        if epoch is None:
+            return None
+        moment = datetime.fromtimestamp(float(epoch), tz=timezone.utc)
+        return moment.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+
+    def field_values(self, match: "re.Match[str]") -> Tuple[Optional[str], ...]:
+        """The captured session fields of a matching line, in ``fields`` order."""
+        if len(self.fields) == 1:
+            return (match.group(self.fields[0]),)
+        return match.group(*self.fields)
+
+    def identity(
+        self, values: Tuple[Optional[str], ...]
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """The (user, database) among captured field values."""
+        return (
+            values[self.user_index] if self.user_index >= 0 else None,
+            values[self.database_index] if self.database_index >= 0 else None,
+        )
+
+
+def read_line_block(f: BinaryIO, start: int, end: int) -> Tuple[bytes, int]:
+    """
+    Read the bytes [start, end) of a log together with the byte before them
+
+    Scanning the block with ``entry_start_bytes`` from the returned position
+    then only matches "^" at ``start`` when a line really begins there.
+
+    Returns:
+        (block, position of ``start`` in the block)
+    """
+    lead = 1 if start > 0 else 0
+    f.seek(start - lead)
+    return f.read(end - start + lead), lead
+
+
+def compile_log_line_prefix(prefix: str) -> LogLinePrefix:
+    """
+    Compile a PostgreSQL log_line_prefix into an entry matcher
+
+    Args:
+        prefix: The server's log_line_prefix setting, e.g. ``'%m [%p] '``
+
+    Returns:
+        LogLinePrefix capturing every supported escape as a named group
+
+    Raises:
+        ValueError: If the prefix has no timestamp escape (%t, %m or %n)
+    """
+    parts: List[str] = []
+    optional_from: Optional[int] = None
+    fields: List[str] = []
+    seen = set()
+    pos = 0
+    for escape in _ESCAPE_RE.finditer(prefix):
+        parts.append(re.escape(prefix[pos : escape.start()]))
+        pos = escape.end()
+        padding, code = escape.groups()
+        if code == "%":
+            parts.append("%")
+            continue
+        if code == "q":
+            # Non-session processes stop printing the prefix here
+            optional_from = len(parts)
+            continue
+        if code not in _ESCAPES:
+            logger.warning(f"Ignoring unknown log_line_prefix escape %{code}")
+            continue
+        name, value = _ESCAPES[code]
+        group = f"(?:{value})" if name in seen else f"(?P<{name}>{value})"
+        if name not in seen and name not in ("timestamp", "epoch"):
+            fields.append(name)
+        seen.add(name)
+        if code in _ZONED_ESCAPES:
+            group += _TIME_ZONE
+        if padding:
+            # Padded values are filled with spaces on the left (%10u) or the
+            # right (%-10u)
+            group = group + " *" if padding.startswith("-") else " *" + group
+        parts.append(group)
+    parts.append(re.escape(prefix[pos:]))
+
+    if not seen & {"timestamp", "epoch"}:
+        raise ValueError(
+            f"log_line_prefix {prefix!r} has no timestamp escape (%t, %m or %n)"
+        )
+    if optional_from is not None:
+        parts[optional_from:] = ["(?:" + "".join(parts[optional_from:]) + ")?"]
+    pattern = "".join(parts) + _SEVERITY
+    return LogLinePrefix(
+        prefix=prefix,
+        entry_start=re.compile(pattern),
+        entry_start_bytes=re.compile(("^" + pattern).encode(), re.MULTILINE),
+        fields=tuple(fields),
+        anchored=True,
+        user_index=fields.index("user") if "user" in fields else -1,
+        database_index=fields.index("database") if "database" in fields else -1,
+        pid_index=fields.index("pid") if "pid" in fields else -1,
+    )
+
+
+def typed_field_column(
+    name: str, values: Sequence[Optional[str]]
+) -> Union[pd.Categorical, "pd.arrays.IntegerArray", List[Optional[str]]]:
+    """
+    Convert captured values of one prefix field to its column type
+
+    Identifiers are nullable Int64, low-cardinality session attributes are
+    categoricals, and everything else is kept as text. Empty values, which
+    the server writes for unknown fields, become missing values.
+    """
+    if name in _INTEGER_FIELDS:
+        return pd.array([int(v) if v else None for v in values], dtype="Int64")
+    cleaned = [v.strip() or None if v is not None else None for v in values]
+    if name in _CATEGORY_FIELDS:
+        return pd.Categorical(cleaned)
+    return cleaned
@@ -0,0 +1,225 @@
+"""
+Transparent access to compressed log files.
+
+Rotated PostgreSQL logs are commonly kept as gzip, bzip2, xz or zstd files.
+The compression is detected from magic bytes (falling back to the file
+extension) and the log is decompressed as a stream, so no temporary copy is
+ever written to disk. Multi-frame zstd files (as written by ``pzstd`` or
+``zstd --long`` with frame splitting) can additionally be cut at frame
+boundaries for parallel parsing.
+"""
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+import struct
+from pathlib import Path
+from typing import IO, BinaryIO, List, Optional, TextIO, Tuple, cast
+
+from .parse_errors import DECODE_ERRORS
+
+try:
+    import zstandard
+
+    ZSTANDARD_AVAILABLE = True
+except ImportError:
+    zstandard = None  # type: ignore
+    ZSTANDARD_AVAILABLE = False
+
+COMPRESSIONS = ("gzip", "bz2", "xz", "zstd")
+
+_MAGIC_BYTES = (
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"\x28\xb5\x2f\xfd", "zstd"),
+)
+_EXTENSIONS = {
+    ".gz": "gzip",
+    ".bz2": "bz2",
+    ".xz": "xz",
+    ".zst": "zstd",
+    ".zstd": "zstd",
+}
+
+_ZSTD_MAGIC = 0xFD2FB528
+_ZSTD_SKIPPABLE_MASK = 0xFFFFFFF0
+_ZSTD_SKIPPABLE_MAGIC = 0x184D2A50
+
+
+def detect_compression(log_file_path: str) -> Optional[str]:
+    """
+    Detect the compression of a log file
+
+    Args:
+        log_file_path: Path to the log file
+
+    Returns:
+        One of COMPRESSIONS, or None for an uncompressed file
+    """
+    with open(log_file_path, "rb") as f:
+        head = f.read(6)
+    for magic, compression in _MAGIC_BYTES:
+        if head.startswith(magic):
+            return compression
+    if head:
+        # Non-empty content without a known magic is plain text, whatever
+        # the file is called
+        return None
+    return _EXTENSIONS.get(Path(log_file_path).suffix.lower())
+
+
+def _require_zstandard() -> None:
+    if zstandard is None:
+        raise ImportError(
+            "zstandard package not installed; it is required to read .zst logs"
+        )
+
+
+def open_log_binary(log_file_path: str, compression: Optional[str] = None) -> BinaryIO:
+    """Open a log file as a stream of decompressed bytes."""
+    compression = compression or detect_compression(log_file_path)
+    if compression is None:
+        return open(log_file_path, "rb")
+    if compression == "gzip":
+        return gzip.open(log_file_path, "rb")  # type: ignore[return-value]
+    if compression == "bz2":
+        return bz2.open(log_file_path, "rb")  # type: ignore[return-value]
+    if compression == "xz":
+        return lzma.open(log_file_path, "rb")  # type: ignore[return-value]
+    if compression == "zstd":
+        _require_zstandard()
+        reader = zstandard.ZstdDecompressor().stream_reader(
+            open(log_file_path, "rb"), read_across_frames=True, closefd=True
+        )
+        return io.BufferedReader(reader)
+    raise ValueError(f"Unsupported compression: {compression}")
+
+
+def open_log_text(
+    log_file_path: str,
+    compression: Optional[str] = None,
+    newline: Optional[str] = None,
+) -> TextIO:
+    """
+    Open a possibly compressed log file as decoded UTF-8 text
+
+    Undecodable bytes are dropped and counted (see parse_errors.py).
+    """
+    compression = compression or detect_compression(log_file_path)
+    if compression is None:
+        return open(
+            log_file_path, "r", encoding="utf-8", errors=DECODE_ERRORS, newline=newline
+        )
+    return io.TextIOWrapper(
+        open_log_binary(log_file_path, compression),
+        encoding="utf-8",
+        errors=DECODE_ERRORS,
+        newline=newline,
+    )
+
+
+def zstd_frames(log_file_path: str) -> List[Tuple[int, int]]:
+    """
+    List the (offset, length) of every data frame in a zstd file
+
+    Frame sizes are found by walking frame and block headers, without
+    decompressing anything. Skippable frames are left out.
+    """
+    frames: List[Tuple[int, int]] = []
+    size = os.path.getsize(log_file_path)
+    with open(log_file_path, "rb") as f:
+        offset = 0
+        while offset < size:
+            f.seek(offset)
+            (magic,) = struct.unpack("<I", f.read(4))
+            if magic & _ZSTD_SKIPPABLE_MASK == _ZSTD_SKIPPABLE_MAGIC:
+                (skip,) = struct.unpack("<I", f.read(4))
+                offset += 8 + skip
+                continue
+            if magic != _ZSTD_MAGIC:
+                raise ValueError(f"Invalid zstd frame at byte {offset}")
+            length = _zstd_frame_length(f, offset)
+            frames.append((offset, length))
+            offset += length
+    return frames
+
+
+def _zstd_frame_length(f: IO[bytes], offset: int) -> int:
+    """Compute the compressed length of the zstd frame starting at ``offset``."""
+    (descriptor,) = f.read(1)
+    content_size_flag = descriptor >> 6
+    single_segment = bool(descriptor & 0x20)
+    has_checksum = bool(descriptor & 0x04)
+    dictionary_id_size = (0, 1, 2, 4)[descriptor & 0x03]
+    content_size_size = (1 if single_segment else 0, 2, 4, 8)[content_size_flag]
+    header = 5 + (0 if single_segment else 1) + dictionary_id_size + content_size_size
+
+    position = offset + header
+    while True:
+        f.seek(position)
+        block_header = f.read(3)
+        if len(block_header) < 3:
+            raise ValueError(f"Truncated zstd frame at byte {offset}")
+        value = int.from_bytes(block_header, "little")
+        last_block = value & 1
+        block_type = (value >> 1) & 0x03
+        block_size = value >> 3
+        position += 3 + (1 if block_type == 1 else block_size)
+        if last_block:
+            break
+    if has_checksum:
+        position += 4
+    return position - offset
+
+
+class _BoundedReader(io.RawIOBase):
+    """Raw reader over the byte range [offset, offset + length) of a file."""
+
+    def __init__(self, log_file_path: str, offset: int, length: int):
+        self._file = open(log_file_path, "rb")
+        self._file.seek(offset)
+        self._remaining = length
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: "memoryview") -> int:  # type: ignore[override]
+        size = min(len(buffer), self._remaining)
+        if size <= 0:
+            return 0
+        read = self._file.readinto(memoryview(buffer)[:size])
+        self._remaining -= read
+        return read
+
+    def close(self) -> None:
+        self._file.close()
+        super().close()
+
+
+def open_zstd_range_text(
+    log_file_path: str, offset: int, length: Optional[int] = None
+) -> TextIO:
+    """
+    Open decompressed text starting at a zstd frame boundary
+
+    Args:
+        log_file_path: Path to a zstd-compressed log
+        offset: Byte offset of the first frame to decompress
+        length: Compressed bytes to read; defaults to the rest of the file
+    """
+    _require_zstandard()
+    if length is None:
+        length = os.path.getsize(log_file_path) - offset
+    reader = zstandard.ZstdDecompressor().stream_reader(
+        cast(BinaryIO, _BoundedReader(log_file_path, offset, length)),
+        read_across_frames=True,
+        closefd=True,
+    )
+    return io.TextIOWrapper(
+        io.BufferedReader(reader),
+        encoding="utf-8",
+        errors=DECODE_ERRORS,
+    )
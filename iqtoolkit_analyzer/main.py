@@ -8,8 +8,26 @@ import logging
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 
-from .parser import parse_postgres_log, load_config
-from .analyzer import run_slow_query_analysis
+import pandas as pd
+
+from .follow import LogCheckpoint, follow_postgres_log, read_new_entries
+from .log_prefix import compile_log_line_prefix
+from .parser import (
+    LOG_FORMATS,
+    PARSE_ENGINES,
+    LogFilter,
+    parse_postgres_logs,
+    load_config,
+)
+from .progress import default_progress
+from .sampling import SamplePlan
+from .analyzer import (
+    ANALYSIS_COLUMNS,
+    NORMALIZE_MODES,
+    IncrementalAnalysis,
+    run_slow_query_analysis,
+    shared_normalize_cache,
+)
 from .llm_client import LLMClient, LLMConfig
 from .report_generator import ReportGenerator
 
@@ -36,9 +54,17 @@ def postgresql_command(args: argparse.Namespace) -> int:
     logger = logging.getLogger(__name__)
 
     user_config = load_config()
-    log_format = user_config.get("log_format") or "plain"
+    log_format = args.log_format or user_config.get("log_format") or "plain"
+    log_line_prefix = args.log_line_prefix or user_config.get("log_line_prefix")
+    cache_dir = args.cache_dir or user_config.get("cache_dir")
+    normalize_mode = args.normalize or user_config.get("normalize") or "fingerprint"
     configured_top_n = int(user_config.get("top_n") or args.top_n)
     configured_output = user_config.get("output") or args.output
+    configured_min_duration = float(
+        args.min_duration
+        if args.min_duration is not None
+        else user_config.get("min_duration") or 0.0
+    )
 
     llm_defaults = LLMConfig()
     llm_config = LLMConfig(
@@ -52,19 +78,162 @@ def postgresql_command(args: argparse.Namespace) -> int:
         timeout=int(user_config.get("llm_timeout", llm_defaults.timeout)),
     )
 
+    if normalize_mode not in NORMALIZE_MODES:
+        logger.error(f"Unsupported normalize mode: {normalize_mode}")
+        return 1
+    # Normalized statements are kept next to the parse cache for later runs
+    normalize_cache_file = (
+        str(Path(cache_dir) / f"normalize-{normalize_mode}.json") if cache_dir else None
+    )
+    if normalize_cache_file:
+        shared_normalize_cache(normalize_mode).load(normalize_cache_file)
+
     try:
-        logger.info(f"Analyzing {args.log_file}")
+        if args.checkpoint or args.follow:
+            return _postgresql_incremental(
+                args,
+                log_format,
+                log_line_prefix,
+                LogFilter(
+                    min_duration=configured_min_duration,
+                    since=args.since,
+                    until=args.until,
+                    databases=args.database or user_config.get("databases"),
+                    users=args.user or user_config.get("users"),
+                ),
+                configured_top_n,
+                configured_output,
+                llm_config,
+                normalize_mode,
+            )
+
+        logger.info(f"Analyzing {', '.join(args.log_files)}")
 
         # Parse logs
-        df = parse_postgres_log(args.log_file, log_format=log_format)
+        df = parse_postgres_logs(
+            args.log_files,
+            log_format=log_format,
+            workers=args.workers,
+            engine=args.engine,
+            min_duration=configured_min_duration,
+            since=args.since,
+            until=args.until,
+            databases=args.database or user_config.get("databases"),
+            users=args.user or user_config.get("users"),
+            progress=default_progress(quiet=args.quiet),
+            log_line_prefix=log_line_prefix,
+            cache_dir=cache_dir,
+            columns=ANALYSIS_COLUMNS,
+            time_index=args.time_index,
+            sample=(
+                SamplePlan(args.sample, args.sample_keep_above, args.sample_seed)
+                if args.sample
+                else None
+            ),
+        )
 
         if df.empty:
             logger.warning("No slow queries found")
             return 0
 
+        return _write_postgresql_report(
+            df,
+            configured_top_n,
+            configured_min_duration,
+            configured_output,
+            llm_config,
+            normalize_mode,
+        )
+
+    except FileNotFoundError as e:
+        logger.error(f"File not found: {e}")
+        return 1
+    except Exception as e:
+        logger.error(f"Error: {e}")
+        return 1
+    finally:
+        if normalize_cache_file:
+            shared_normalize_cache(normalize_mode).save(normalize_cache_file)
+
+
+def _postgresql_incremental(
+    args: argparse.Namespace,
+    log_format: str,
+    log_line_prefix: Optional[str],
+    log_filter: LogFilter,
+    top_n: int,
+    output: str,
+    llm_config: LLMConfig,
+    normalize_mode: str,
+) -> int:
+    """Analyze only the entries appended since --checkpoint, or tail with --follow."""
+    logger = logging.getLogger(__name__)
+    if len(args.log_files) != 1 or log_format != "plain":
+        logger.error("--checkpoint and --follow need a single plain-text log file")
+        return 1
+    log_file = args.log_files[0]
+    line_prefix = compile_log_line_prefix(log_line_prefix) if log_line_prefix else None
+
+    if args.follow:
+        logger.info(f"Following {log_file} (Ctrl-C to stop)")
+        # Batches are merged into running group statistics, and groups keep
+        # the recommendation they got when they first entered the top_n
+        analysis = IncrementalAnalysis(normalize_mode, log_filter.min_duration)
+        recommendations: Dict[str, str] = {}
+        try:
+            for batch in follow_postgres_log(
+                log_file, args.checkpoint, log_filter, args.poll_interval, line_prefix
+            ):
+                logger.info(f"{len(batch)} new slow query entries")
+                analysis.add_frame(batch)
+                try:
+                    top_queries, summary = analysis.result(top_n)
+                except ValueError as analysis_error:
+                    logger.warning(str(analysis_error))
+                    continue
+                status = _write_analysis_report(
+                    top_queries, summary, output, llm_config, recommendations
+                )
+                if status != 0:
+                    return status
+        except KeyboardInterrupt:
+            logger.info("Stopped following")
+        return 0
+
+    checkpoint = LogCheckpoint.load(args.checkpoint)
+    df, checkpoint = read_new_entries(log_file, checkpoint, log_filter, line_prefix)
+    if df.empty:
+        logger.warning("No new slow queries since the last checkpoint")
+        status = 0
+    else:
+        status = _write_postgresql_report(
+            df, top_n, log_filter.min_duration, output, llm_config, normalize_mode
+        )
+    # Only move the checkpoint once the new entries have been reported
+    if status == 0:
+        checkpoint.save(args.checkpoint)
+    return status
+
+
+def _write_postgresql_report(
+    df: pd.DataFrame,
+    configured_top_n: int,
+    configured_min_duration: float,
+    configured_output: str,
+    llm_config: LLMConfig,
+    normalize_mode: str = "fingerprint",
+) -> int:
+    """Analyze parsed entries, ask the LLM for recommendations and write the report."""
+    logger = logging.getLogger(__name__)
+    try:
         # Analyze queries
         try:
-            result = run_slow_query_analysis(df, top_n=configured_top_n)
+            result = run_slow_query_analysis(
+                df,
+                top_n=configured_top_n,
+                min_duration=configured_min_duration,
+                normalize_mode=normalize_mode,
+            )
         except ValueError as analysis_error:
             logger.warning(str(analysis_error))
             return 0
@@ -79,21 +248,56 @@ def postgresql_command(args: argparse.Namespace) -> int:
             logger.error("Unexpected return type from analysis")
             return 1
 
+        return _write_analysis_report(
+            top_queries, summary, configured_output, llm_config
+        )
+
+    except Exception as e:
+        logger.error(f"Error: {e}")
+        return 1
+
+
+def _write_analysis_report(
+    top_queries: pd.DataFrame,
+    summary: Dict[str, float],
+    configured_output: str,
+    llm_config: LLMConfig,
+    recommendation_cache: Optional[Dict[str, str]] = None,
+) -> int:
+    """
+    Ask the LLM for recommendations on the top queries and write the report
+
+    With a ``recommendation_cache`` (keyed by normalized query) only groups
+    not in it are sent to the LLM, and their recommendations are added.
+    """
+    logger = logging.getLogger(__name__)
+    try:
         # Generate AI recommendations
         logger.info("Generating recommendations...")
         llm_client = LLMClient(llm_config)
+        cache = recommendation_cache if recommendation_cache is not None else {}
 
         queries_to_analyze: List[Dict[str, Any]] = []
         for row in top_queries.itertuples(index=False):
+            if str(row.normalized_query) in cache:
+                continue
             queries_to_analyze.append(
                 {
                     "query_text": str(row.example_query),
                     "avg_duration": float(row.avg_duration),
                     "frequency": int(row.frequency),
+                    "normalized_query": str(row.normalized_query),
                 }
             )
 
-        recommendations = llm_client.batch_generate_recommendations(queries_to_analyze)
+        for query, recommendation in zip(
+            queries_to_analyze,
+            llm_client.batch_generate_recommendations(queries_to_analyze),
+        ):
+            cache[query["normalized_query"]] = recommendation
+        recommendations = [
+            cache[str(query)] for query in top_queries["normalized_query"]
+        ]
 
         # Generate report
         report_gen = ReportGenerator(llm_client)
@@ -110,9 +314,6 @@ def postgresql_command(args: argparse.Namespace) -> int:
         logger.info("Analysis complete!")
         return 0
 
-    except FileNotFoundError as e:
-        logger.error(f"File not found: {e}")
-        return 1
     except Exception as e:
         logger.error(f"Error: {e}")
         return 1
@@ -277,6 +478,9 @@ Examples:
   # Analyze PostgreSQL log file
   %(prog)s postgresql /path/to/slow.log
 
+  # Analyze a day of hourly logs from several replicas
+  %(prog)s postgresql 'logs/replica-*/postgresql-2025-11-01_*.log' --workers 8
+
   # Analyze MongoDB database with connection string
   %(prog)s mongodb --connection-string "mongodb://localhost:27017" --database myapp
 
@@ -307,9 +511,36 @@ Examples:
         help="Analyze PostgreSQL slow query logs",
     )
     pg_parser.add_argument(
-        "log_file",
+        "log_files",
+        metavar="log_file",
         type=str,
-        help="Path to PostgreSQL slow query log file",
+        nargs="+",
+        help="PostgreSQL log files, glob patterns or directories; several files "
+        "are parsed in parallel and merged by timestamp",
+    )
+    pg_parser.add_argument(
+        "--log-format",
+        choices=LOG_FORMATS,
+        default=None,
+        help="Log format; use csvlog or jsonlog for PostgreSQL's "
+        "log_destination = 'csvlog' or 'jsonlog' "
+        "(default: log_format from config, else plain)",
+    )
+    pg_parser.add_argument(
+        "--log-line-prefix",
+        metavar="PREFIX",
+        default=None,
+        help="The server's log_line_prefix (e.g. '%%m [%%p] %%q%%u@%%d '); entry "
+        "headers are matched against it and its fields become columns "
+        "(default: log_line_prefix from config)",
+    )
+    pg_parser.add_argument(
+        "--cache-dir",
+        metavar="DIR",
+        default=None,
+        help="Keep parsed logs in DIR and reuse them while the log file is "
+        "unchanged (requires pyarrow), along with the normalized form of each "
+        "distinct statement (default: cache_dir from config, else off)",
     )
     pg_parser.add_argument(
         "--output",
@@ -323,6 +554,110 @@ Examples:
         default=5,
         help="Number of top slow queries to analyze (default: 5)",
     )
+    pg_parser.add_argument(
+        "--min-duration",
+        type=float,
+        default=None,
+        help="Ignore queries faster than this many milliseconds; applied while "
+        "parsing (default: min_duration from config, else 0)",
+    )
+    pg_parser.add_argument(
+        "--since",
+        metavar="TIME",
+        help="Only analyze entries logged at or after TIME (e.g. "
+        "'2025-11-01 14:00'); plain logs are seeked to the window instead of "
+        "scanned",
+    )
+    pg_parser.add_argument(
+        "--until",
+        metavar="TIME",
+        help="Only analyze entries logged before TIME",
+    )
+    pg_parser.add_argument(
+        "--time-index",
+        action="store_true",
+        help="Keep a per-minute offset index next to each plain log "
+        "(<log>.timeindex) to speed up repeated --since/--until runs",
+    )
+    pg_parser.add_argument(
+        "--database",
+        action="append",
+        help="Only analyze queries from this database (repeatable)",
+    )
+    pg_parser.add_argument(
+        "--user",
+        action="append",
+        help="Only analyze queries from this user (repeatable)",
+    )
+    pg_parser.add_argument(
+        "--sample",
+        type=int,
+        metavar="N",
+        default=None,
+        help="First-look mode: analyze every entry slower than "
+        "--sample-keep-above plus a uniform sample of N faster entries per "
+        "log file; frequencies and total times are estimated with 95%% "
+        "confidence intervals",
+    )
+    pg_parser.add_argument(
+        "--sample-keep-above",
+        type=float,
+        metavar="MS",
+        default=10_000.0,
+        help="With --sample, always keep entries at least this many "
+        "milliseconds slow (default: 10000)",
+    )
+    pg_parser.add_argument(
+        "--sample-seed",
+        type=int,
+        default=None,
+        help="Random seed for a reproducible --sample",
+    )
+    pg_parser.add_argument(
+        "--normalize",
+        choices=NORMALIZE_MODES,
+        default=None,
+        help="How queries are normalized into groups: a single-pass SQL lexer "
+        "(fingerprint) or the original regex substitutions (legacy) "
+        "(default: normalize from config, else fingerprint)",
+    )
+    pg_parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Suppress parse progress output (always off when stderr is not a TTY)",
+    )
+    pg_parser.add_argument(
+        "--checkpoint",
+        metavar="FILE",
+        help="Only analyze entries appended since the position saved in FILE, "
+        "then save the new position (single plain-text log)",
+    )
+    pg_parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="Keep tailing the log, rewriting the report as new slow queries "
+        "arrive; resumes from --checkpoint when given",
+    )
+    pg_parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=5.0,
+        help="Seconds between reads in --follow mode (default: 5)",
+    )
+    pg_parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes used to parse log files, or byte ranges of a "
+        "single plain-text log (default: 1)",
+    )
+    pg_parser.add_argument(
+        "--engine",
+        choices=PARSE_ENGINES,
+        default="stream",
+        help="How plain-text logs are read: line stream or memory-mapped byte "
+        "scan (default: stream)",
+    )
 
     # MongoDB subcommand
     mongo_parser = subparsers.add_parser(
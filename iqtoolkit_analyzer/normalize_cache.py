@@ -0,0 +1,130 @@
+"""
+Memoized query normalization.
+
+ORM-heavy workloads log the same raw statement text thousands of times, and
+each occurrence would otherwise be normalized and hashed again. A
+``NormalizeCache`` maps raw statements to their (normalized query, group
+hash) pair, evicting the least recently used statements beyond ``maxsize``.
+
+One cache per normalize mode is shared by every analysis in the process
+(``analyzer.shared_normalize_cache``), so several log files, or the
+repeated reports of ``--follow``, reuse it. With ``--cache-dir`` it is
+also saved next to the parse cache and loaded by the next run.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever normalize_query output changes, so saved caches are ignored
+NORMALIZE_CACHE_VERSION = 2
+
+# Raw statements kept per cache
+DEFAULT_CACHE_SIZE = 65_536
+
+
+class NormalizeCache:
+    """Bounded LRU map from raw statement to (normalized query, group hash)."""
+
+    def __init__(
+        self,
+        normalize: Callable[[str], str],
+        mode: str,
+        maxsize: int = DEFAULT_CACHE_SIZE,
+    ) -> None:
+        if maxsize < 1:
+            raise ValueError("Normalize cache size must be at least 1")
+        self.normalize = normalize
+        self.mode = mode
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+        # Whether entries were added since the cache was loaded or saved
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, statement: str) -> Tuple[str, str]:
+        """Normalized form and group hash of a raw statement."""
+        entry = self._entries.get(statement)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(statement)
+            return entry
+        self.misses += 1
+        entry = self._add(statement, self.normalize(statement))
+        self._dirty = True
+        return entry
+
+    def _add(self, statement: str, normalized: str) -> Tuple[str, str]:
+        entry = (normalized, hashlib.md5(normalized.encode()).hexdigest())
+        self._entries[statement] = entry
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return entry
+
+    def stats(self) -> Dict[str, int]:
+        """Hit and miss counters and the current number of entries."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self)}
+
+    def save(self, cache_path: str) -> None:
+        """
+        Write the entries atomically, least recently used first
+
+        Skipped when nothing was added since the last load or save. If the
+        write fails it is logged and the next run starts with a cold cache.
+        """
+        if not self._dirty:
+            return
+        target = Path(cache_path)
+        temporary = target.with_name(target.name + ".tmp")
+        payload = {
+            "version": NORMALIZE_CACHE_VERSION,
+            "mode": self.mode,
+            "entries": [[raw, entry[0]] for raw, entry in self._entries.items()],
+        }
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            temporary.write_text(json.dumps(payload))
+            os.replace(temporary, target)
+        except OSError as e:
+            logger.warning(f"Could not write normalize cache {cache_path}: {e}")
+            return
+        self._dirty = False
+        logger.debug(f"Stored {len(self)} normalized statements in {cache_path}")
+
+    def load(self, cache_path: str) -> int:
+        """
+        Add the entries of a saved cache, if it matches this mode and version
+
+        Returns:
+            Number of entries added
+        """
+        try:
+            with open(cache_path, "r") as f:
+                payload = json.load(f)
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable normalize cache {cache_path}: {e}")
+            return 0
+        if (
+            not isinstance(payload, dict)
+            or payload.get("version") != NORMALIZE_CACHE_VERSION
+            or payload.get("mode") != self.mode
+        ):
+            return 0
+        added = 0
+        for raw, normalized in (payload.get("entries") or [])[-self.maxsize :]:
+            if raw not in self._entries:
+                self._add(raw, normalized)
+                added += 1
+        return added
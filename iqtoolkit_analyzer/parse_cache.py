@@ -0,0 +1,150 @@
+"""
+On-disk cache of parsed logs.
+
+Re-analysing the same log with another ``top_n``, threshold or LLM setting
+should not pay the parse again. The parsed frame is stored as an
+uncompressed Arrow IPC (Feather v2) file whose name is derived from a
+fingerprint of the log (size, mtime and hashes of its first and last 64KB)
+and the options that change what is parsed. Later runs memory-map that file
+and read only the columns they need.
+
+A log that is rotated (renamed) keeps its fingerprint and still hits the
+cache; one that is appended to gets a new fingerprint and is parsed again.
+Stale cache files are never removed here; the cache directory can be wiped
+at any time.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+import pandas as pd
+
+from .explain import PlanStats
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    pa = None
+    feather = None
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the parser output changes, so old cache files are ignored
+CACHE_FORMAT_VERSION = 1
+
+# Bytes hashed at each end of the log file
+_EDGE_BYTES = 64 * 1024
+
+
+@dataclass(frozen=True)
+class LogFingerprint:
+    """Cheap identity of a log file's content."""
+
+    size: int
+    mtime_ns: int
+    head: str
+    tail: str
+
+    @classmethod
+    def of(cls, log_file_path: str) -> "LogFingerprint":
+        """Fingerprint a file without reading more than its two ends."""
+        with open(log_file_path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            head = hashlib.sha1(f.read(_EDGE_BYTES)).hexdigest()
+            f.seek(max(0, stat.st_size - _EDGE_BYTES))
+            tail = hashlib.sha1(f.read(_EDGE_BYTES)).hexdigest()
+        return cls(stat.st_size, stat.st_mtime_ns, head, tail)
+
+
+def cache_available() -> bool:
+    """Whether pyarrow is installed (``performance`` extra)."""
+    return pa is not None
+
+
+def cache_file_for(log_file_path: str, cache_dir: str, options: Dict[str, Any]) -> Path:
+    """
+    Path of the cache file for a log parsed with the given options
+
+    Args:
+        log_file_path: Path to the log file
+        cache_dir: Directory holding cache files
+        options: JSON-serializable parse options that change the output
+
+    Returns:
+        Path inside ``cache_dir``; the file may not exist yet
+    """
+    key = json.dumps(
+        {
+            "version": CACHE_FORMAT_VERSION,
+            "fingerprint": asdict(LogFingerprint.of(log_file_path)),
+            "options": options,
+        },
+        sort_keys=True,
+    )
+    return Path(cache_dir) / f"{hashlib.sha1(key.encode()).hexdigest()}.arrow"
+
+
+def load_parsed_log(
+    cache_file: Path, columns: Optional[Sequence[str]] = None
+) -> Optional[pd.DataFrame]:
+    """
+    Memory-map a cached parse, reading only the requested columns
+
+    Args:
+        cache_file: Path returned by ``cache_file_for``
+        columns: Columns to load; columns the cache lacks are ignored.
+            Defaults to all columns.
+
+    Returns:
+        The cached DataFrame, or None if there is no usable cache file
+    """
+    if pa is None or not cache_file.exists():
+        return None
+    try:
+        with pa.memory_map(str(cache_file)) as source:
+            table = pa.ipc.open_file(source).read_all()
+        if columns is not None:
+            table = table.select([c for c in columns if c in table.column_names])
+        df = table.to_pandas()
+    except (OSError, pa.ArrowException) as e:
+        logger.warning(f"Ignoring unreadable parse cache {cache_file}: {e}")
+        return None
+    if "plan" in df.columns:
+        df["plan"] = pd.Series(
+            [
+                PlanStats(**json.loads(p)) if isinstance(p, str) else None
+                for p in df["plan"]
+            ],
+            index=df.index,
+            dtype=object,
+        )
+    return df
+
+
+def store_parsed_log(cache_file: Path, df: pd.DataFrame) -> None:
+    """
+    Write a parsed frame to the cache atomically
+
+    A failed write is logged; the next run then parses the log again.
+    """
+    if pa is None:
+        return
+    if "plan" in df.columns:
+        df = df.assign(
+            plan=[json.dumps(asdict(p)) if p is not None else None for p in df["plan"]]
+        )
+    temporary = cache_file.with_name(cache_file.name + ".tmp")
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        feather.write_feather(df, str(temporary), compression="uncompressed")
+        os.replace(temporary, cache_file)
+    except (OSError, pa.ArrowException) as e:
+        logger.warning(f"Could not write parse cache {cache_file}: {e}")
+        return
+    logger.debug(f"Stored {len(df)} parsed entries in {cache_file}")
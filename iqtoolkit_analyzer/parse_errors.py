@@ -0,0 +1,129 @@
+"""
+Accounting of malformed log entries.
+
+Corrupt or truncated logs can hold millions of bad entries, and a warning
+per entry floods the output and slows parsing to a crawl. Parsers count
+bad entries by category in a ``ParseErrors`` instead: the first few of each
+category are logged with details, later ones at most once per
+``_LOG_INTERVAL`` seconds as a running count, and the totals travel with
+the parsed frame (``df.attrs[PARSE_ERRORS_ATTR]``) into the report.
+
+Categories:
+    bad_timestamp: entry timestamp that cannot be converted
+    bad_duration: ``duration:`` value that is not a number
+    truncated: entry cut short by a run of NUL bytes (zero-filled blocks
+        left by a crash); parsing resyncs at the next entry header
+    encoding: byte sequence that is not valid UTF-8 (dropped)
+    malformed: csvlog row that does not start with a timestamp, or JSON
+        line that cannot be decoded at all
+
+Undecodable bytes are counted by the ``DECODE_ERRORS`` codec error handler,
+which otherwise behaves like ``errors="ignore"``.
+"""
+
+import codecs
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Mapping, Tuple
+
+logger = logging.getLogger(__name__)
+
+CATEGORIES = ("bad_timestamp", "bad_duration", "truncated", "encoding", "malformed")
+
+# DataFrame.attrs key holding the error counts of a parse
+PARSE_ERRORS_ATTR = "parse_errors"
+
+# Codec error handler name, for open() and bytes.decode()
+DECODE_ERRORS = "iqtoolkit-count"
+
+# Errors of one category logged with details before only counts are logged
+_LOG_LIMIT = 5
+# Minimum seconds between running-count messages of one category
+_LOG_INTERVAL = 10.0
+
+_decode_errors = 0
+
+
+def _count_decode_error(error: UnicodeError) -> Tuple[str, int]:
+    """Codec error handler: count and drop an undecodable byte sequence."""
+    global _decode_errors
+    if not isinstance(error, UnicodeDecodeError):
+        raise error
+    _decode_errors += 1
+    return "", error.end
+
+
+codecs.register_error(DECODE_ERRORS, _count_decode_error)
+
+
+def decode_error_count() -> int:
+    """Undecodable byte sequences dropped in this process so far."""
+    return _decode_errors
+
+
+@dataclass
+class ParseErrors:
+    """Counts of malformed entries by category, with throttled logging."""
+
+    counts: Dict[str, int] = field(default_factory=dict)
+    _last_logged: Dict[str, float] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def record(self, category: str, detail: str) -> None:
+        """
+        Count one malformed entry
+
+        Args:
+            category: One of CATEGORIES
+            detail: What was wrong, logged for the first few errors only
+        """
+        count = self.counts.get(category, 0) + 1
+        self.counts[category] = count
+        if count <= _LOG_LIMIT:
+            logger.warning(f"Malformed entry ({category}): {detail}")
+            if count == _LOG_LIMIT:
+                logger.warning(
+                    f"Further {category} errors are only counted "
+                    f"(reported at most every {_LOG_INTERVAL:g}s)"
+                )
+            self._last_logged[category] = time.monotonic()
+            return
+        now = time.monotonic()
+        if now - self._last_logged.get(category, 0.0) >= _LOG_INTERVAL:
+            self._last_logged[category] = now
+            logger.warning(f"{count} {category} errors so far")
+
+    def add(self, category: str, count: int) -> None:
+        """Count errors found in bulk, without logging each one."""
+        if count > 0:
+            self.counts[category] = self.counts.get(category, 0) + count
+
+    def merge(self, counts: Mapping[str, int]) -> None:
+        """Add the counts of another parse (e.g. a worker's byte range)."""
+        for category, count in counts.items():
+            self.add(category, count)
+
+    def summary(self) -> str:
+        """Counts as ``category=n`` pairs, in CATEGORIES order."""
+        return ", ".join(
+            f"{category}={self.counts[category]}"
+            for category in sorted(self.counts, key=_category_order)
+            if self.counts[category]
+        )
+
+    def log_summary(self, source: str) -> None:
+        """Log the totals of a finished parse once, if there were errors."""
+        if self.total:
+            logger.warning(
+                f"{source}: {self.total} malformed entries ({self.summary()})"
+            )
+
+
+def _category_order(category: str) -> int:
+    return CATEGORIES.index(category) if category in CATEGORIES else len(CATEGORIES)
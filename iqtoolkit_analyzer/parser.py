@@ -1,15 +1,456 @@
 import re
+import numpy as np
 import pandas as pd
 import logging
-from tqdm import tqdm
 from pathlib import Path
 import yaml
 import json
-import csv
-from typing import Any
+import glob
+import mmap
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import (
+    Any,
+    Collection,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Sized,
+    TextIO,
+    Tuple,
+    Union,
+)
+
+from .explain import PlanStats, parse_plan
+from .log_prefix import (
+    _SEVERITY,
+    LogLinePrefix,
+    compile_log_line_prefix,
+    typed_field_column,
+)
+from .parse_errors import (
+    DECODE_ERRORS,
+    PARSE_ERRORS_ATTR,
+    ParseErrors,
+    decode_error_count,
+)
+from .parse_cache import (
+    cache_available,
+    cache_file_for,
+    load_parsed_log,
+    store_parsed_log,
+)
+from .log_sources import (
+    detect_compression,
+    open_log_binary,
+    open_log_text,
+    open_zstd_range_text,
+    zstd_frames,
+)
+from .progress import NullProgress, ProgressReporter
+from .sampling import SAMPLE_WEIGHT_COLUMN, Reservoir, SamplePlan, sample_frame
+from .time_seek import TIME_INDEX_SUFFIX, seek_time_window
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore
 
 logger = logging.getLogger(__name__)
 
+# orjson decodes JSON lines several times faster than the stdlib when installed
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# A new log entry starts on any line beginning with a "YYYY-MM-DD HH:MM:SS" prefix;
+# every other line is a continuation of the current entry.
+_ENTRY_START_RE = re.compile(
+    r"(?P<timestamp>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(?:\.\d+)?)"
+)
+_DURATION_STATEMENT_RE = re.compile(
+    r"duration: ([\d.]+) ms.*?(?:statement|execute [^:]*): (.*)", re.DOTALL
+)
+# auto_explain entry; the plan (text or JSON) follows on continuation lines
+_DURATION_PLAN_RE = re.compile(r"duration: ([\d.]+) ms\s+plan:(.*)", re.DOTALL)
+
+# Byte-level equivalents used by the mmap engine, which never decodes lines
+# that are discarded
+_ENTRY_START_BYTES_RE = re.compile(
+    rb"^(?P<timestamp>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(?:\.\d+)?)", re.MULTILINE
+)
+# Matcher used when no log_line_prefix is configured
+DEFAULT_LINE_PREFIX = LogLinePrefix(None, _ENTRY_START_RE, _ENTRY_START_BYTES_RE)
+_DURATION_BYTES_RE = re.compile(rb"duration: ([\d.]+) ms")
+_STATEMENT_MARKER = b"statement: "
+_EXECUTE_BYTES_RE = re.compile(rb"execute [^:\n]*: ")
+_PLAN_MARKER = b"plan:"
+
+# With log_statement and log_duration the statement and its duration are
+# separate entries of the same backend, and extended-protocol parameters
+# follow in a "DETAIL:  parameters: ..." entry. These are matched at the start
+# of the message, right after the severity.
+_MESSAGE_START_RE = re.compile(_SEVERITY)
+_CORRELATED_MESSAGE_RE = re.compile(
+    r"(?:statement|execute [^:]*|parameters|duration): "
+)
+_CORRELATED_BYTES_RE = re.compile(
+    rb"(?:statement|execute [^:\n]*|parameters|duration): "
+)
+_STATEMENT_ONLY_RE = re.compile(r"(?:statement|execute [^:]*): (.*)", re.DOTALL)
+_DURATION_ONLY_RE = re.compile(r"duration: ([\d.]+) ms\s*$")
+_PARAMETERS_RE = re.compile(r"parameters: (.*)", re.DOTALL)
+# Backend PID in the default "... [12345] LOG:" prefix
+_PREFIX_PID_RE = re.compile(r"\[(\d+)\]")
+# Statements waiting for their duration, at most one per backend
+_MAX_PENDING_STATEMENTS = 10_000
+
+# Session identity inside the line prefix (e.g. "user=app,db=orders")
+_PREFIX_USER_RE = re.compile(r"\buser=([^,\s\]]*)")
+_PREFIX_DATABASE_RE = re.compile(r"\b(?:db|dbname|database)=([^,\s\]]*)")
+
+PARSE_ENGINES = ("stream", "mmap")
+LOG_FORMATS = ("plain", "csv", "csvlog", "json", "jsonlog")
+
+# PostgreSQL csvlog columns in file order. Servers before 13 write the first
+# 23; 13 adds backend_type and 14 adds leader_pid and query_id.
+CSVLOG_COLUMNS = (
+    "log_time",
+    "user_name",
+    "database_name",
+    "process_id",
+    "connection_from",
+    "session_id",
+    "session_line_num",
+    "command_tag",
+    "session_start_time",
+    "virtual_transaction_id",
+    "transaction_id",
+    "error_severity",
+    "sql_state_code",
+    "message",
+    "detail",
+    "hint",
+    "internal_query",
+    "internal_query_pos",
+    "context",
+    "query",
+    "query_pos",
+    "location",
+    "application_name",
+    "backend_type",
+    "leader_pid",
+    "query_id",
+)
+# csvlog columns that are read, by position, and the names they are given
+_CSVLOG_FIELDS = {
+    CSVLOG_COLUMNS.index("log_time"): "timestamp",
+    CSVLOG_COLUMNS.index("user_name"): "user",
+    CSVLOG_COLUMNS.index("database_name"): "database",
+    CSVLOG_COLUMNS.index("session_id"): "session_id",
+    CSVLOG_COLUMNS.index("message"): "message",
+    CSVLOG_COLUMNS.index("application_name"): "application_name",
+}
+# Rows handed to pandas per csvlog chunk
+_CSVLOG_CHUNK_ROWS = 100_000
+
+# jsonlog keys that are kept (PostgreSQL 15+), and the columns they become
+_JSONLOG_FIELDS = {
+    "session_id": "session_id",
+    "user": "user",
+    "dbname": "database",
+    "application_name": "application_name",
+    "backend_type": "backend_type",
+    "query_id": "query_id",
+}
+# Cheap substring test run on raw jsonlog lines before anything is decoded
+_JSONLOG_DURATION_MARKER = '"message":"duration: '
+
+# Slow statement in the message field of csvlog and jsonlog entries
+_DURATION_MESSAGE_RE = re.compile(
+    r"duration: ([\d.]+) ms\s+(?:statement|execute [^:]*): (.*)", re.DOTALL
+)
+
+# Parallel parsing splits plain logs into byte ranges of at least this size
+_MIN_CHUNK_BYTES = 8 * 1024 * 1024
+# Number of ranges handed out per worker, for load balancing
+_CHUNKS_PER_WORKER = 4
+
+# Text is read in blocks of roughly this size; progress is reported per block
+_READ_BLOCK_HINT = 1024 * 1024
+# The mmap engine reports progress each time it advances this many bytes
+_MMAP_PROGRESS_BYTES = 16 * 1024 * 1024
+
+
+@dataclass
+class LogEntry:
+    """A single slow query entry extracted from a log file."""
+
+    timestamp: str
+    duration_ms: float
+    query: str
+    # Session fields captured by a compiled log_line_prefix, in the order
+    # of field_names
+    fields: Optional[Tuple[Optional[str], ...]] = None
+    field_names: Tuple[str, ...] = ()
+    # Plan statistics of an auto_explain entry, whose query is the plan's
+    # Query Text
+    plan: Optional[PlanStats] = None
+    # Bind parameters from a following "DETAIL:  parameters:" entry
+    parameters: Optional[str] = None
+
+
+@dataclass
+class _EntryColumns:
+    """Raw entry columns collected while parsing, converted to a frame once."""
+
+    timestamps: List[str] = field(default_factory=list)
+    durations: List[float] = field(default_factory=list)
+    queries: List[str] = field(default_factory=list)
+    field_names: Tuple[str, ...] = ()
+    field_rows: List[Tuple[Optional[str], ...]] = field(default_factory=list)
+    # auto_explain plans and bind parameters by row position; most entries
+    # have neither
+    plans: Dict[int, PlanStats] = field(default_factory=dict)
+    parameters: Dict[int, str] = field(default_factory=dict)
+    errors: ParseErrors = field(default_factory=ParseErrors)
+    # With a sample plan, entries faster than its keep_above wait in the
+    # reservoir until close_sample(); every row then has a weight
+    sample: Optional[SamplePlan] = None
+    reservoir: Optional[Reservoir[LogEntry]] = None
+    weights: List[float] = field(default_factory=list)
+    # Split correlator of a byte range and its accepted unresolved entries
+    # with the row they belong before (see _join_range_columns)
+    correlator: Optional["_StatementCorrelator"] = field(default=None, compare=False)
+    unresolved_rows: List[Tuple[int, LogEntry]] = field(
+        default_factory=list, compare=False
+    )
+
+    @classmethod
+    def for_filter(
+        cls, log_filter: Optional["LogFilter"], salt: int = 0
+    ) -> "_EntryColumns":
+        """Empty columns that apply the filter's sample plan, if any."""
+        sample = log_filter.sample if log_filter is not None else None
+        if sample is None:
+            return cls()
+        return cls(sample=sample, reservoir=Reservoir(sample.size, sample.rng(salt)))
+
+    def __len__(self) -> int:
+        return len(self.durations)
+
+    def append(self, entry: LogEntry, weight: float = 1.0) -> None:
+        if self.sample is not None:
+            if self.reservoir is not None and (
+                entry.duration_ms < self.sample.keep_above
+            ):
+                self.reservoir.offer(entry)
+                return
+            self.weights.append(weight)
+        self.timestamps.append(entry.timestamp)
+        self.durations.append(entry.duration_ms)
+        self.queries.append(entry.query)
+        if entry.plan is not None:
+            self.plans[len(self.durations) - 1] = entry.plan
+        if entry.parameters is not None:
+            self.parameters[len(self.durations) - 1] = entry.parameters
+        if entry.fields is not None:
+            self.field_names = entry.field_names
+            self.field_rows.append(entry.fields)
+
+    def extend(self, other: "_EntryColumns") -> None:
+        self.extend_rows(other, 0, len(other))
+        self.errors.merge(other.errors.counts)
+
+    def extend_rows(self, other: "_EntryColumns", start: int, stop: int) -> None:
+        """Append rows [start, stop) of ``other``, without its error counts."""
+        offset = len(self) - start
+        for position, plan in other.plans.items():
+            if start <= position < stop:
+                self.plans[offset + position] = plan
+        for position, parameters in other.parameters.items():
+            if start <= position < stop:
+                self.parameters[offset + position] = parameters
+        self.timestamps.extend(other.timestamps[start:stop])
+        self.durations.extend(other.durations[start:stop])
+        self.queries.extend(other.queries[start:stop])
+        self.weights.extend(other.weights[start:stop])
+        if other.field_rows:
+            self.field_names = other.field_names
+            self.field_rows.extend(other.field_rows[start:stop])
+
+    def close_sample(self) -> None:
+        """Move the reservoir's entries into the columns, weighted."""
+        reservoir, self.reservoir = self.reservoir, None
+        if reservoir is None:
+            return
+        weight = reservoir.weight
+        for entry in sorted(reservoir.items, key=lambda entry: entry.timestamp):
+            self.append(entry, weight)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Build the parser DataFrame with one vectorized conversion per column."""
+        self.close_sample()
+        timestamps = pd.to_datetime(
+            pd.Series(self.timestamps, dtype=object),
+            format="ISO8601",
+            errors="coerce",
+        )
+        df = pd.DataFrame(
+            {
+                "timestamp": timestamps,
+                "duration_ms": np.asarray(self.durations, dtype=np.float64),
+                "query": self.queries,
+                **{
+                    name: typed_field_column(name, values)
+                    for name, values in zip(self.field_names, zip(*self.field_rows))
+                },
+            }
+        )
+        if self.plans:
+            df["plan"] = pd.Series(
+                [self.plans.get(i) for i in range(len(df))], dtype=object
+            )
+        if self.parameters:
+            df["parameters"] = pd.Series(
+                [self.parameters.get(i) for i in range(len(df))], dtype=object
+            )
+        if self.sample is not None:
+            df[SAMPLE_WEIGHT_COLUMN] = np.asarray(self.weights, dtype=np.float64)
+        malformed = df["timestamp"].isna()
+        if malformed.any():
+            for position in np.flatnonzero(malformed.to_numpy()):
+                self.errors.record(
+                    "bad_timestamp", f"timestamp {self.timestamps[position]!r}"
+                )
+            df = df[~malformed].reset_index(drop=True)
+        df.attrs[PARSE_ERRORS_ATTR] = dict(self.errors.counts)
+        return df
+
+
+def _normalize_time_bound(value: Union[str, datetime, None]) -> Optional[str]:
+    """Render a time bound in the log's own timestamp layout for string compares."""
+    if value is None:
+        return None
+    ts = pd.Timestamp(value)
+    text = str(ts.strftime("%Y-%m-%d %H:%M:%S"))
+    if ts.microsecond:
+        text += f".{ts.microsecond:06d}".rstrip("0")
+    return text
+
+
+@dataclass
+class LogFilter:
+    """
+    Entry filters applied while parsing, before timestamps are converted or
+    statement text is copied.
+
+    Time bounds are compared as strings against the log's
+    ``YYYY-MM-DD HH:MM:SS.mmm`` timestamps; ``since`` is inclusive and
+    ``until`` exclusive. Database and user filters match the ``db=``/``user=``
+    fields of the log line prefix. An optional ``sample`` plan is applied to
+    the entries that pass every filter (see sampling.py).
+    """
+
+    min_duration: float = 0.0
+    since: Union[str, datetime, None] = None
+    until: Union[str, datetime, None] = None
+    databases: Optional[Collection[str]] = None
+    users: Optional[Collection[str]] = None
+    sample: Optional[SamplePlan] = None
+    _databases: FrozenSet[str] = field(init=False, repr=False)
+    _users: FrozenSet[str] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.since = _normalize_time_bound(self.since)
+        self.until = _normalize_time_bound(self.until)
+        self._databases = frozenset(self.databases or ())
+        self._users = frozenset(self.users or ())
+
+    @property
+    def filters_identity(self) -> bool:
+        """Whether entries must be matched against a database or user."""
+        return bool(self._databases or self._users)
+
+    def accepts_time(self, timestamp: str) -> bool:
+        """Check a raw log timestamp against the time window."""
+        if self.since is not None and timestamp < str(self.since):
+            return False
+        if self.until is not None and timestamp >= str(self.until):
+            return False
+        return True
+
+    def accepts_identity(
+        self, user: Optional[str] = None, database: Optional[str] = None
+    ) -> bool:
+        """Check session user and database against the identity filters."""
+        if self._users and user not in self._users:
+            return False
+        if self._databases and database not in self._databases:
+            return False
+        return True
+
+    def accepts_prefix(self, prefix: str) -> bool:
+        """Check the identity fields found in a log line prefix."""
+        if not self.filters_identity:
+            return True
+        user = _PREFIX_USER_RE.search(prefix)
+        database = _PREFIX_DATABASE_RE.search(prefix)
+        return self.accepts_identity(
+            user.group(1) if user else None,
+            database.group(1) if database else None,
+        )
+
+    def accepts(self, timestamp: str, duration_ms: float, prefix: str = "") -> bool:
+        """Check an entry header against every filter, cheapest first."""
+        return (
+            duration_ms >= self.min_duration
+            and self.accepts_time(timestamp)
+            and self.accepts_prefix(prefix)
+        )
+
+    def accepts_fields(
+        self,
+        timestamp: str,
+        duration_ms: float,
+        user: Optional[str] = None,
+        database: Optional[str] = None,
+    ) -> bool:
+        """Check an entry whose session fields a log_line_prefix captured."""
+        return (
+            duration_ms >= self.min_duration
+            and self.accepts_time(timestamp)
+            and self.accepts_identity(user, database)
+        )
+
+    def frame_mask(self, df: pd.DataFrame) -> "pd.Series[bool]":
+        """
+        Vectorized accepts() over a frame of raw entries
+
+        Args:
+            df: Frame with string ``timestamp``, float ``duration_ms`` and,
+                when identity filters are set, ``user`` and ``database`` columns
+
+        Returns:
+            Boolean Series, True for entries that pass every filter
+        """
+        mask = df["duration_ms"] >= self.min_duration
+        if self.since is not None:
+            mask &= df["timestamp"] >= str(self.since)
+        if self.until is not None:
+            mask &= df["timestamp"] < str(self.until)
+        if self._users:
+            mask &= df["user"].isin(list(self._users))
+        if self._databases:
+            mask &= df["database"].isin(list(self._databases))
+        return mask
+
 
 def load_config(config_path: str = ".iqtoolkit-analyzer.yml") -> dict[str, Any]:
     """Load YAML config file if present."""
@@ -20,16 +461,1440 @@ def load_config(config_path: str = ".iqtoolkit-analyzer.yml") -> dict[str, Any]:
     return {}
 
 
-def parse_postgres_log(log_file_path: str, log_format: str = "plain") -> pd.DataFrame:
+def _parse_duration(
+    duration: Union[str, bytes], errors: ParseErrors
+) -> Optional[float]:
+    """Convert a captured duration, counting malformed values."""
+    try:
+        return float(duration)
+    except ValueError:
+        errors.record("bad_duration", f"duration {duration!r}")
+        return None
+
+
+class _StatementCorrelator:
+    """
+    Joins statements and durations logged as separate entries
+
+    With ``log_statement`` and ``log_duration`` a backend logs
+    ``statement: ...`` (or ``execute <name>: ...``) when a query starts and
+    ``duration: ... ms`` when it ends, with other backends' entries in
+    between. Statements wait in a table keyed by backend PID until their
+    duration arrives; a backend runs one statement at a time, so a new
+    statement replaces the pending one. Past ``max_pending`` backends the
+    oldest statement is dropped.
+
+    ``DETAIL:  parameters: ...`` entries directly follow the statement they
+    belong to, so the last complete entry is held back until the next entry
+    shows whether parameters come with it.
+
+    A ``split`` correlator parses one byte range of a log split for
+    ``--workers``, whose pairs may start in an earlier range. The first
+    duration of each backend with no statement of its own in the range
+    becomes an unresolved entry without a query, parameters before the
+    first entry are kept as ``head_parameters``, and the held entry is left
+    in place at the end; ``_join_range_columns`` completes them from the
+    neighbouring ranges.
+    """
+
+    def __init__(
+        self, max_pending: int = _MAX_PENDING_STATEMENTS, split: bool = False
+    ) -> None:
+        self.pending: "OrderedDict[Optional[str], LogEntry]" = OrderedDict()
+        self.max_pending = max_pending
+        self.dropped = 0
+        self.held: Optional[LogEntry] = None
+        # Entry the next parameters entry belongs to
+        self.last: Optional[LogEntry] = None
+        self.split = split
+        # Whether any entry other than parameters was seen
+        self.started = False
+        self.head_parameters: Optional[str] = None
+        # (pid, entry) of durations whose statement may precede the range
+        self.unresolved: List[Tuple[Optional[str], LogEntry]] = []
+        # Backends that logged a statement or an unresolved duration
+        self.seen_pids: Set[Optional[str]] = set()
+
+    def hold(self, entry: LogEntry) -> None:
+        self.started = True
+        self.held = self.last = entry
+
+    def release(self) -> Optional[LogEntry]:
+        """Return the held entry; nothing follows it any more."""
+        self.started = True
+        held, self.held, self.last = self.held, None, None
+        return held
+
+    def finish(self) -> Optional[LogEntry]:
+        """Release the held entry at the end of the input, unless split."""
+        return None if self.split else self.release()
+
+    def statement(self, pid: Optional[str], timestamp: str, query: str) -> None:
+        self.started = True
+        entry = LogEntry(timestamp=timestamp, duration_ms=0.0, query=query)
+        self.pending.pop(pid, None)
+        self.pending[pid] = entry
+        if len(self.pending) > self.max_pending:
+            self.pending.popitem(last=False)
+            self.dropped += 1
+        if self.split:
+            self.seen_pids.add(pid)
+        self.last = entry
+
+    def parameters(self, parameters: str) -> None:
+        if self.last is not None:
+            self.last.parameters = parameters
+        elif self.split and not self.started:
+            self.head_parameters = parameters
+
+    def duration(self, pid: Optional[str]) -> Optional[LogEntry]:
+        """Take the pending statement a duration entry belongs to."""
+        self.started = True
+        entry = self.pending.pop(pid, None)
+        if entry is None and self.split and pid not in self.seen_pids:
+            self.seen_pids.add(pid)
+            entry = LogEntry(timestamp="", duration_ms=0.0, query="")
+            self.unresolved.append((pid, entry))
+        return entry
+
+
+def _message_start(
+    line: str, start: "re.Match[str]", line_prefix: LogLinePrefix
+) -> int:
+    """Position of the message text after the severity, or -1."""
+    if line_prefix.anchored:
+        return start.end()
+    severity = _MESSAGE_START_RE.search(line, start.end())
+    return severity.end() if severity is not None else -1
+
+
+def _correlate_entry(
+    correlator: _StatementCorrelator,
+    start: "re.Match[str]",
+    header: str,
+    message_pos: int,
+    continuation: List[str],
+    log_filter: LogFilter,
+    line_prefix: LogLinePrefix,
+    errors: ParseErrors,
+) -> Iterator[LogEntry]:
+    """Feed a statement-only, duration-only or parameters entry to the correlator."""
+    message = header[message_pos:]
+    parameters = _PARAMETERS_RE.match(message)
+    if parameters is not None:
+        correlator.parameters("".join([parameters.group(1), *continuation]).strip())
+        return
+    held = correlator.release()
+    if held is not None:
+        yield held
+
+    timestamp = line_prefix.timestamp(start)
+    if timestamp is None:
+        return
+    fields = line_prefix.field_values(start) if line_prefix.fields else None
+    if fields is not None:
+        pid = fields[line_prefix.pid_index] if line_prefix.pid_index >= 0 else None
+    else:
+        pid_match = _PREFIX_PID_RE.search(header, start.end(), message_pos)
+        pid = pid_match.group(1) if pid_match is not None else None
+
+    statement = _STATEMENT_ONLY_RE.match(message)
+    if statement is not None:
+        query = "".join([statement.group(1), *continuation]).strip()
+        correlator.statement(pid, timestamp, query)
+        return
+    duration = _DURATION_ONLY_RE.match(message)
+    if duration is None:
+        return
+    entry = correlator.duration(pid)
+    duration_ms = _parse_duration(duration.group(1), errors)
+    if entry is None or duration_ms is None:
+        return
+    if fields is not None:
+        accepted = log_filter.accepts_fields(
+            timestamp, duration_ms, *line_prefix.identity(fields)
+        )
+    else:
+        accepted = log_filter.accepts(timestamp, duration_ms, header[:message_pos])
+    if accepted:
+        # Timed like combined entries: when the statement finished
+        entry.timestamp = timestamp
+        entry.duration_ms = duration_ms
+        entry.fields = fields
+        entry.field_names = line_prefix.fields
+        yield entry
+
+
+def _finish_plain_entry(
+    timestamp: str,
+    duration_ms: float,
+    statement_lines: List[str],
+    line_prefix: LogLinePrefix,
+    fields: Optional[Tuple[Optional[str], ...]],
+    is_plan: bool = False,
+) -> Optional[LogEntry]:
+    """
+    Build a LogEntry from the buffered lines of one slow query entry
+
+    For an auto_explain entry the lines hold the plan; None is returned if
+    it carries no query text (auto_explain.log_format without Query Text).
+    """
+    plan = None
+    if is_plan:
+        query, plan = parse_plan(statement_lines)
+        if query is None:
+            return None
+    else:
+        query = "".join(statement_lines).strip()
+    return LogEntry(
+        timestamp=timestamp,
+        duration_ms=duration_ms,
+        query=query,
+        fields=fields,
+        field_names=line_prefix.fields,
+        plan=plan,
+    )
+
+
+def _resync_lines(
+    lines: Iterable[str], line_prefix: LogLinePrefix, errors: ParseErrors
+) -> Iterator[str]:
+    """
+    Pass log lines through, cutting out runs of NUL bytes
+
+    A crash can leave zero-filled blocks in a log, and later entries are
+    appended right after them without a line break. A line holding NULs is
+    cut at the first one, which ends the entry it belongs to; lines are then
+    skipped up to the next entry header, which may directly follow the NULs.
+    """
+    match_start = line_prefix.entry_start.match
+    lines = iter(lines)
+    for line in lines:
+        if "\x00" not in line:
+            yield line
+            continue
+        head = line[: line.index("\x00")]
+        errors.record("truncated", f"NUL bytes after {head[:80]!r}")
+        if head:
+            yield head + "\n"
+        rest: Optional[str] = line[line.rindex("\x00") + 1 :]
+        while rest is not None and match_start(rest) is None:
+            rest = next(lines, None)
+            if rest is not None and "\x00" in rest:
+                rest = rest[rest.rindex("\x00") + 1 :]
+        if rest is not None:
+            yield rest
+
+
+def iter_plain_log_entries(
+    lines: Iterable[str],
+    log_filter: Optional[LogFilter] = None,
+    line_prefix: Optional[LogLinePrefix] = None,
+    errors: Optional[ParseErrors] = None,
+    correlator: Optional[_StatementCorrelator] = None,
+) -> Iterator[LogEntry]:
+    """
+    Incrementally parses plain PostgreSQL log lines into slow query entries
+
+    Entry boundaries are tracked with a small state machine keyed on the
+    timestamp prefix: a timestamped line opens a new entry, any other line
+    continues the current one. Only entries whose header carries both a
+    ``duration:`` and a ``statement:`` marker are buffered, so memory stays
+    bounded by the largest single statement rather than the size of the log.
+    Entries rejected by ``log_filter`` are dropped at their header line.
+    auto_explain ``duration: ... plan:`` entries are buffered the same way and
+    their plan statistics are attached to the entry (see explain.py).
+    Statements and durations logged as separate entries are joined by
+    backend PID, and ``DETAIL:  parameters:`` entries are attached to the
+    statement they follow (see ``_StatementCorrelator``). Entries cut short
+    by NUL bytes end at the first one, and parsing resumes at the next entry
+    header (see ``_resync_lines``).
+
+    With a compiled ``line_prefix`` only lines matching the whole prefix and
+    a severity open an entry, the duration must follow immediately, and the
+    prefix fields are attached to each entry.
+
+    Args:
+        lines: Iterable of log lines, e.g. an open text file
+        log_filter: Optional filters applied before an entry is buffered
+        line_prefix: Optional compiled log_line_prefix (see log_prefix.py)
+        errors: Optional counter of malformed entries (see parse_errors.py)
+        correlator: Optional correlator to use, left with its pending
+            statements (and, if split, its held and unresolved entries)
+            when the lines run out
+
+    Yields:
+        LogEntry for every slow query entry, in log order
+    """
+    log_filter = log_filter or LogFilter()
+    line_prefix = line_prefix or DEFAULT_LINE_PREFIX
+    errors = errors if errors is not None else ParseErrors()
+    correlator = correlator if correlator is not None else _StatementCorrelator()
+    match_start = line_prefix.entry_start.match
+    # A compiled prefix ends right where the message starts
+    find_header = (
+        _DURATION_STATEMENT_RE.match
+        if line_prefix.anchored
+        else _DURATION_STATEMENT_RE.search
+    )
+    find_plan = (
+        _DURATION_PLAN_RE.match if line_prefix.anchored else _DURATION_PLAN_RE.search
+    )
+    timestamp: Optional[str] = None
+    duration_ms = 0.0
+    fields: Optional[Tuple[Optional[str], ...]] = None
+    is_plan = False
+    statement_lines: List[str] = []
+    # Header of a buffered entry that is fed to the correlator when complete
+    correlated: Optional[Tuple["re.Match[str]", str, int]] = None
+
+    for line in _resync_lines(lines, line_prefix, errors):
+        start = match_start(line)
+        if start is None:
+            # Continuation line: only kept while inside a slow query entry
+            if timestamp is not None or correlated is not None:
+                statement_lines.append(line)
+            continue
+
+        if timestamp is not None:
+            entry = _finish_plain_entry(
+                timestamp, duration_ms, statement_lines, line_prefix, fields, is_plan
+            )
+            if entry is not None:
+                correlator.hold(entry)
+            timestamp = None
+            statement_lines = []
+        elif correlated is not None:
+            yield from _correlate_entry(
+                correlator,
+                *correlated,
+                statement_lines,
+                log_filter,
+                line_prefix,
+                errors,
+            )
+            correlated = None
+            statement_lines = []
+
+        header = find_header(line, start.end())
+        if header is None:
+            header = find_plan(line, start.end())
+        if header is None:
+            message_pos = _message_start(line, start, line_prefix)
+            if message_pos >= 0 and _CORRELATED_MESSAGE_RE.match(line, message_pos):
+                correlated = (start, line, message_pos)
+                continue
+            held = correlator.release()
+            if held is not None:
+                yield held
+            continue
+        is_plan = header.re is _DURATION_PLAN_RE
+        held = correlator.release()
+        if held is not None:
+            yield held
+        duration = _parse_duration(header.group(1), errors)
+        entry_timestamp = line_prefix.timestamp(start)
+        if duration is None or entry_timestamp is None:
+            continue
+        if line_prefix.fields:
+            fields = line_prefix.field_values(start)
+            accepted = log_filter.accepts_fields(
+                entry_timestamp, duration, *line_prefix.identity(fields)
+            )
+        else:
+            fields = None
+            accepted = log_filter.accepts(
+                entry_timestamp, duration, line[: header.start()]
+            )
+        if not accepted:
+            continue
+
+        timestamp = entry_timestamp
+        duration_ms = duration
+        statement_lines = [header.group(2)]
+
+    if timestamp is not None:
+        entry = _finish_plain_entry(
+            timestamp, duration_ms, statement_lines, line_prefix, fields, is_plan
+        )
+        if entry is not None:
+            correlator.hold(entry)
+    elif correlated is not None:
+        yield from _correlate_entry(
+            correlator, *correlated, statement_lines, log_filter, line_prefix, errors
+        )
+    held = correlator.finish()
+    if held is not None:
+        yield held
+    if correlator.dropped:
+        logger.warning(
+            f"Dropped {correlator.dropped} statements whose duration never came "
+            f"(more than {correlator.max_pending} backends pending)"
+        )
+
+
+def _scan_mmap_entry(
+    mm: mmap.mmap,
+    start: "re.Match[bytes]",
+    entry_end: int,
+    log_filter: LogFilter,
+    line_prefix: LogLinePrefix,
+    errors: ParseErrors,
+) -> Tuple[Optional[LogEntry], bool]:
+    """
+    Extract one entry from the mapped bytes, decoding only slow statements
+
+    Returns:
+        (entry, combined): ``combined`` says whether the header holds a
+        duration with its statement or plan; such an entry is None when
+        the filter rejects it. Other entries are left to the correlator.
+    """
+    header_end = mm.find(b"\n", start.end(), entry_end)
+    if header_end < 0:
+        header_end = entry_end
+    duration_pos = mm.find(b"duration: ", start.end(), header_end)
+    if duration_pos < 0 or (line_prefix.anchored and duration_pos != start.end()):
+        return None, False
+    duration = _DURATION_BYTES_RE.match(mm, duration_pos, header_end)
+    if duration is None:
+        return None, False
+    statement_pos = mm.find(_STATEMENT_MARKER, duration.end(), header_end)
+    body_pos = statement_pos + len(_STATEMENT_MARKER)
+    is_plan = False
+    if statement_pos < 0:
+        execute = _EXECUTE_BYTES_RE.search(mm, duration.end(), header_end)
+        if execute is not None:
+            statement_pos, body_pos = execute.start(), execute.end()
+    if statement_pos < 0:
+        plan_pos = mm.find(_PLAN_MARKER, duration.end(), header_end)
+        if plan_pos < 0:
+            return None, False
+        body_pos = plan_pos + len(_PLAN_MARKER)
+        is_plan = True
+    duration_ms = _parse_duration(duration.group(1), errors)
+    if duration_ms is None or duration_ms < log_filter.min_duration:
+        return None, True
+    fields = None
+    if line_prefix.fields:
+        prefix_match = line_prefix.header_match(mm, start, DECODE_ERRORS)
+        timestamp = line_prefix.timestamp(prefix_match) if prefix_match else None
+        if prefix_match is None or timestamp is None:
+            return None, True
+        fields = line_prefix.field_values(prefix_match)
+        if not log_filter.accepts_fields(
+            timestamp, duration_ms, *line_prefix.identity(fields)
+        ):
+            return None, True
+    else:
+        timestamp = start.group("timestamp").decode("ascii")
+        prefix = ""
+        if log_filter.filters_identity:
+            prefix = mm[start.end() : duration_pos].decode(
+                "utf-8", errors=DECODE_ERRORS
+            )
+        if not log_filter.accepts(timestamp, duration_ms, prefix):
+            return None, True
+    text = mm[body_pos:entry_end].decode("utf-8", errors=DECODE_ERRORS)
+    if is_plan:
+        entry = _finish_plain_entry(
+            timestamp,
+            duration_ms,
+            text.splitlines(True),
+            line_prefix,
+            fields,
+            is_plan=True,
+        )
+        return entry, True
+    entry = LogEntry(
+        timestamp=timestamp,
+        duration_ms=duration_ms,
+        query=text.strip(),
+        fields=fields,
+        field_names=line_prefix.fields,
+    )
+    return entry, True
+
+
+def _correlate_mmap_entry(
+    mm: mmap.mmap,
+    start: "re.Match[bytes]",
+    entry_end: int,
+    correlator: _StatementCorrelator,
+    log_filter: LogFilter,
+    line_prefix: LogLinePrefix,
+    errors: ParseErrors,
+) -> Iterator[LogEntry]:
+    """Decode an entry for the correlator if its header may need correlating."""
+    header_end = mm.find(b"\n", start.end(), entry_end)
+    if header_end < 0:
+        header_end = entry_end
+    if _CORRELATED_BYTES_RE.search(mm, start.end(), header_end) is not None:
+        lines = (
+            mm[start.start() : entry_end]
+            .decode("utf-8", errors=DECODE_ERRORS)
+            .splitlines(True)
+        )
+        text_start = line_prefix.entry_start.match(lines[0])
+        if text_start is not None:
+            message_pos = _message_start(lines[0], text_start, line_prefix)
+            if message_pos >= 0 and _CORRELATED_MESSAGE_RE.match(lines[0], message_pos):
+                yield from _correlate_entry(
+                    correlator,
+                    text_start,
+                    lines[0],
+                    message_pos,
+                    lines[1:],
+                    log_filter,
+                    line_prefix,
+                    errors,
+                )
+                return
+    held = correlator.release()
+    if held is not None:
+        yield held
+
+
+def iter_plain_log_entries_mmap(
+    log_file_path: str,
+    log_filter: Optional[LogFilter] = None,
+    start: int = 0,
+    end: Optional[int] = None,
+    progress: Optional[ProgressReporter] = None,
+    line_prefix: Optional[LogLinePrefix] = None,
+    errors: Optional[ParseErrors] = None,
+    correlator: Optional[_StatementCorrelator] = None,
+) -> Iterator[LogEntry]:
+    """
+    Scans a memory-mapped plain PostgreSQL log for slow query entries
+
+    The file is searched as raw bytes for entry boundaries and
+    ``duration:``/``statement:`` markers; only the timestamp and statement of
+    entries accepted by ``log_filter`` are ever decoded. Connection,
+    checkpoint and other non-statement lines are skipped without copying.
+    Entries holding NUL bytes are decoded and parsed line by line instead,
+    which cuts them short and recovers headers that follow the NULs.
+
+    Args:
+        log_file_path: Path to an uncompressed plain log file
+        log_filter: Optional filters; entries under its duration threshold
+            are skipped undecoded
+        start: First byte of the range to scan
+        end: End of the range to scan (defaults to end of file). Entries whose
+            first line starts inside [start, end) are returned, read to
+            completion even past ``end``.
+        progress: Optional reporter, updated every few megabytes scanned
+        line_prefix: Optional compiled log_line_prefix
+        errors: Optional counter of malformed entries (see parse_errors.py)
+        correlator: Optional correlator to use (see iter_plain_log_entries)
+
+    Yields:
+        LogEntry for every slow query entry, in log order
+    """
+    log_filter = log_filter or LogFilter()
+    progress = progress or NullProgress()
+    line_prefix = line_prefix or DEFAULT_LINE_PREFIX
+    errors = errors if errors is not None else ParseErrors()
+    correlator = correlator if correlator is not None else _StatementCorrelator()
+    with open(log_file_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        end = size if end is None else end
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # "^" only matches after a newline, so scanning from ``start`` resyncs
+        # to the next line boundary on its own.
+        starts = line_prefix.entry_start_bytes.finditer(mm, start)
+        current = next(starts, None)
+        following = None
+        found = 0
+        next_report = start + _MMAP_PROGRESS_BYTES
+        # Next NUL byte in the range, found with one memchr-speed scan
+        nul = mm.find(b"\x00", start, end)
+        try:
+            while current is not None and current.start() < end:
+                following = next(starts, None)
+                entry_end = following.start() if following is not None else size
+                if nul < 0 and entry_end > end:
+                    # The last entry of the range runs past its end
+                    nul = mm.find(b"\x00", end, entry_end)
+                if 0 <= nul < entry_end:
+                    damaged = (
+                        mm[current.start() : entry_end]
+                        .decode("utf-8", errors=DECODE_ERRORS)
+                        .splitlines(True)
+                    )
+                    held = correlator.release()
+                    if held is not None:
+                        found += 1
+                        yield held
+                    for recovered in iter_plain_log_entries(
+                        damaged, log_filter, line_prefix, errors
+                    ):
+                        found += 1
+                        yield recovered
+                    nul = mm.find(b"\x00", entry_end, end)
+                    current = following
+                    continue
+                entry, combined = _scan_mmap_entry(
+                    mm, current, entry_end, log_filter, line_prefix, errors
+                )
+                if combined:
+                    held = correlator.release()
+                    if held is not None:
+                        found += 1
+                        yield held
+                    if entry is not None:
+                        correlator.hold(entry)
+                else:
+                    for held in _correlate_mmap_entry(
+                        mm,
+                        current,
+                        entry_end,
+                        correlator,
+                        log_filter,
+                        line_prefix,
+                        errors,
+                    ):
+                        found += 1
+                        yield held
+                if entry_end >= next_report:
+                    progress.update(entry_end - start, found)
+                    next_report = entry_end + _MMAP_PROGRESS_BYTES
+                current = following
+            held = correlator.finish()
+            if held is not None:
+                yield held
+        finally:
+            # Match objects export the mapped buffer; drop them before closing
+            del starts, current, following
+            mm.close()
+
+
+def _iter_blocks_with_progress(
+    f: TextIO, progress: ProgressReporter, entries: Sized
+) -> Iterator[List[str]]:
+    """Read a text file in blocks of lines, reporting progress once per block."""
+    while True:
+        block = f.readlines(_READ_BLOCK_HINT)
+        if not block:
+            return
+        yield block
+        progress.update(f.buffer.tell(), len(entries))
+
+
+def _iter_lines_with_progress(
+    f: TextIO, progress: ProgressReporter, entries: Sized
+) -> Iterator[str]:
+    """Yield the lines of a text file, reporting progress once per block."""
+    for block in _iter_blocks_with_progress(f, progress, entries):
+        yield from block
+
+
+def _iter_plain_file_entries(
+    log_file_path: str,
+    log_filter: Optional[LogFilter] = None,
+    line_prefix: Optional[LogLinePrefix] = None,
+) -> Iterator[LogEntry]:
+    """Stream slow query entries from a whole, possibly compressed, plain log."""
+    with open_log_text(log_file_path) as f:
+        yield from iter_plain_log_entries(f, log_filter, line_prefix)
+
+
+def _parse_plain_serial(
+    log_file_path: str,
+    engine: str,
+    log_filter: Optional[LogFilter] = None,
+    progress: Optional[ProgressReporter] = None,
+    line_prefix: Optional[LogLinePrefix] = None,
+    window: Optional[Tuple[int, int]] = None,
+) -> _EntryColumns:
+    """
+    Parse a plain log in this process with the given engine
+
+    ``window`` restricts an uncompressed log to the entries starting in a
+    [start, end) byte range.
+    """
+    progress = progress or NullProgress()
+    if window is not None:
+        columns = _parse_plain_window(
+            log_file_path, *window, engine, log_filter, line_prefix
+        )
+        progress.update(window[1] - window[0], len(columns))
+        return columns
+    columns = _EntryColumns.for_filter(log_filter)
+    decode_errors = decode_error_count()
+    compression = detect_compression(log_file_path)
+    if engine == "mmap" and compression is not None:
+        logger.info(f"{compression} input cannot be memory-mapped; streaming it")
+        engine = "stream"
+    if engine == "mmap":
+        for entry in iter_plain_log_entries_mmap(
+            log_file_path,
+            log_filter,
+            progress=progress,
+            line_prefix=line_prefix,
+            errors=columns.errors,
+        ):
+            columns.append(entry)
+    else:
+        with open_log_text(log_file_path, compression) as f:
+            lines = _iter_lines_with_progress(f, progress, columns)
+            for entry in iter_plain_log_entries(
+                lines, log_filter, line_prefix, columns.errors
+            ):
+                columns.append(entry)
+    columns.errors.add("encoding", decode_error_count() - decode_errors)
+    columns.close_sample()
+    return columns
+
+
+def _plan_byte_ranges(
+    file_size: int,
+    workers: int,
+    min_chunk_bytes: int = _MIN_CHUNK_BYTES,
+    first_byte: int = 0,
+) -> List[Tuple[int, int]]:
+    """
+    Split [first_byte, file_size) into contiguous [start, end) byte ranges
+    for parallel parsing
+    """
+    length = file_size - first_byte
+    chunks = max(1, min(workers * _CHUNKS_PER_WORKER, length // min_chunk_bytes))
+    chunk_size = max(1, -(-length // chunks))
+    return [
+        (start, min(start + chunk_size, file_size))
+        for start in range(first_byte, file_size, chunk_size)
+    ]
+
+
+def _iter_range_lines(
+    log_file_path: str,
+    start: int,
+    end: int,
+    line_prefix: LogLinePrefix = DEFAULT_LINE_PREFIX,
+) -> Iterator[str]:
+    """
+    Yields the log lines owned by the byte range [start, end)
+
+    A range owns every entry whose timestamped first line starts inside it.
+    The range start is moved forward to the next timestamped line, and the
+    last entry is read past ``end`` until the next timestamped line so that
+    entries straddling a split are parsed exactly once.
+    """
+    with open(log_file_path, "rb") as f:
+        if start > 0:
+            # Discard the partial line; a line starting exactly at ``start``
+            # survives because the byte before it is its newline.
+            f.seek(start - 1)
+            f.readline()
+        pos = f.tell()
+        synced = start == 0
+        for raw in f:
+            line = raw.decode("utf-8", errors=DECODE_ERRORS)
+            is_entry_start = line_prefix.entry_start.match(line) is not None
+            if pos >= end and (is_entry_start or not synced):
+                return
+            pos += len(raw)
+            if not synced:
+                if not is_entry_start:
+                    continue
+                synced = True
+            yield line
+
+
+def _plan_frame_ranges(
+    frames: List[Tuple[int, int]], workers: int
+) -> List[Tuple[int, int]]:
+    """Group consecutive zstd frames into [start, end) compressed byte ranges."""
+    total = sum(length for _, length in frames)
+    target = max(1, total // (workers * _CHUNKS_PER_WORKER))
+    ranges: List[Tuple[int, int]] = []
+    start: Optional[int] = None
+    for offset, length in frames:
+        if start is None:
+            start = offset
+        if offset + length - start >= target:
+            ranges.append((start, offset + length))
+            start = None
+    if start is not None:
+        ranges.append((start, frames[-1][0] + frames[-1][1]))
+    return ranges
+
+
+def _iter_zstd_range_lines(
+    log_file_path: str,
+    start: int,
+    end: int,
+    line_prefix: LogLinePrefix = DEFAULT_LINE_PREFIX,
+) -> Iterator[str]:
+    """
+    Yields the log lines owned by the zstd frames in compressed range [start, end)
+
+    Frame boundaries fall at arbitrary points of the decompressed text. A
+    range that does not start the file skips ahead to its first timestamped
+    line; after its own frames the range keeps decompressing the following
+    frames until the next timestamped line to finish its last entry.
+    """
+    synced = start == 0
+    # Each line is held back by one so a line cut by the range end can be
+    # completed before the entry state machine sees it
+    pending: Optional[str] = None
+    with open_zstd_range_text(log_file_path, start, end - start) as owned:
+        for line in owned:
+            if not synced:
+                if line_prefix.entry_start.match(line) is None:
+                    continue
+                synced = True
+            if pending is not None:
+                yield pending
+            pending = line
+    if pending is None:
+        return
+
+    with open_zstd_range_text(log_file_path, end) as following:
+        if not pending.endswith("\n"):
+            pending += next(following, "")
+        yield pending
+        for line in following:
+            if line_prefix.entry_start.match(line) is not None:
+                return
+            yield line
+
+
+def _collect_columns(entries: Iterable[LogEntry]) -> _EntryColumns:
+    """Gather entries into raw columns."""
+    columns = _EntryColumns()
+    for entry in entries:
+        columns.append(entry)
+    return columns
+
+
+def _parse_range_columns(
+    log_file_path: str,
+    start: int,
+    end: int,
+    engine: str,
+    log_filter: Optional[LogFilter],
+    line_prefix: Optional[LogLinePrefix],
+    correlator: _StatementCorrelator,
+) -> _EntryColumns:
+    """
+    Collect the entries owned by one byte range
+
+    The sample, if any, is left open; with a split correlator its
+    unresolved entries are set aside in ``unresolved_rows``.
+    """
+    line_prefix = line_prefix or DEFAULT_LINE_PREFIX
+    columns = _EntryColumns.for_filter(log_filter, start)
+    decode_errors = decode_error_count()
+    if engine == "mmap":
+        entries = iter_plain_log_entries_mmap(
+            log_file_path,
+            log_filter,
+            start,
+            end,
+            line_prefix=line_prefix,
+            errors=columns.errors,
+            correlator=correlator,
+        )
+    else:
+        if engine == "zstd":
+            lines = _iter_zstd_range_lines(log_file_path, start, end, line_prefix)
+        else:
+            lines = _iter_range_lines(log_file_path, start, end, line_prefix)
+        entries = iter_plain_log_entries(
+            lines, log_filter, line_prefix, columns.errors, correlator
+        )
+    unresolved = correlator.unresolved
+    for entry in entries:
+        if unresolved and entry is unresolved[-1][1]:
+            columns.unresolved_rows.append((len(columns), entry))
+        else:
+            columns.append(entry)
+    columns.errors.add("encoding", decode_error_count() - decode_errors)
+    return columns
+
+
+def _parse_plain_window(
+    log_file_path: str,
+    start: int,
+    end: int,
+    engine: str,
+    log_filter: Optional[LogFilter] = None,
+    line_prefix: Optional[LogLinePrefix] = None,
+) -> _EntryColumns:
+    """Parse the entries owned by one byte range on their own."""
+    columns = _parse_range_columns(
+        log_file_path,
+        start,
+        end,
+        engine,
+        log_filter,
+        line_prefix,
+        _StatementCorrelator(),
+    )
+    columns.close_sample()
+    return columns
+
+
+def parse_plain_log_range(
+    log_file_path: str,
+    start: int = 0,
+    end: Optional[int] = None,
+    log_filter: Optional[LogFilter] = None,
+    line_prefix: Optional[LogLinePrefix] = None,
+    leading_lines: Sequence[str] = (),
+) -> pd.DataFrame:
+    """
+    Parses the slow query entries of a plain log that start in [start, end)
+
+    An entry starting before ``end`` is read to its last continuation line.
+    ``leading_lines`` (e.g. the last entry of a rotated file) are parsed as
+    entries of their own before the range.
+
+    Args:
+        log_file_path: Path to an uncompressed plain-text log
+        start: Byte offset the range starts at
+        end: Byte offset the range ends at (default: the end of the file)
+        log_filter: Optional entry filters
+        line_prefix: Optional compiled log_line_prefix
+        leading_lines: Log lines parsed before the range
+
+    Returns:
+        DataFrame with columns [timestamp, duration_ms, query]
+
+    Raises:
+        FileNotFoundError: If the log file doesn't exist
+    """
+    line_prefix = line_prefix or DEFAULT_LINE_PREFIX
+    if end is None:
+        end = os.path.getsize(log_file_path)
+    columns = _EntryColumns()
+    for entry in iter_plain_log_entries(
+        leading_lines, log_filter, line_prefix, columns.errors
+    ):
+        columns.append(entry)
+    if end > start:
+        columns.extend(
+            _parse_plain_window(
+                log_file_path, start, end, "stream", log_filter, line_prefix
+            )
+        )
+    return columns.to_frame()
+
+
+def _parse_plain_range(
+    byte_range: Tuple[str, int, int, str, Optional[LogFilter], Optional[LogLinePrefix]],
+) -> _EntryColumns:
+    """
+    Process pool worker: parse the entries owned by one byte range of a log
+    split for ``--workers``, to be completed by ``_join_range_columns``
+    """
+    correlator = _StatementCorrelator(split=True)
+    columns = _parse_range_columns(*byte_range, correlator=correlator)
+    columns.correlator = correlator
+    return columns
+
+
+def _join_range_columns(
+    chunks: Iterable[_EntryColumns], log_filter: Optional[LogFilter] = None
+) -> _EntryColumns:
+    """
+    Join the columns of consecutive byte ranges into those of a serial parse
+
+    Statements still pending at the end of a range are carried, keyed by
+    backend PID, to the unresolved durations of later ranges, which take
+    their query and parameters; unresolved durations with no statement are
+    dropped, as in a serial parse. Parameters at the head of a range go to
+    the last entry of the range before, whose held entry is added ahead of
+    the next range's rows. The reservoirs of a sampled parse are merged into
+    one of the sample size.
+    """
+    columns = _EntryColumns.for_filter(log_filter, -1)
+    reservoirs: List[Reservoir[LogEntry]] = []
+    pending: "OrderedDict[Optional[str], LogEntry]" = OrderedDict()
+    held: Optional[LogEntry] = None
+    last: Optional[LogEntry] = None
+    for chunk in chunks:
+        correlator = chunk.correlator
+        if correlator is None:
+            raise ValueError("Byte range columns carry no split correlator")
+        if correlator.head_parameters is not None and last is not None:
+            last.parameters = correlator.head_parameters
+        columns.errors.merge(chunk.errors.counts)
+        if chunk.reservoir is not None:
+            reservoirs.append(chunk.reservoir)
+        if not correlator.started:
+            # The range holds parameters at most: ``last`` still continues
+            continue
+        if held is not None:
+            columns.append(held)
+        resolved = set()
+        for pid, entry in correlator.unresolved:
+            statement = pending.pop(pid, None)
+            if statement is not None:
+                entry.query = statement.query
+                entry.parameters = statement.parameters
+                resolved.add(id(entry))
+        for pid in correlator.seen_pids:
+            pending.pop(pid, None)
+        pending.update(correlator.pending)
+        while len(pending) > correlator.max_pending:
+            pending.popitem(last=False)
+        position = 0
+        for row, entry in chunk.unresolved_rows:
+            if id(entry) in resolved:
+                columns.extend_rows(chunk, position, row)
+                columns.append(entry)
+                position = row
+        columns.extend_rows(chunk, position, len(chunk))
+        held, last = correlator.held, correlator.last
+    if held is not None:
+        columns.append(held)
+    if columns.reservoir is not None:
+        # After every offer: merged reservoirs take no more items
+        for reservoir in reservoirs:
+            columns.reservoir.merge(reservoir)
+    columns.close_sample()
+    return columns
+
+
+def _parse_plain_parallel(
+    log_file_path: str,
+    workers: int,
+    engine: str,
+    log_filter: Optional[LogFilter] = None,
+    progress: Optional[ProgressReporter] = None,
+    line_prefix: Optional[LogLinePrefix] = None,
+    window: Optional[Tuple[int, int]] = None,
+) -> _EntryColumns:
+    """
+    Parse byte ranges of a plain log in a process pool, in file order
+
+    Uncompressed logs are split at arbitrary byte offsets, within ``window``
+    if given; multi-frame zstd logs are split at frame boundaries. Other
+    compressed logs cannot be entered mid-stream and are parsed serially.
+
+    Statements and durations logged as separate entries (``log_statement``
+    with ``log_duration``) are paired per range, and pairs split across
+    ranges are joined in this process (see ``_join_range_columns``).
+    """
+    progress = progress or NullProgress()
+    compression = detect_compression(log_file_path)
+    if compression is None:
+        first_byte, end = window or (0, os.path.getsize(log_file_path))
+        ranges = _plan_byte_ranges(end, workers, _MIN_CHUNK_BYTES, first_byte)
+    elif compression == "zstd":
+        ranges = _plan_frame_ranges(zstd_frames(log_file_path), workers)
+        engine = "zstd"
+    else:
+        logger.info(f"{compression} input has no split points; parsing serially")
+        ranges = []
+    if len(ranges) <= 1:
+        return _parse_plain_serial(
+            log_file_path, engine, log_filter, progress, line_prefix, window
+        )
+
+    logger.info(f"Parsing {len(ranges)} byte ranges with {workers} worker processes")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunks = executor.map(
+            _parse_plain_range,
+            [
+                (log_file_path, start, end, engine, log_filter, line_prefix)
+                for start, end in ranges
+            ],
+        )
+        return _join_range_columns(
+            _iter_ranges_with_progress(ranges, chunks, progress), log_filter
+        )
+
+
+def _iter_ranges_with_progress(
+    ranges: List[Tuple[int, int]],
+    chunks: Iterable[_EntryColumns],
+    progress: ProgressReporter,
+) -> Iterator[_EntryColumns]:
+    """Pass parsed byte ranges through, reporting progress as each arrives."""
+    entries = 0
+    for (_, end), chunk in zip(ranges, chunks):
+        entries += len(chunk)
+        progress.update(end, entries)
+        yield chunk
+
+
+def _accepts_structured_row(row: dict[str, Any], log_filter: LogFilter) -> bool:
+    """Apply the duration and identity filters to a CSV/JSON record."""
+    try:
+        duration_ms = float(row["duration_ms"])
+    except (TypeError, ValueError):
+        return False
+    return duration_ms >= log_filter.min_duration and log_filter.accepts_identity(
+        row.get("user"), row.get("database")
+    )
+
+
+def _accepts_structured_frame(df: pd.DataFrame, log_filter: LogFilter) -> pd.Series:
+    """Vectorized _accepts_structured_row over a frame with numeric durations."""
+    mask = df["duration_ms"] >= log_filter.min_duration
+    for name, allowed in (
+        ("user", log_filter._users),
+        ("database", log_filter._databases),
+    ):
+        if allowed:
+            mask &= df[name].isin(list(allowed)) if name in df.columns else False
+    return mask
+
+
+def _parse_timestamps(values: "pd.Series[str]") -> "pd.Series[pd.Timestamp]":
+    """Convert timestamp strings, as ISO 8601 when they all are."""
+    try:
+        return pd.to_datetime(values, format="ISO8601")
+    except ValueError:
+        # e.g. "2025-10-28 10:00:00 UTC", in a format inferred once from the
+        # first value
+        return pd.to_datetime(values)
+
+
+def _apply_time_window(df: pd.DataFrame, log_filter: LogFilter) -> pd.DataFrame:
+    """Apply the time window to a DataFrame with parsed timestamps."""
+    if log_filter.since is not None:
+        df = df[df["timestamp"] >= pd.Timestamp(log_filter.since)]
+    if log_filter.until is not None:
+        df = df[df["timestamp"] < pd.Timestamp(log_filter.until)]
+    return df.reset_index(drop=True)
+
+
+def _csvlog_slow_entries(
+    chunk: pd.DataFrame, log_filter: LogFilter, errors: ParseErrors
+) -> pd.DataFrame:
+    """
+    Extract the accepted slow statements from one chunk of csvlog rows
+
+    Rows whose first field is not a timestamp are counted as malformed.
+    """
+    valid = chunk["timestamp"].str.match(_ENTRY_START_RE).to_numpy()
+    if not valid.all():
+        for position in np.flatnonzero(~valid):
+            errors.record(
+                "malformed",
+                f"csvlog row {chunk.index[position] + 1} starts with "
+                f"{chunk['timestamp'].iloc[position][:80]!r}",
+            )
+        chunk = chunk[valid]
+    chunk = chunk[chunk["message"].str.startswith("duration: ")]
+    parts = chunk["message"].str.extract(_DURATION_MESSAGE_RE)
+    entries = pd.DataFrame(
+        {
+            "timestamp": chunk["timestamp"].str.extract(_ENTRY_START_RE, expand=False),
+            "duration_ms": pd.to_numeric(parts[0], errors="coerce"),
+            "query": parts[1].str.strip(),
+            "session_id": chunk["session_id"],
+            "user": chunk["user"],
+            "database": chunk["database"],
+            "application_name": chunk["application_name"],
+        }
+    )
+    errors.add(
+        "bad_duration", int((entries["duration_ms"].isna() & parts[0].notna()).sum())
+    )
+    # Duration-only messages (log_duration without a statement) carry no query
+    entries = entries.dropna(subset=["timestamp", "duration_ms", "query"])
+    return entries[log_filter.frame_mask(entries)]
+
+
+def _parse_csvlog(
+    log_file_path: str, log_filter: LogFilter, progress: ProgressReporter
+) -> pd.DataFrame:
+    """
+    Parse a PostgreSQL csvlog file (log_destination = 'csvlog')
+
+    The file is read in chunks of _CSVLOG_CHUNK_ROWS rows by pandas' C
+    parser, and only the columns the analysis needs are materialized.
+    Durations and statements are extracted from ``message`` with vectorized
+    string operations, so no Python code runs per row. pandas does not check
+    the field count of rows read with ``usecols`` (it also varies with the
+    server version), so rows are recognised as malformed by their first
+    field instead.
+    """
+    frames: List[pd.DataFrame] = []
+    entries = 0
+    errors = ParseErrors()
+    decode_errors = decode_error_count()
+    with open_log_binary(log_file_path) as f:
+        reader = pd.read_csv(
+            f,
+            header=None,
+            usecols=list(_CSVLOG_FIELDS),
+            dtype=str,
+            na_filter=False,
+            encoding="utf-8",
+            encoding_errors=DECODE_ERRORS,
+            chunksize=_CSVLOG_CHUNK_ROWS,
+        )
+        for chunk in reader:
+            chunk = chunk.rename(columns=_CSVLOG_FIELDS)
+            accepted = _csvlog_slow_entries(chunk, log_filter, errors)
+            if len(accepted):
+                frames.append(accepted)
+                entries += len(accepted)
+            progress.update(f.tell(), entries)
+    errors.add("encoding", decode_error_count() - decode_errors)
+
+    if not frames:
+        errors.log_summary(log_file_path)
+        logger.warning("No slow query entries found in csvlog file.")
+        print("No slow query entries found in csvlog file.")
+        raise ValueError(
+            "No slow query entries found in csvlog. "
+            "Ensure log_min_duration_statement is configured."
+        )
+    df = pd.concat(frames, ignore_index=True)
+    df["timestamp"] = pd.to_datetime(df["timestamp"], format="ISO8601")
+    df.attrs[PARSE_ERRORS_ATTR] = dict(errors.counts)
+    logger.info(f"Parsed {len(df)} slow query entries (csvlog)")
+    return df
+
+
+def _parse_jsonlog(
+    log_file_path: str, log_filter: LogFilter, progress: ProgressReporter
+) -> pd.DataFrame:
+    """
+    Parse a PostgreSQL 15+ jsonlog file (log_destination = 'jsonlog')
+
+    The file is streamed in blocks of lines. Lines whose message does not
+    start with a duration are rejected by a substring test and never decoded;
+    the rest are decoded with orjson when it is installed.
+    """
+    columns = _EntryColumns()
+    extra: Dict[str, List[Any]] = {name: [] for name in _JSONLOG_FIELDS.values()}
+    decode_errors = decode_error_count()
+    with open_log_text(log_file_path) as f:
+        for block in _iter_blocks_with_progress(f, progress, columns):
+            for line in block:
+                if _JSONLOG_DURATION_MARKER not in line:
+                    continue
+                try:
+                    record = _json_loads(line)
+                except ValueError as e:
+                    columns.errors.record("malformed", f"jsonlog line: {e}")
+                    continue
+                match = _DURATION_MESSAGE_RE.match(record.get("message", ""))
+                timestamp = _ENTRY_START_RE.match(record.get("timestamp", ""))
+                if not match or not timestamp:
+                    continue
+                duration_ms = _parse_duration(match.group(1), columns.errors)
+                if (
+                    duration_ms is None
+                    or duration_ms < log_filter.min_duration
+                    or not log_filter.accepts_time(timestamp.group(1))
+                    or not log_filter.accepts_identity(
+                        record.get("user"), record.get("dbname")
+                    )
+                ):
+                    continue
+                columns.append(
+                    LogEntry(timestamp.group(1), duration_ms, match.group(2).strip())
+                )
+                for key, name in _JSONLOG_FIELDS.items():
+                    extra[name].append(record.get(key))
+    columns.errors.add("encoding", decode_error_count() - decode_errors)
+
+    if not columns:
+        columns.errors.log_summary(log_file_path)
+        logger.warning("No slow query entries found in jsonlog file.")
+        print("No slow query entries found in jsonlog file.")
+        raise ValueError(
+            "No slow query entries found in jsonlog. "
+            "Ensure log_min_duration_statement is configured."
+        )
+    df = pd.DataFrame(
+        {
+            "timestamp": pd.to_datetime(columns.timestamps, format="ISO8601"),
+            "duration_ms": np.array(columns.durations, dtype=np.float64),
+            "query": columns.queries,
+            **extra,
+        }
+    )
+    # query_id is a signed 64-bit hash; build it directly as a nullable
+    # integer, since a float column would round it
+    df["query_id"] = pd.array(extra["query_id"], dtype="Int64")
+    df.attrs[PARSE_ERRORS_ATTR] = dict(columns.errors.counts)
+    logger.info(f"Parsed {len(df)} slow query entries (jsonlog)")
+    return df
+
+
+def _parse_csv(
+    log_file_path: str, log_filter: LogFilter, progress: ProgressReporter
+) -> pd.DataFrame:
+    """
+    Parse a CSV file with timestamp, duration_ms and query columns
+
+    Read in chunks of _CSVLOG_CHUNK_ROWS rows by pandas' C parser and
+    filtered with vectorized masks, like csvlog files; other columns are
+    kept as text.
+    """
+    frames: List[pd.DataFrame] = []
+    rows = 0
+    entries = 0
+    with open_log_binary(log_file_path) as f:
+        try:
+            reader = pd.read_csv(
+                f,
+                dtype=str,
+                na_filter=False,
+                encoding="utf-8",
+                encoding_errors=DECODE_ERRORS,
+                chunksize=_CSVLOG_CHUNK_ROWS,
+            )
+            for chunk in reader:
+                rows += len(chunk)
+                if not {"timestamp", "duration_ms", "query"}.issubset(chunk.columns):
+                    break
+                chunk["duration_ms"] = pd.to_numeric(
+                    chunk["duration_ms"], errors="coerce"
+                )
+                accepted = chunk[_accepts_structured_frame(chunk, log_filter)]
+                if len(accepted):
+                    frames.append(accepted)
+                    entries += len(accepted)
+                progress.update(f.tell(), entries)
+        except pd.errors.EmptyDataError:
+            pass
+    if rows == 0:
+        logger.warning("CSV log file is empty or missing required columns.")
+        print("CSV log file is empty or missing required columns.")
+        raise ValueError("No slow query entries found in CSV log.")
+    if not frames:
+        logger.warning("No valid slow query entries found in CSV log.")
+        print("No valid slow query entries found in CSV log.")
+        raise ValueError("No slow query entries found in CSV log.")
+    df = pd.concat(frames, ignore_index=True)
+    df["timestamp"] = _parse_timestamps(df["timestamp"])
+    df = _apply_time_window(df, log_filter)
+    logger.info(f"Parsed {len(df)} slow query entries (csv)")
+    return df
+
+
+def _parse_json(
+    log_file_path: str, log_filter: LogFilter, progress: ProgressReporter
+) -> pd.DataFrame:
+    """
+    Parse JSON lines with timestamp, duration_ms and query keys
+
+    Accepted records are stored key by key in one list per column instead
+    of a dict per line; keys beyond the required ones become columns too,
+    with None where a record lacks them.
+    """
+    columns: Dict[str, List[Any]] = {"timestamp": [], "duration_ms": [], "query": []}
+    entries = 0
+    total = 0
+    errors = ParseErrors()
+    with open_log_text(log_file_path) as f:
+        for block in _iter_blocks_with_progress(f, progress, columns["query"]):
+            total += len(block)
+            for line in block:
+                try:
+                    record = _json_loads(line)
+                    if (
+                        "timestamp" not in record
+                        or "duration_ms" not in record
+                        or "query" not in record
+                        or not _accepts_structured_row(record, log_filter)
+                    ):
+                        continue
+                except Exception as e:
+                    errors.record("malformed", f"JSON line: {e}")
+                    continue
+                for key, value in record.items():
+                    column = columns.get(key)
+                    if column is None:
+                        column = columns[key] = [None] * entries
+                    column.append(value)
+                entries += 1
+                if len(columns) > len(record):
+                    for column in columns.values():
+                        if len(column) < entries:
+                            column.append(None)
+    if total == 0:
+        logger.warning("JSON log file is empty.")
+        print("JSON log file is empty.")
+        raise ValueError("No slow query entries found in JSON log.")
+    if not entries:
+        errors.log_summary(log_file_path)
+        logger.warning("No valid slow query entries found in JSON log.")
+        print("No valid slow query entries found in JSON log.")
+        raise ValueError("No slow query entries found in JSON log.")
+    df = pd.DataFrame(columns)
+    df["timestamp"] = _parse_timestamps(df["timestamp"])
+    df["duration_ms"] = df["duration_ms"].astype(float)
+    df = _apply_time_window(df, log_filter)
+    df.attrs[PARSE_ERRORS_ATTR] = dict(errors.counts)
+    logger.info(f"Parsed {len(df)} slow query entries (json)")
+    return df
+
+
+def parse_postgres_log(
+    log_file_path: str,
+    log_format: str = "plain",
+    workers: int = 1,
+    engine: str = "stream",
+    min_duration: float = 0.0,
+    since: Union[str, datetime, None] = None,
+    until: Union[str, datetime, None] = None,
+    databases: Optional[Collection[str]] = None,
+    users: Optional[Collection[str]] = None,
+    progress: Optional[ProgressReporter] = None,
+    log_line_prefix: Optional[str] = None,
+    cache_dir: Optional[str] = None,
+    columns: Optional[Sequence[str]] = None,
+    time_index: bool = False,
+    sample: Optional[SamplePlan] = None,
+) -> pd.DataFrame:
     """
     Parses database log file and extracts slow queries (currently PostgreSQL format)
 
     Args:
         log_file_path: Path to the database log file
-        log_format: 'plain', 'csv', or 'json'
+        log_format: One of LOG_FORMATS: 'plain', 'csv', 'json', or PostgreSQL's
+            own 'csvlog' and 'jsonlog' (log_destination) formats
+        workers: Number of worker processes used to parse plain logs. Values
+            above 1 split the file into byte ranges parsed in parallel and
+            return the entries sorted by timestamp.
+        engine: How plain logs are read: 'stream' decodes the file line by
+            line, 'mmap' memory-maps it and scans raw bytes
+        min_duration: Drop entries faster than this many milliseconds
+        since: Drop entries logged before this time (inclusive bound)
+        until: Drop entries logged at or after this time (exclusive bound)
+        databases: Only keep entries from these databases
+        users: Only keep entries from these users
+        progress: Optional progress reporter; nothing is reported by default
+        log_line_prefix: The server's log_line_prefix, for plain logs. Entry
+            headers must then match it exactly, and its %u, %d, %a, %p, %c
+            (and other) fields become typed columns.
+        cache_dir: Optional directory for the parse cache (see
+            parse_cache.py). A cached parse of the same file and format is
+            memory-mapped instead of parsing again; requires pyarrow.
+        columns: Optional subset of columns to return; with a cache only
+            these are read from it
+        time_index: For ``since``/``until`` on uncompressed plain logs, keep
+            a sidecar index of per-minute offsets next to the log instead of
+            binary searching the file on every run (see time_seek.py)
+        sample: Optional sample plan (see sampling.py): entries at least
+            ``sample.keep_above`` ms slow are all kept, plus a uniform sample
+            of ``sample.size`` faster ones; a ``sample_weight`` column says
+            how many entries each row stands for
+
+    Filters are applied while parsing, before timestamps are converted or
+    statement text is copied. With a cache, the duration and time filters
+    are applied to the cached frame instead, so runs with other thresholds
+    reuse it. Without one, ``since``/``until`` on an uncompressed plain log
+    first seek to the byte range holding the window and only parse that.
 
     Returns:
-        DataFrame with columns [timestamp, duration_ms, query]
+        DataFrame with columns [timestamp, duration_ms, query]; csvlog input
+        adds [session_id, user, database, application_name], jsonlog input
+        also adds [backend_type, query_id], and plain input adds the fields
+        of ``log_line_prefix``
 
     Raises:
         FileNotFoundError: If log file doesn't exist
@@ -39,18 +1904,283 @@ def parse_postgres_log(log_file_path: str, log_format: str = "plain") -> pd.Data
     if not log_path.exists():
         raise FileNotFoundError(f"Log file not found: {log_file_path}")
 
+    if engine not in PARSE_ENGINES:
+        raise ValueError(f"Unsupported parse engine: {engine}")
+    if log_format not in LOG_FORMATS:
+        raise ValueError(f"Unsupported log format: {log_format}")
+
     logger.info(f"Parsing log file: {log_file_path} (format: {log_format})")
+    log_filter = LogFilter(
+        min_duration=min_duration,
+        since=since,
+        until=until,
+        databases=databases,
+        users=users,
+        sample=sample,
+    )
+    line_prefix = None
+    if log_line_prefix and log_format == "plain":
+        line_prefix = compile_log_line_prefix(log_line_prefix)
+        if users and "user" not in line_prefix.fields:
+            logger.warning("log_line_prefix has no %u; no entry can match --user")
+        if databases and "database" not in line_prefix.fields:
+            logger.warning("log_line_prefix has no %d; no entry can match --database")
+    cache_file = None
+    parse_filter = log_filter
+    if cache_dir is not None and not cache_available():
+        logger.warning("pyarrow is not installed; parsing without the cache")
+    elif cache_dir is not None:
+        # Identity filters can depend on prefix text that is not kept as a
+        # column, so they are part of the key; the rest is applied per run
+        cache_file = cache_file_for(
+            log_file_path,
+            cache_dir,
+            {
+                "log_format": log_format,
+                "log_line_prefix": log_line_prefix if line_prefix else None,
+                "users": sorted(users or ()),
+                "databases": sorted(databases or ()),
+            },
+        )
+        cached = load_parsed_log(
+            cache_file,
+            # The filters below need these two columns
+            (
+                None
+                if columns is None
+                else list(dict.fromkeys([*columns, "timestamp", "duration_ms"]))
+            ),
+        )
+        if cached is not None:
+            logger.info(f"Loaded {len(cached)} parsed entries from {cache_file}")
+            return _select_columns(_filter_cached_frame(cached, log_filter), columns)
+        parse_filter = LogFilter(databases=databases, users=users)
 
-    if log_format == "plain":
-        with open(log_file_path, "r", encoding="utf-8", errors="ignore") as f:
-            log_text = f.read()
-        # Improved regex for multi-line queries and edge cases
-        pattern = (
-            r"(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{3}).*?duration: "
-            r"([\d.]+) ms.*?statement: ([\s\S]+?)(?=\n\d{4}-\d{2}-\d{2} |\Z)"
-        )
-        matches = re.findall(pattern, log_text, re.DOTALL)
+    progress = progress or NullProgress()
+    compressed = detect_compression(log_file_path) is not None
+    # Progress counts decompressed bytes, so a percentage is only meaningful
+    # for uncompressed input
+    progress.start(
+        f"Parsing {log_path.name}", None if compressed else log_path.stat().st_size
+    )
+
+    try:
+        df = _parse_log_format(
+            log_file_path,
+            log_format,
+            workers,
+            engine,
+            parse_filter,
+            progress,
+            line_prefix,
+            time_index,
+        )
+    finally:
+        progress.finish()
+    ParseErrors(dict(df.attrs.get(PARSE_ERRORS_ATTR, {}))).log_summary(log_file_path)
+    if sample is not None and cache_file is None and log_format != "plain":
+        df = _sample_parsed_frame(df, sample)
+    if cache_file is not None:
+        store_parsed_log(cache_file, df)
+        df = _filter_cached_frame(df, log_filter)
+    return _select_columns(df, columns)
+
+
+def _select_columns(df: pd.DataFrame, columns: Optional[Sequence[str]]) -> pd.DataFrame:
+    """Keep the requested columns the frame has, in the requested order."""
+    if columns is None:
+        return df
+    return df[[c for c in columns if c in df.columns]]
+
+
+def _filter_cached_frame(df: pd.DataFrame, log_filter: LogFilter) -> pd.DataFrame:
+    """Apply the duration, time and sampling steps skipped by a cached parse."""
+    if log_filter.min_duration > 0:
+        df = df[df["duration_ms"] >= log_filter.min_duration]
+    df = _apply_time_window(df, log_filter)
+    if df.empty:
+        raise ValueError("No slow query entries match the duration and time filters.")
+    if log_filter.sample is not None:
+        df = _sample_parsed_frame(df, log_filter.sample)
+    return df
+
+
+def _sample_parsed_frame(df: pd.DataFrame, sample: SamplePlan) -> pd.DataFrame:
+    """Sample a frame that was read whole, keeping its parse error counts."""
+    attrs = dict(df.attrs)
+    df = sample_frame(df, sample)
+    df.attrs.update(attrs)
+    return df
+
+
+def expand_log_paths(patterns: Sequence[str]) -> List[str]:
+    """
+    Expand log file arguments into a sorted, de-duplicated list of files
+
+    Args:
+        patterns: File paths, glob patterns (``**`` recurses) or directories,
+            whose regular files are all included. Time index sidecar files
+            are skipped unless named explicitly.
+
+    Returns:
+        List of file paths, in argument order and sorted within each argument
+
+    Raises:
+        FileNotFoundError: If an argument matches no file
+    """
+    paths: List[str] = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = sorted(
+                str(child)
+                for child in Path(pattern).iterdir()
+                if child.is_file()
+                and not child.name.startswith(".")
+                and not child.name.endswith(TIME_INDEX_SUFFIX)
+            )
+        elif glob.has_magic(pattern):
+            matches = sorted(
+                match
+                for match in glob.glob(pattern, recursive=True)
+                if os.path.isfile(match) and not match.endswith(TIME_INDEX_SUFFIX)
+            )
+        else:
+            matches = [pattern] if os.path.exists(pattern) else []
         if not matches:
+            raise FileNotFoundError(f"Log file not found: {pattern}")
+        paths.extend(matches)
+    return list(dict.fromkeys(paths))
+
+
+def _parse_log_for_merge(
+    log_file_path: str, parse_options: Dict[str, Any]
+) -> Optional[pd.DataFrame]:
+    """Process pool worker: parse one file of a multi-file run."""
+    try:
+        df = parse_postgres_log(log_file_path, **parse_options)
+    except ValueError as e:
+        logger.warning(f"Skipping {log_file_path}: {e}")
+        return None
+    df["log_file"] = log_file_path
+    return df.sort_values("timestamp", kind="stable", ignore_index=True)
+
+
+def _merge_sorted_frames(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    K-way merge of per-file DataFrames that are each sorted by timestamp
+
+    The runs are concatenated and stable-sorted on their datetime64 values;
+    numpy's stable sort (timsort for 64-bit keys) detects the pre-sorted runs
+    and merges them in O(n log k) rather than re-sorting from scratch. Ties
+    keep file order.
+    """
+    merged = pd.concat(frames, ignore_index=True)
+    order = np.argsort(merged["timestamp"].to_numpy(), kind="stable")
+    return merged.take(order).reset_index(drop=True)
+
+
+def parse_postgres_logs(
+    log_file_paths: Sequence[str],
+    workers: int = 1,
+    progress: Optional[ProgressReporter] = None,
+    **parse_options: Any,
+) -> pd.DataFrame:
+    """
+    Parses several database log files into one timestamp-ordered DataFrame
+
+    A single file is handed to parse_postgres_log, using ``workers`` for its
+    own parallel parse. Several files are parsed concurrently, one file per
+    worker process, and their entries are merged in timestamp order with a
+    ``log_file`` column recording where each entry came from.
+
+    Args:
+        log_file_paths: Files, globs or directories (see expand_log_paths)
+        workers: Number of worker processes
+        progress: Optional progress reporter, updated as files complete
+        **parse_options: Keyword arguments forwarded to parse_postgres_log
+
+    Returns:
+        DataFrame with columns [timestamp, duration_ms, query, log_file]
+
+    Raises:
+        FileNotFoundError: If an argument matches no file
+        ValueError: If no file contains slow query entries
+    """
+    paths = expand_log_paths(log_file_paths)
+    if len(paths) == 1:
+        return parse_postgres_log(
+            paths[0], workers=workers, progress=progress, **parse_options
+        )
+
+    progress = progress or NullProgress()
+    progress.start(f"Parsing {len(paths)} log files")
+    logger.info(f"Parsing {len(paths)} log files with {workers} worker processes")
+    frames: List[pd.DataFrame] = []
+    bytes_read = 0
+    entries = 0
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as executor:
+        results = executor.map(
+            _parse_log_for_merge, paths, [parse_options] * len(paths)
+        )
+        for path, df in zip(paths, results):
+            bytes_read += os.path.getsize(path)
+            if df is not None:
+                frames.append(df)
+                entries += len(df)
+            progress.update(bytes_read, entries)
+    progress.finish()
+
+    if not frames:
+        raise ValueError("No slow query entries found in any log file.")
+    df = _merge_sorted_frames(frames)
+    # concat drops attrs that differ between frames; add the counts up
+    errors = ParseErrors()
+    for frame in frames:
+        errors.merge(frame.attrs.get(PARSE_ERRORS_ATTR, {}))
+    df.attrs[PARSE_ERRORS_ATTR] = dict(errors.counts)
+    logger.info(f"Parsed {len(df)} slow query entries from {len(frames)} files")
+    return df
+
+
+def _parse_log_format(
+    log_file_path: str,
+    log_format: str,
+    workers: int,
+    engine: str,
+    log_filter: LogFilter,
+    progress: ProgressReporter,
+    line_prefix: Optional[LogLinePrefix] = None,
+    time_index: bool = False,
+) -> pd.DataFrame:
+    """Dispatch to the parser for ``log_format``."""
+    if log_format == "plain":
+        window = None
+        if (
+            log_filter.since is not None or log_filter.until is not None
+        ) and detect_compression(log_file_path) is None:
+            window = seek_time_window(
+                log_file_path,
+                _normalize_time_bound(log_filter.since),
+                _normalize_time_bound(log_filter.until),
+                line_prefix or DEFAULT_LINE_PREFIX,
+                time_index,
+            )
+        if workers > 1:
+            columns = _parse_plain_parallel(
+                log_file_path,
+                workers,
+                engine,
+                log_filter,
+                progress,
+                line_prefix,
+                window,
+            )
+        else:
+            columns = _parse_plain_serial(
+                log_file_path, engine, log_filter, progress, line_prefix, window
+            )
+        if not columns:
+            columns.errors.log_summary(log_file_path)
             warning_msg = (
                 "No slow query entries matched the expected pattern. "
                 "Check your log format and log_min_duration_statement setting."
@@ -61,112 +2191,26 @@ def parse_postgres_log(log_file_path: str, log_format: str = "plain") -> pd.Data
                 "No slow query entries found. "
                 "Ensure log_min_duration_statement is configured."
             )
-        log_entries = []
-        # Always show progress bar, even for small files
-        for idx, match in enumerate(
-            tqdm(
-                matches,
-                desc="Parsing log entries",
-                unit="entry",
-                mininterval=0.1,
-                miniters=1,
-            )
-        ):
-            if idx > 0 and idx % 100 == 0:
-                print(f"Examined {idx} log entries...")
-                logger.info(f"Examined {idx} log entries...")
-            try:
-                log_entries.append(
-                    {
-                        "timestamp": pd.to_datetime(match[0]),
-                        "duration_ms": float(match[1]),
-                        "query": match[2].strip(),
-                    }
-                )
-            except Exception as e:
-                logger.warning(f"Skipping malformed entry: {e}")
-                continue
-        df = pd.DataFrame(log_entries)
+        df = columns.to_frame()
+        if workers > 1 or log_filter.sample is not None:
+            # Ranges come back in file order, and sampled entries after the
+            # always-kept ones; a stable sort restores timestamp order
+            # without reshuffling equal timestamps.
+            df = df.sort_values("timestamp", kind="stable", ignore_index=True)
         logger.info(f"Parsed {len(df)} slow query entries (plain)")
         return df
 
+    elif log_format == "csvlog":
+        return _parse_csvlog(log_file_path, log_filter, progress)
+
+    elif log_format == "jsonlog":
+        return _parse_jsonlog(log_file_path, log_filter, progress)
+
     elif log_format == "csv":
-        # Expecting CSV with columns: timestamp,duration_ms,query
-        with open(
-            log_file_path, newline="", encoding="utf-8", errors="ignore"
-        ) as csvfile:
-            reader = list(csv.DictReader(csvfile))
-            total = len(reader)
-            if total == 0:
-                logger.warning("CSV log file is empty or missing required columns.")
-                print("CSV log file is empty or missing required columns.")
-                raise ValueError("No slow query entries found in CSV log.")
-            rows = []
-            for idx, row in enumerate(
-                tqdm(
-                    reader,
-                    desc="Parsing CSV log entries",
-                    unit="entry",
-                    mininterval=0.1,
-                    miniters=1,
-                )
-            ):
-                if idx > 0 and idx % 100 == 0:
-                    print(f"Examined {idx} CSV log entries...")
-                    logger.info(f"Examined {idx} CSV log entries...")
-                if "timestamp" in row and "duration_ms" in row and "query" in row:
-                    rows.append(row)
-        if not rows:
-            logger.warning("No valid slow query entries found in CSV log.")
-            print("No valid slow query entries found in CSV log.")
-            raise ValueError("No slow query entries found in CSV log.")
-        df = pd.DataFrame(rows)
-        df["timestamp"] = pd.to_datetime(df["timestamp"])
-        df["duration_ms"] = df["duration_ms"].astype(float)
-        logger.info(f"Parsed {len(df)} slow query entries (csv)")
-        return df
+        return _parse_csv(log_file_path, log_filter, progress)
 
     elif log_format == "json":
-        # Expecting JSON lines: {"timestamp":..., "duration_ms":..., "query":...}
-        log_entries = []
-        with open(log_file_path, "r", encoding="utf-8", errors="ignore") as f:
-            lines = f.readlines()
-            total = len(lines)
-            if total == 0:
-                logger.warning("JSON log file is empty.")
-                print("JSON log file is empty.")
-                raise ValueError("No slow query entries found in JSON log.")
-            for idx, line in enumerate(
-                tqdm(
-                    lines,
-                    desc="Parsing JSON log entries",
-                    unit="entry",
-                    mininterval=0.1,
-                    miniters=1,
-                )
-            ):
-                if idx > 0 and idx % 100 == 0:
-                    print(f"Examined {idx} JSON log entries...")
-                    logger.info(f"Examined {idx} JSON log entries...")
-                try:
-                    entry = json.loads(line)
-                    if (
-                        "timestamp" in entry
-                        and "duration_ms" in entry
-                        and "query" in entry
-                    ):
-                        log_entries.append(entry)
-                except Exception as e:
-                    logger.warning(f"Skipping malformed JSON line: {e}")
-        if not log_entries:
-            logger.warning("No valid slow query entries found in JSON log.")
-            print("No valid slow query entries found in JSON log.")
-            raise ValueError("No slow query entries found in JSON log.")
-        df = pd.DataFrame(log_entries)
-        df["timestamp"] = pd.to_datetime(df["timestamp"])
-        df["duration_ms"] = df["duration_ms"].astype(float)
-        logger.info(f"Parsed {len(df)} slow query entries (json)")
-        return df
+        return _parse_json(log_file_path, log_filter, progress)
 
     else:
         raise ValueError(f"Unsupported log format: {log_format}")
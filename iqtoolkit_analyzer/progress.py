@@ -0,0 +1,80 @@
+"""
+Progress reporting for long-running log parses.
+
+Parsers report cumulative bytes read and entries found once per block of
+input, never per entry, so reporting costs nothing measurable in the hot
+loops. ``NullProgress`` is used for library calls, ``--quiet`` runs and
+non-interactive output; ``ThrottledProgress`` prints throughput to a
+terminal at most once per interval.
+"""
+
+import sys
+import time
+from typing import Optional, TextIO
+
+
+class ProgressReporter:
+    """Progress reporting interface; the base implementation does nothing."""
+
+    def start(self, description: str, total_bytes: Optional[int] = None) -> None:
+        """Begin reporting a new unit of work."""
+
+    def update(self, bytes_read: int, entries: int) -> None:
+        """Report cumulative bytes read and entries found so far."""
+
+    def finish(self) -> None:
+        """Mark the current unit of work as complete."""
+
+
+class NullProgress(ProgressReporter):
+    """Discards all progress updates."""
+
+
+class ThrottledProgress(ProgressReporter):
+    """Prints bytes/s and entries/s to a terminal, at most once per interval."""
+
+    def __init__(self, stream: Optional[TextIO] = None, interval: float = 1.0):
+        self.stream = stream or sys.stderr
+        self.interval = interval
+        self.description = ""
+        self.total_bytes: Optional[int] = None
+        self.bytes_read = 0
+        self.entries = 0
+        self._started_at = 0.0
+        self._last_report = 0.0
+
+    def start(self, description: str, total_bytes: Optional[int] = None) -> None:
+        self.description = description
+        self.total_bytes = total_bytes
+        self.bytes_read = 0
+        self.entries = 0
+        self._started_at = self._last_report = time.monotonic()
+
+    def update(self, bytes_read: int, entries: int) -> None:
+        self.bytes_read = bytes_read
+        self.entries = entries
+        now = time.monotonic()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            self._write(now, end="\r")
+
+    def finish(self) -> None:
+        self._write(time.monotonic(), end="\n")
+
+    def _write(self, now: float, end: str) -> None:
+        elapsed = max(now - self._started_at, 1e-9)
+        parts = [self.description]
+        if self.total_bytes:
+            parts.append(f"{min(self.bytes_read / self.total_bytes, 1.0):6.1%}")
+        parts.append(f"{self.bytes_read / 1_048_576:,.1f} MB")
+        parts.append(f"{self.bytes_read / 1_048_576 / elapsed:,.1f} MB/s")
+        parts.append(f"{self.entries:,} entries ({self.entries / elapsed:,.0f}/s)")
+        self.stream.write(" | ".join(parts) + end)
+        self.stream.flush()
+
+
+def default_progress(quiet: bool = False) -> ProgressReporter:
+    """Pick a throttled reporter for interactive runs, otherwise a no-op one."""
+    if quiet or not sys.stderr.isatty():
+        return NullProgress()
+    return ThrottledProgress()
@@ -46,6 +46,8 @@ class ReportGenerator:
 
         # Summary
         lines.append("## Summary Statistics\n")
+        if summary.get("sampled_entries"):
+            lines.append(self._format_sample(summary))
         lines.append(f"- **Total Queries Analyzed:** {summary['total_queries']}")
         lines.append(f"- **Unique Query Patterns:** {summary['unique_queries']}")
         lines.append(
@@ -54,10 +56,15 @@ class ReportGenerator:
         lines.append(f"- **Max Duration:** {summary['max_duration_overall']:.2f} ms")
         lines.append(f"- **P95 Duration:** {summary['p95_duration']:.2f} ms")
         lines.append(f"- **P99 Duration:** {summary['p99_duration']:.2f} ms")
-        lines.append(
-            f"- **Total Time Spent:** "
-            f"{summary['total_time_spent'] / 1000:.2f} seconds\n"
-        )
+        if summary.get("parse_errors"):
+            lines.append(self._format_parse_errors(summary))
+        total_time = f"{summary['total_time_spent'] / 1000:.2f} seconds"
+        if "total_time_spent_ci_low" in summary:
+            total_time += (
+                f" (95% CI {summary['total_time_spent_ci_low'] / 1000:.2f}"
+                f"–{summary['total_time_spent_ci_high'] / 1000:.2f})"
+            )
+        lines.append(f"- **Total Time Spent:** {total_time}\n")
 
         # Top queries
         lines.append("## Top Slow Queries (by Impact)\n")
@@ -69,7 +76,21 @@ class ReportGenerator:
             lines.append("```\n")
             lines.append(f"- **Average Duration:** {row['avg_duration']:.2f} ms")
             lines.append(f"- **Max Duration:** {row['max_duration']:.2f} ms")
-            lines.append(f"- **Frequency:** {row['frequency']} executions")
+            if "p50_duration" in row:
+                lines.append(
+                    f"- **Latency p50/p90/p95/p99:** {row['p50_duration']:.2f} / "
+                    f"{row['p90_duration']:.2f} / {row['p95_duration']:.2f} / "
+                    f"{row['p99_duration']:.2f} ms"
+                )
+            frequency = f"{row['frequency']} executions"
+            if "frequency_ci_low" in row:
+                frequency = (
+                    f"~{frequency} (95% CI {row['frequency_ci_low']:.0f}"
+                    f"–{row['frequency_ci_high']:.0f})"
+                )
+            lines.append(f"- **Frequency:** {frequency}")
+            if row.get("plan_count", 0):
+                lines.append(self._format_plan_stats(row))
             lines.append(f"- **Impact Score:** {row['impact_score']:.2f}\n")
 
             if recommendations and rank - 1 < len(recommendations):
@@ -176,6 +197,12 @@ class ReportGenerator:
             f"**Frequency**: {query.frequency} | "
             f"**Optimization Score**: {query.optimization_score:.1%}"
         )
+        if query.p50_duration:
+            analysis.append(
+                f"**Latency p50/p90/p95/p99**: {query.p50_duration:.2f} / "
+                f"{query.p90_duration:.2f} / {query.p95_duration:.2f} / "
+                f"{query.p99_duration:.2f} ms"
+            )
         analysis.append(f"**First seen**: {query.timestamp}\n")
 
         # Query code block
@@ -297,6 +324,42 @@ class ReportGenerator:
 
         return "\n".join(summary)
 
+    def _format_sample(self, summary: Dict) -> str:
+        """Note that the figures below are estimates from a sampled log."""
+        return (
+            f"- **Sampled:** {summary['sampled_entries']:.0f} of "
+            f"{summary['total_queries']:.0f} entries "
+            f"({summary['sample_fraction']:.2%}); counts and times are estimates"
+        )
+
+    def _format_parse_errors(self, summary: Dict) -> str:
+        """Summarize the malformed log entries skipped or cut while parsing."""
+        counts = [
+            f"{summary[key]:.0f} {key[len('parse_errors_'):].replace('_', ' ')}"
+            for key in summary
+            if key.startswith("parse_errors_") and summary[key]
+        ]
+        return (
+            f"- **Malformed Log Entries:** {summary['parse_errors']:.0f} "
+            f"({', '.join(counts)})"
+        )
+
+    def _format_plan_stats(self, row: pd.Series) -> str:
+        """Summarize the auto_explain plan columns of a report row."""
+        parts = [
+            f"{row['plan_count']} plans, {row['plan_shapes']} distinct shapes",
+            f"nodes: {row['plan_node_types']}",
+            f"shared buffers: {row['shared_hit_blocks']} hit / "
+            f"{row['shared_read_blocks']} read",
+            f"worst row estimate off by {row['max_row_misestimate']:.1f}x",
+        ]
+        if row["sort_spills"] or row["hash_spills"] or row["temp_written_blocks"]:
+            parts.append(
+                f"spills: {row['sort_spills']} sort, {row['hash_spills']} hash, "
+                f"{row['temp_written_blocks']} temp blocks written"
+            )
+        return f"- **Plans (auto_explain):** {'; '.join(parts)}"
+
     def _get_current_timestamp(self) -> str:
         """Get the current timestamp as a formatted string."""
         return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
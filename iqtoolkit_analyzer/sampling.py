@@ -0,0 +1,224 @@
+"""
+Sampling of slow query entries for a first look at very large logs.
+
+A ``SamplePlan`` keeps every entry at or above ``keep_above`` milliseconds
+and a uniform reservoir of ``size`` entries among the faster ones. Each
+kept row carries a ``sample_weight``: 1.0 for the always-kept entries, and
+entries seen / reservoir size for reservoir rows, so weighted sums estimate
+the counts and total time of the whole log.
+
+Reservoirs are filled with Li's Algorithm L, which draws the number of
+entries to skip before the next replacement instead of a random number per
+entry. Each file fills its own reservoir; the byte ranges of a file parsed
+with ``--workers`` fill one each, merged into one of ``size`` entries. Rows
+from reservoirs with the same weight are treated as one stratum when
+estimating confidence intervals.
+"""
+
+import math
+import random
+from dataclasses import dataclass, field
+from typing import Any, Dict, Generic, List, Mapping, Optional, Tuple, TypeVar
+
+import numpy as np
+import pandas as pd
+
+# Column holding the number of log entries each sampled row stands for
+SAMPLE_WEIGHT_COLUMN = "sample_weight"
+
+# Normal quantile of the two-sided 95% confidence intervals
+_Z_95 = 1.959964
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class SamplePlan:
+    """
+    How entries are sampled while parsing
+
+    Attributes:
+        size: Entries kept in the reservoir of fast entries
+        keep_above: Entries at least this slow (ms) are always kept
+        seed: Optional random seed, for reproducible samples
+    """
+
+    size: int
+    keep_above: float = 10_000.0
+    seed: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        if self.size < 1:
+            raise ValueError("Sample size must be at least 1")
+
+    def rng(self, salt: int = 0) -> random.Random:
+        """Random generator for one reservoir; ``salt`` separates byte ranges."""
+        return random.Random(None if self.seed is None else f"{self.seed}:{salt}")
+
+
+@dataclass
+class Reservoir(Generic[T]):
+    """Uniform sample of ``size`` items from a stream (Algorithm L)."""
+
+    size: int
+    rng: random.Random = field(default_factory=random.Random)
+    items: List[T] = field(default_factory=list)
+    seen: int = 0
+    _w: float = field(default=1.0, init=False, repr=False)
+    _next: int = field(default=0, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._w = math.exp(math.log(1.0 - self.rng.random()) / self.size)
+        self._next = self.size + self._skip()
+
+    def _skip(self) -> int:
+        """Draw how many items come before the next replacement, plus one."""
+        if self._w >= 1.0:
+            return 1
+        return int(math.log(1.0 - self.rng.random()) / math.log(1.0 - self._w)) + 1
+
+    def offer(self, item: T) -> None:
+        """Count one stream item, keeping it if it is drawn."""
+        self.seen += 1
+        if self.seen <= self.size:
+            self.items.append(item)
+        elif self.seen == self._next:
+            self.items[self.rng.randrange(self.size)] = item
+            self._w *= math.exp(math.log(1.0 - self.rng.random()) / self.size)
+            self._next += self._skip()
+
+    def merge(self, other: "Reservoir[T]") -> None:
+        """
+        Combine with the reservoir of another part of the stream
+
+        Kept items are drawn one at a time from either reservoir, in
+        proportion to the stream items each has seen and not yet drawn, so
+        the result is a uniform sample of both parts. Items must not be
+        offered after a merge.
+        """
+        if other.size != self.size:
+            raise ValueError("Cannot merge reservoirs of different sizes")
+        mine, theirs = list(self.items), list(other.items)
+        self.rng.shuffle(mine)
+        self.rng.shuffle(theirs)
+        left, right = self.seen, other.seen
+        items: List[T] = []
+        for _ in range(min(self.size, left + right)):
+            if self.rng.random() * (left + right) < left:
+                items.append(mine.pop())
+                left -= 1
+            else:
+                items.append(theirs.pop())
+                right -= 1
+        self.items = items
+        self.seen += other.seen
+
+    @property
+    def weight(self) -> float:
+        """Stream items each kept item stands for."""
+        return self.seen / len(self.items) if self.items else 1.0
+
+
+def sample_frame(df: pd.DataFrame, plan: SamplePlan) -> pd.DataFrame:
+    """
+    Apply a sample plan to an already parsed frame
+
+    Used for cached parses and the csv/json formats, which are read whole;
+    plain logs are sampled while streaming instead.
+
+    Returns:
+        The kept rows in timestamp order, with a ``sample_weight`` column
+    """
+    slow = df["duration_ms"].to_numpy() >= plan.keep_above
+    rest = df[~slow]
+    weights = np.ones(len(df), dtype=np.float64)
+    if len(rest) > plan.size:
+        keep = rest.sample(n=plan.size, random_state=plan.seed).index
+        weights[~slow] = len(rest) / plan.size
+        slow |= df.index.isin(keep)
+    sampled = df.assign(**{SAMPLE_WEIGHT_COLUMN: weights})[slow]
+    return sampled.sort_values("timestamp", kind="stable", ignore_index=True)
+
+
+def stratum_sizes(weights: Any) -> Dict[float, int]:
+    """Count the sampled rows of each weight, i.e. of each stratum."""
+    values, counts = np.unique(
+        np.asarray(weights, dtype=np.float64), return_counts=True
+    )
+    return {float(w): int(n) for w, n in zip(values, counts)}
+
+
+def estimate_total(
+    values: Any, weights: Any, strata: Mapping[float, int]
+) -> Tuple[float, float, float]:
+    """
+    Estimate a log-wide total from sampled rows, with a 95% interval
+
+    Each stratum is treated as a simple random sample without replacement
+    of ``n * w`` entries, and the rows of a subset (e.g. one query group)
+    as a domain of it: rows outside the subset count as zeros.
+
+    Args:
+        values: Per-row values of the rows in the subset (1 to count them)
+        weights: Per-row sample weights of the same rows
+        strata: Sampled rows per weight over the whole sample
+
+    Returns:
+        (estimate, low, high); the interval never goes below the sum
+        actually observed
+    """
+    y = np.asarray(values, dtype=np.float64)
+    w = np.asarray(weights, dtype=np.float64)
+    moments: Dict[float, Tuple[float, float, float]] = {}
+    for weight in np.unique(w):
+        in_stratum = y[w == weight]
+        moments[float(weight)] = (
+            float(in_stratum.size),
+            float(in_stratum.sum()),
+            float(np.dot(in_stratum, in_stratum)),
+        )
+    return estimate_from_moments(moments, strata)
+
+
+def estimate_from_moments(
+    moments: Mapping[float, Tuple[float, float, float]],
+    strata: Mapping[float, int],
+) -> Tuple[float, float, float]:
+    """
+    ``estimate_total`` from per-stratum sums instead of rows
+
+    Args:
+        moments: (rows, sum, sum of squares) of the subset's values, per
+            sample weight; sums of partial results add up
+        strata: Sampled rows per weight over the whole sample
+
+    Returns:
+        (estimate, low, high) as for ``estimate_total``
+    """
+    estimate = 0.0
+    observed = 0.0
+    variance = 0.0
+    for weight, (_, total, squares) in moments.items():
+        estimate += weight * total
+        observed += total
+        n = strata.get(weight, 0)
+        if weight <= 1.0 or n < 2:
+            continue
+        mean = total / n
+        s2 = (squares - n * mean * mean) / (n - 1)
+        population = n * weight
+        variance += population * population * (1.0 - 1.0 / weight) * s2 / n
+    margin = _Z_95 * math.sqrt(max(variance, 0.0))
+    return estimate, max(observed, estimate - margin), estimate + margin
+
+
+def weighted_percentile(values: Any, weights: Any, percentile: float) -> float:
+    """Percentile of sampled values, each standing for ``weight`` entries."""
+    v = np.asarray(values, dtype=np.float64)
+    if v.size == 0:
+        return 0.0
+    order = np.argsort(v, kind="stable")
+    v = v[order]
+    cumulative = np.cumsum(np.asarray(weights, dtype=np.float64)[order])
+    position = percentile * cumulative[-1]
+    return float(v[min(np.searchsorted(cumulative, position), v.size - 1)])
@@ -0,0 +1,186 @@
+"""
+Single-pass SQL normalization for grouping slow queries.
+
+``fingerprint_query`` lexes a statement once with one alternation regex
+that only matches the tokens that change: constants, comments, operators
+and badly spaced punctuation. Every branch starts with one literal
+character, so the regex engine skips words and spaces with a single
+character-set test and ``re.sub`` copies them without calling back into
+Python. Whitespace is then collapsed and the result lowercased, except inside
+quoted identifiers.
+
+Normalization rules:
+    constants: standard, national (``N'...'``), escape (``E'...'``), bit/hex
+        (``B'...'``, ``X'...'``), Unicode (``U&'...'``) and dollar-quoted strings,
+        integers, floats, hex numbers, unary minus signs and ``$1``
+        parameters all become ``?``
+    comments: ``--`` and ``/* */`` comments are dropped
+    identifiers: double-quoted identifiers (with ``""`` escapes) are copied
+        as written, neither lowercased nor lexed for constants or comments
+    layout: whitespace collapses to one space; there is no space inside
+        parentheses or before commas, one space after commas and around
+        operators (except ``*``, which is left as written). Operators
+        follow PostgreSQL's lexing: ``->>`` is one operator, ``=-1`` is
+        ``=`` and ``-1``
+    lists: ``IN`` lists of constants (each possibly parenthesized),
+        including lists of row constructors, and ``ARRAY[...]`` constants
+        collapse to a single ``?``; repeated rows of a multi-row ``VALUES``
+        list collapse to one
+    a trailing ``;`` is dropped
+
+So ``SELECT * FROM t WHERE id IN (1, -2,3) -- x`` and
+``select * from t where id in ($1)`` both become
+``select * from t where id in (?)``.
+"""
+
+import re
+from typing import List, Match
+
+_OPERATOR_CHARS = "-+*/<>=~!@#%^&|`?"
+
+# Rest of a PostgreSQL operator after its first character: "->>" is one
+# operator, but "=-1" is "=" then "-1" since a multi-character operator only
+# ends in + or - if it holds one of ~!@#%^&|`?
+_OPERATOR_TAIL = r"""
+    (?:(?:(?!--|/\*)[-+*/<>=~!@\#%^&|`?])*[~!@\#%^&|`?]
+        (?:(?!--|/\*)[-+*/<>=~!@\#%^&|`?])*
+    | (?:(?!--|/\*)[-+*/<>=])*[*/<>=](?<!/\*))
+"""
+_OPERATOR_REST = rf"{_OPERATOR_TAIL}?"
+_NUMBER = r"(?:0[xX][0-9a-fA-F]+|(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)(?![\w$])"
+_STRING = r"[nN]?'[^']*(?:''[^']*)*'"
+_CONSTANT = rf"(?:-?\s*{_NUMBER}|{_STRING}|\$\d+)"
+_LIST_ITEM = rf"(?:{_CONSTANT}|\(\s*{_CONSTANT}\s*\))"
+_LIST = rf"{_LIST_ITEM}(?:\s*,\s*{_LIST_ITEM})*"
+_ROWS = rf"\(\s*{_LIST}\s*\)(?:\s*,\s*\(\s*{_LIST}\s*\))*"
+
+# (first characters, rest of the token). A string's prefix letter is copied
+# before the callback sees the quote; E'...' strings allow \' escapes.
+_TOKENS = (
+    ('"', r'[^"]*(?:""[^"]*)*"'),
+    (
+        "'",
+        r"(?:(?:(?<=[^\w$][eE]')|(?<=^[eE]'))[^'\\]*(?:(?:\\.|'')[^'\\]*)*"
+        r"|[^']*(?:''[^']*)*)'",
+    ),
+    (
+        "0123456789",
+        r"(?<![\w$]\d)(?:(?<=0)[xX][0-9a-fA-F]+|\d*\.?\d*(?:[eE][+-]?\d+)?)"
+        r"(?![\w$])",
+    ),
+    (
+        "(",
+        r"(?:(?:(?<=[^\w$][iI][nN]\()|(?<=[^\w$][iI][nN]\s\())"
+        rf"\s*(?:{_LIST}|{_ROWS})\s*\)|\s+)",
+    ),
+    (",", r"(?!\ \S)"),
+    ("$", r"(?<![\w$]\$)(?:\d+|(?P<tag>[A-Za-z_]\w*|)\$.*?\$(?P=tag)\$)"),
+    (".", r"(?<![\w$)\]\"]\.)\d+(?:[eE][+-]?\d+)?(?![\w$])"),
+    ("-", r"-[^\n]*"),
+    ("/", r"\*.*?\*/"),
+    ("-", rf"\s*{_NUMBER}"),
+    # A lone * is left as written, so it is not matched at all
+    (_OPERATOR_CHARS.replace("*", ""), _OPERATOR_REST),
+    ("*", _OPERATOR_TAIL),
+)
+
+# One literal per branch lets the regex engine skip to the next character
+# that can start a token with a single set lookup
+_TOKEN_RE = re.compile(
+    "\n|".join(f"{re.escape(char)}{rest}" for chars, rest in _TOKENS for char in chars),
+    re.VERBOSE | re.DOTALL,
+)
+
+# Tokens starting with one of these are always operators, spaced as they are
+_SPACED_OPERATOR_START = frozenset(_OPERATOR_CHARS) - set("-/")
+
+# Placeholder for a string whose prefix letter is still in the output
+_PREFIXED = "\0"
+_PREFIXED_RE = re.compile(r"(?<![\w$])(?:[enbx]|u & )\0")
+
+# Quoted identifiers are kept out of the lowercasing and whitespace collapse
+# as '"\1<n>"' and put back afterwards
+_IDENTIFIER_RE = re.compile(r'"\x01(\d+)"')
+
+# A minus sign right after one of these is unary: "= -1", "(-1", "then -1"
+_UNARY_AFTER_RE = re.compile(
+    r"(?:[=<>!(,\[+\-*/%^|]|\b(?:and|else|or|return|select|then|when|by)"
+    r"|\b(?:limit|offset|between|values|not))\s*$",
+    re.IGNORECASE,
+)
+_ARRAY_RE = re.compile(r"\barray\[\?(?:, \?)*\]")
+# Rows of a multi-row VALUES list that normalized to the same text
+_VALUES_RE = re.compile(r"\bvalues (\((?:[^()]|\([^()]*\))*\))(?:, \1)+")
+
+
+def _replace_token(match: Match[str]) -> str:
+    """Canonical text of one token of ``_TOKEN_RE``."""
+    token = match.group()
+    first = token[0]
+    if first in _SPACED_OPERATOR_START:
+        return f" {token} "
+    if first == '"':
+        return token
+    if first == "'":
+        start = match.start()
+        if start and match.string[start - 1] in "eEnNbBxX&":
+            return _PREFIXED
+        return "?"
+    if first == "$" or first == "." or first.isdigit():
+        return "?"
+    if first == "(":
+        return "(?)" if token[-1] == ")" else "("
+    if first == ",":
+        return ", "
+    if token[:2] == "--" or token[:2] == "/*":
+        return " "
+    if first == "-" and token[-1] not in _OPERATOR_CHARS:
+        # "a -1" is a subtraction; keep its operator
+        text, start = match.string, match.start()
+        if _UNARY_AFTER_RE.search(text, max(0, start - 16), start):
+            return "?"
+        return " - ?"
+    return f" {token} "
+
+
+def fingerprint_query(query: str) -> str:
+    """
+    Normalize a SQL statement to the canonical form its group is keyed by
+
+    Args:
+        query: Raw SQL statement
+
+    Returns:
+        Lowercased statement with constants replaced by ``?`` (see module
+        docstring for the rules)
+    """
+    identifiers: List[str] = []
+    if '"' in query:
+
+        def replace(match: Match[str]) -> str:
+            token = match.group()
+            if token[0] != '"':
+                return _replace_token(match)
+            identifiers.append(token)
+            return f'"\x01{len(identifiers) - 1}"'
+
+        normalized = " ".join(_TOKEN_RE.sub(replace, query).split()).lower()
+    else:
+        normalized = " ".join(_TOKEN_RE.sub(_replace_token, query).split()).lower()
+    if _PREFIXED in normalized:
+        normalized = _PREFIXED_RE.sub("?", normalized).replace(_PREFIXED, "?")
+    if " )" in normalized:
+        normalized = normalized.replace(" )", ")")
+    if " ," in normalized:
+        normalized = normalized.replace(" ,", ",")
+    if "array[?" in normalized:
+        normalized = _ARRAY_RE.sub("array[?]", normalized)
+    if "values (" in normalized:
+        normalized = _VALUES_RE.sub(r"values \1", normalized)
+    if normalized.endswith(";"):
+        normalized = normalized[:-1].rstrip()
+    if identifiers:
+        normalized = _IDENTIFIER_RE.sub(
+            lambda match: identifiers[int(match.group(1))], normalized
+        )
+    return normalized
@@ -0,0 +1,241 @@
+"""
+Seeking to a time window in uncompressed plain-text logs.
+
+PostgreSQL appends entries in (nearly) timestamp order, so the byte range
+holding a ``since``/``until`` window can be found without reading the file:
+a binary search jumps to a byte offset, resyncs to the next entry header,
+reads its timestamp and halves the range, until the boundary is bracketed
+within one probe block. Only the bracketed byte range is then parsed, and
+the exact time filter is applied to its entries as usual.
+
+Backends write concurrently, so timestamps can be slightly out of order;
+the window is widened by ``SEEK_SLACK`` before seeking.
+
+For repeated windows over the same file, ``TimeIndex`` stores the offset of
+the first entry of every minute in a sidecar file next to the log
+(``<log>.timeindex``), turning each seek into a lookup. The index is built
+with one scan of entry headers and rebuilt when the file changes.
+"""
+
+import bisect
+import json
+import logging
+import mmap
+import os
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from typing import BinaryIO, List, Optional, Tuple
+
+from .log_prefix import LogLinePrefix, read_line_block
+from .parse_cache import LogFingerprint
+
+logger = logging.getLogger(__name__)
+
+# Bytes read per binary search probe; the search stops once the boundary is
+# bracketed within this many bytes
+_PROBE_BYTES = 64 * 1024
+# Allowance for entries written out of timestamp order
+SEEK_SLACK = timedelta(seconds=5)
+# Sidecar index file suffix
+TIME_INDEX_SUFFIX = ".timeindex"
+
+
+def _shift(bound: str, delta: timedelta) -> str:
+    """Move a ``YYYY-MM-DD HH:MM:SS[.fff]`` bound by ``delta``, as text."""
+    moved = datetime.fromisoformat(bound) + delta
+    return moved.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _next_entry(
+    f: BinaryIO, offset: int, end: int, line_prefix: LogLinePrefix
+) -> Optional[Tuple[int, str]]:
+    """(offset, timestamp) of the first entry header at or after ``offset``."""
+    pos = offset
+    while pos < end:
+        data, lead = read_line_block(f, pos, min(pos + _PROBE_BYTES, end))
+        if len(data) <= lead:
+            return None
+        for match in line_prefix.entry_start_bytes.finditer(data, lead):
+            timestamp = line_prefix.header_timestamp(data, match)
+            if timestamp is not None:
+                return pos - lead + match.start(), timestamp
+        # Continue from the start of the last (possibly cut) line
+        last_newline = data.rfind(b"\n", lead)
+        if last_newline < 0 or pos - lead + last_newline + 1 <= pos:
+            pos += len(data) - lead
+        else:
+            pos = pos - lead + last_newline + 1
+    return None
+
+
+def bracket_time_offset(
+    f: BinaryIO, size: int, target: str, line_prefix: LogLinePrefix
+) -> Tuple[int, int]:
+    """
+    Bracket the offset of the first entry logged at or after ``target``
+
+    Args:
+        f: Log file opened in binary mode
+        size: File size
+        target: Timestamp in the log's ``YYYY-MM-DD HH:MM:SS[.fff]`` layout
+        line_prefix: Matcher for entry headers
+
+    Returns:
+        (low, high): every entry starting before ``low`` is older than
+        ``target``, and the first entry starting at or after ``high`` is not
+    """
+    low, high = 0, size
+    while high - low > _PROBE_BYTES:
+        middle = (low + high) // 2
+        found = _next_entry(f, middle, high, line_prefix)
+        if found is None:
+            high = middle
+        elif found[1] < target:
+            low = found[0] + 1
+        else:
+            high = middle
+    return low, high
+
+
+def _minute_starts(
+    mm: mmap.mmap, line_prefix: LogLinePrefix
+) -> Tuple[List[str], List[int]]:
+    """Minutes of a mapped log and the offset of each one's first entry."""
+    minutes: List[str] = []
+    offsets: List[int] = []
+    raw_timestamps = "timestamp" in line_prefix.entry_start_bytes.groupindex
+    last_minute = ""
+    for match in line_prefix.entry_start_bytes.finditer(mm):
+        if raw_timestamps:
+            minute = match.group("timestamp")[:16].decode("ascii")
+        else:
+            timestamp = line_prefix.header_timestamp(mm, match)
+            if timestamp is None:
+                continue
+            minute = timestamp[:16]
+        # Entries written slightly out of order never move a minute back
+        if minute > last_minute:
+            minutes.append(minute)
+            offsets.append(match.start())
+            last_minute = minute
+    return minutes, offsets
+
+
+@dataclass
+class TimeIndex:
+    """Sparse index of a log file: first entry offset of every minute."""
+
+    fingerprint: LogFingerprint
+    minutes: List[str] = field(default_factory=list)
+    offsets: List[int] = field(default_factory=list)
+
+    @classmethod
+    def build(cls, log_file_path: str, line_prefix: LogLinePrefix) -> "TimeIndex":
+        """Scan every entry header of a log once."""
+        index = cls(LogFingerprint.of(log_file_path))
+        if index.fingerprint.size == 0:
+            return index
+        with open(log_file_path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                index.minutes, index.offsets = _minute_starts(mm, line_prefix)
+            finally:
+                mm.close()
+        return index
+
+    def bracket(self, target: str) -> Tuple[int, int]:
+        """Same contract as ``bracket_time_offset``, from the index."""
+        minute = target[:16]
+        size = self.fingerprint.size
+        # Entries before the first one of the target's minute are older; the
+        # first entry of the next minute is not
+        low = bisect.bisect_left(self.minutes, minute)
+        high = bisect.bisect_right(self.minutes, minute)
+        return (
+            self.offsets[low] if low < len(self.offsets) else size,
+            self.offsets[high] if high < len(self.offsets) else size,
+        )
+
+    def save(self, index_path: str) -> None:
+        temporary = index_path + ".tmp"
+        with open(temporary, "w") as f:
+            json.dump(asdict(self), f)
+        os.replace(temporary, index_path)
+
+    @classmethod
+    def load(cls, index_path: str) -> Optional["TimeIndex"]:
+        try:
+            with open(index_path, "r") as f:
+                data = json.load(f)
+            return cls(
+                LogFingerprint(**data["fingerprint"]),
+                data["minutes"],
+                data["offsets"],
+            )
+        except FileNotFoundError:
+            return None
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable time index {index_path}: {e}")
+            return None
+
+
+def load_or_build_time_index(
+    log_file_path: str, line_prefix: LogLinePrefix
+) -> TimeIndex:
+    """Load the sidecar index of a log, rebuilding it if the log changed."""
+    index_path = log_file_path + TIME_INDEX_SUFFIX
+    index = TimeIndex.load(index_path)
+    if index is not None and index.fingerprint == LogFingerprint.of(log_file_path):
+        return index
+    logger.info(f"Building time index {index_path}")
+    index = TimeIndex.build(log_file_path, line_prefix)
+    try:
+        index.save(index_path)
+    except OSError as e:
+        logger.warning(f"Could not write time index {index_path}: {e}")
+    return index
+
+
+def seek_time_window(
+    log_file_path: str,
+    since: Optional[str],
+    until: Optional[str],
+    line_prefix: LogLinePrefix,
+    use_index: bool = False,
+) -> Tuple[int, int]:
+    """
+    Byte range of an uncompressed plain log that holds a time window
+
+    Args:
+        log_file_path: Path to the log
+        since: Inclusive lower bound, as normalized by LogFilter, or None
+        until: Exclusive upper bound, as normalized by LogFilter, or None
+        line_prefix: Matcher for entry headers
+        use_index: Use (and maintain) the sidecar TimeIndex
+
+    Returns:
+        (start, end) for range parsing: entries whose header starts in
+        [start, end) include every entry of the window
+    """
+    size = os.path.getsize(log_file_path)
+    index = load_or_build_time_index(log_file_path, line_prefix) if use_index else None
+    start, end = 0, size
+    with open(log_file_path, "rb") as f:
+        if since is not None:
+            target = _shift(since, -SEEK_SLACK)
+            low, _ = (
+                index.bracket(target)
+                if index is not None
+                else bracket_time_offset(f, size, target, line_prefix)
+            )
+            start = low
+        if until is not None:
+            target = _shift(until, SEEK_SLACK)
+            _, high = (
+                index.bracket(target)
+                if index is not None
+                else bracket_time_offset(f, size, target, line_prefix)
+            )
+            end = max(start, high)
+    logger.info(f"Time window maps to bytes {start}-{end} of {size} in {log_file_path}")
+    return start, end
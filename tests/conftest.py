@@ -0,0 +1,52 @@
+import pytest
+
+_TEXT_PLAN = (
+    "2025-10-28 10:00:00.100 UTC [101] LOG:  duration: 250.000 ms  plan:\n"
+    "\tQuery Text: SELECT * FROM orders o JOIN customers c\n"
+    "\t  ON c.id = o.customer_id WHERE o.total > 100\n"
+    "\tHash Join  (cost=10.00..60.00 rows=10 width=64) "
+    "(actual time=1.000..240.000 rows=5000 loops=1)\n"
+    "\t  Hash Cond: (o.customer_id = c.id)\n"
+    "\t  Buffers: shared hit=120 read=880, temp read=40 written=40\n"
+    "\t  ->  Seq Scan on orders o  (cost=0.00..35.50 rows=10 width=32) "
+    "(actual time=0.010..200.000 rows=5000 loops=1)\n"
+    "\t        Filter: (total > 100)\n"
+    "\t        Buffers: shared hit=100 read=800\n"
+    "\t  ->  Hash  (cost=5.00..5.00 rows=100 width=32) "
+    "(actual time=0.500..0.500 rows=100 loops=1)\n"
+    "\t        Buckets: 1024  Batches: 4  Memory Usage: 9kB\n"
+    "\t        ->  Index Scan using customers_pkey on customers c  "
+    "(cost=0.15..5.00 rows=100 width=32) "
+    "(actual time=0.010..0.400 rows=100 loops=1)\n"
+)
+
+
+@pytest.fixture
+def text_plan():
+    """A text-format auto_explain entry of a plain log, with its Query Text."""
+    return _TEXT_PLAN
+
+
+@pytest.fixture
+def sampling_log(tmp_path):
+    """
+    Plain log of 3000 fast entries in two groups and 5 slow ones
+
+    Returns:
+        Path of the log and the total duration of its entries
+    """
+    path = tmp_path / "sampling.log"
+    lines = []
+    for i in range(3000):
+        query = "SELECT * FROM orders WHERE id = 1" if i % 3 else "SELECT 2"
+        lines.append(
+            f"2025-10-28 10:{i // 60 % 60:02d}:{i % 60:02d}.000 UTC [{i}] LOG:  "
+            f"duration: {10 + i % 7}.0 ms  statement: {query}\n"
+        )
+    for i in range(5):
+        lines.append(
+            f"2025-10-28 11:00:0{i}.000 UTC [9{i}] LOG:  "
+            f"duration: 5000.0 ms  statement: SELECT pg_sleep(5)\n"
+        )
+    path.write_text("".join(lines))
+    return path, 3000 * 13.0 + 5 * 5000.0
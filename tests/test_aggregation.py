@@ -0,0 +1,83 @@
+import random
+
+import pytest
+
+from iqtoolkit_analyzer.aggregation import merge_groups
+from iqtoolkit_analyzer.analyzer import SlowQueryAnalyzer
+from iqtoolkit_analyzer.explain import PlanStats
+
+
+def _records(count, seed=0):
+    rng = random.Random(seed)
+    records = []
+    for i in range(count):
+        table = rng.choice(["orders", "users", "events"])
+        records.append(
+            {
+                "statement": f"SELECT * FROM {table} WHERE id = {rng.randint(1, 99)}",
+                "duration": round(rng.uniform(1.0, 500.0), 3),
+                "timestamp": f"2025-10-28 10:{i // 60 % 60:02d}:{i % 60:02d}",
+            }
+        )
+    return records
+
+
+def _as_tuples(queries):
+    return [
+        (
+            q.normalized_query,
+            q.raw_query,
+            q.frequency,
+            pytest.approx(q.total_duration),
+            q.min_duration,
+            q.max_duration,
+            q.first_seen,
+            q.last_seen,
+        )
+        for q in queries
+    ]
+
+
+def test_merged_partial_groups_match_a_single_pass():
+    analyzer = SlowQueryAnalyzer()
+    records = _records(600)
+    whole = analyzer.summarize_groups(analyzer.accumulate(records).values())
+
+    parts = [analyzer.accumulate(records[i : i + 150]) for i in range(0, 600, 150)]
+    # (a + b) + (c + d) == ((a + b) + c) + d
+    left = merge_groups(parts[0], parts[1].values())
+    right = merge_groups(parts[2], parts[3].values())
+    merged = merge_groups(left, right.values())
+
+    assert list(merged) == list(analyzer.accumulate(records))
+    assert _as_tuples(analyzer.summarize_groups(merged.values())) == _as_tuples(whole)
+    for group in merged.values():
+        assert group.timing.sketch.count == group.timing.entries
+
+
+def test_plan_entries_only_time_groups_without_statements():
+    analyzer = SlowQueryAnalyzer()
+    plan = PlanStats(fingerprint="f", node_types={"Seq Scan": 1})
+    groups = analyzer.accumulate(
+        [
+            {
+                "statement": "SELECT * FROM a",
+                "duration": 250.0,
+                "timestamp": "t1",
+                "plan": plan,
+            },
+            {"statement": "SELECT * FROM a", "duration": 10.0, "timestamp": "t2"},
+            {
+                "statement": "SELECT * FROM b",
+                "duration": 30.0,
+                "timestamp": "t3",
+                "plan": plan,
+            },
+        ]
+    )
+    both, plan_only = groups.values()
+    assert both.timing is both.statements
+    assert (both.timing.entries, both.timing.total) == (1, 10.0)
+    assert both.plans is not None and both.plans.plans == 1
+    assert plan_only.timing is plan_only.plan_entries
+    assert plan_only.timing.total == 30.0
@@ -0,0 +1,186 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from iqtoolkit_analyzer import analyzer, parser
+from iqtoolkit_analyzer.analyzer import ANALYSIS_ENGINES, run_slow_query_analysis
+from iqtoolkit_analyzer.sampling import SamplePlan
+
+
+def _assert_engines_agree(df, **kwargs):
+    columnar, columnar_summary = run_slow_query_analysis(
+        df, top_n=0, engine="columnar", **kwargs
+    )
+    records, records_summary = run_slow_query_analysis(
+        df, top_n=0, engine="records", **kwargs
+    )
+    pd.testing.assert_frame_equal(columnar, records)
+    for key in ("normalize_cache_hits", "normalize_cache_misses"):
+        columnar_summary.pop(key)
+        records_summary.pop(key)
+    assert columnar_summary == pytest.approx(records_summary)
+    return columnar, columnar_summary
+
+
+def test_engines_agree_on_a_plain_frame():
+    df = pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2025-10-28", periods=8, freq="min"),
+            "duration_ms": [120.0, 80.0, 300.0, 5.0, 95.0, 410.0, 60.0, 150.0],
+            "query": [
+                "SELECT * FROM users WHERE id = 1",
+                "SELECT * FROM users WHERE id = 2",
+                "UPDATE orders SET total = 10 WHERE id = 3",
+                "SELECT 1",
+                "SELECT * FROM users WHERE id = 3",
+                "UPDATE orders SET total = 20 WHERE id = 4",
+                "SELECT 1",
+                "SELECT * FROM users WHERE id = 1",
+            ],
+        }
+    )
+    top, summary = _assert_engines_agree(df, min_duration=50.0)
+    assert summary["total_queries"] == 7
+    users = top.set_index("normalized_query").loc["select * from users where id = ?"]
+    assert users["frequency"] == 4
+    assert users["example_query"] == "SELECT * FROM users WHERE id = 1"
+    assert users["first_seen"] == "2025-10-28 00:00:00"
+    assert users["last_seen"] == "2025-10-28 00:07:00"
+    # Group percentiles come from the group's sketch, within 1%
+    assert users["p50_duration"] == pytest.approx(95.0, rel=0.01)
+    assert users["p99_duration"] == pytest.approx(150.0, rel=0.01)
+
+
+def test_engines_agree_on_sampled_and_plan_frames(tmp_path, sampling_log, text_plan):
+    log_file, _ = sampling_log
+    plan = SamplePlan(size=300, keep_above=1000.0, seed=3)
+    _assert_engines_agree(parser.parse_postgres_log(str(log_file), sample=plan))
+
+    log_file = tmp_path / "plans.log"
+    log_file.write_text(
+        text_plan + "2025-10-28 10:00:05.000 UTC [102] LOG:  duration: 40.000 ms  "
+        "statement: SELECT 1\n"
+    )
+    top, _ = _assert_engines_agree(parser.parse_postgres_log(str(log_file)))
+    assert top["plan_count"].tolist() == [1, 0]
+
+
+def test_unknown_engine_is_rejected():
+    assert "columnar" in ANALYSIS_ENGINES
+    with pytest.raises(ValueError, match="analysis engine"):
+        run_slow_query_analysis(pd.DataFrame(), engine="pandas")
+
+
+def test_large_inputs_take_summary_percentiles_from_a_sketch(monkeypatch):
+    durations = np.random.default_rng(5).lognormal(4.0, 1.0, 5_000)
+    df = pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2025-10-28", periods=5_000, freq="s"),
+            "duration_ms": durations,
+            "query": ["SELECT 1"] * 5_000,
+        }
+    )
+    monkeypatch.setattr(analyzer, "SKETCH_PERCENTILE_THRESHOLD", 1_000)
+    _, summary = run_slow_query_analysis(df, top_n=0)
+    assert summary["p95_duration"] == pytest.approx(
+        np.percentile(durations, 95), rel=0.02
+    )
+    assert summary["p99_duration"] == pytest.approx(
+        np.percentile(durations, 99), rel=0.02
+    )
+
+
+def test_top_n_groups_are_selected_before_static_analysis(sampling_log, monkeypatch):
+    log_file, _ = sampling_log
+    sampled = parser.parse_postgres_log(
+        str(log_file), sample=SamplePlan(size=300, keep_above=1000.0, seed=3)
+    )
+    rng = np.random.default_rng(11)
+    plain = pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2025-10-28", periods=2_000, freq="s"),
+            "duration_ms": rng.exponential(50.0, 2_000).round(1),
+            "query": [
+                f"SELECT * FROM t{i} WHERE id = 1" for i in rng.integers(0, 300, 2_000)
+            ],
+        }
+    )
+    analyzed = []
+    find_antipatterns = analyzer.StaticQueryRewriter.find_antipatterns
+    monkeypatch.setattr(
+        analyzer.StaticQueryRewriter,
+        "find_antipatterns",
+        lambda self, query: analyzed.append(query) or find_antipatterns(self, query),
+    )
+    for df in (plain, sampled):
+        for engine in ANALYSIS_ENGINES:
+            every, every_summary = run_slow_query_analysis(df, top_n=0, engine=engine)
+            analyzed.clear()
+            top, summary = run_slow_query_analysis(df, top_n=3, engine=engine)
+            assert len(analyzed) == 3
+            pd.testing.assert_frame_equal(top, every.head(3))
+            for key in ("normalize_cache_hits", "normalize_cache_misses"):
+                del summary[key], every_summary[key]
+            assert summary == every_summary
+
+
+def test_slow_queries_are_slotted_and_render_reports_lazily(monkeypatch):
+    def fail(matches):
+        raise AssertionError("report rendered")
+
+    df = pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2025-10-28", periods=2, freq="min"),
+            "duration_ms": [120.0, 80.0],
+            "query": ["SELECT * FROM users WHERE lower(email) = 'a@b.c'"] * 2,
+        }
+    )
+    with monkeypatch.context() as patched:
+        patched.setattr(analyzer, "format_rewrite_report", fail)
+        top, _ = run_slow_query_analysis(df, top_n=0)
+    assert "static_analysis_report" not in top.columns
+
+    (query,) = run_slow_query_analysis(
+        [
+            {
+                "statement": "SELECT * FROM users WHERE lower(email) = 'a@b.c'",
+                "duration": 120.0,
+                "timestamp": "2025-10-28 10:00:00",
+            }
+        ],
+        min_duration=0,
+    )
+    assert not hasattr(query, "__dict__")
+    assert query.antipattern_matches
+    assert query.optimization_score < 1.0
+    assert "Function On Column" in query.static_analysis_report
+
+
+def test_incremental_analysis_merges_batches():
+    df = pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2025-10-28", periods=6, freq="min"),
+            "duration_ms": [120.0, 80.0, 300.0, 95.0, 410.0, 150.0],
+            "query": [
+                "SELECT * FROM users WHERE id = 1",
+                "SELECT * FROM users WHERE id = 2",
+                "UPDATE orders SET total = 10 WHERE id = 3",
+                "SELECT * FROM users WHERE id = 3",
+                "UPDATE orders SET total = 20 WHERE id = 4",
+                "DELETE FROM carts WHERE id = 5",
+            ],
+        }
+    )
+    incremental = analyzer.IncrementalAnalysis(min_duration=90.0)
+    incremental.add_frame(df.iloc[:3])
+    first, _ = incremental.result(top_n=0)
+    assert first["frequency"].tolist() == [1, 1]
+    incremental.add_frame(df.iloc[3:])
+    top, summary = incremental.result(top_n=2)
+
+    expected, expected_summary = run_slow_query_analysis(df, top_n=2, min_duration=90.0)
+    pd.testing.assert_frame_equal(top, expected)
+    assert summary["total_queries"] == expected_summary["total_queries"] == 5
+    assert summary["unique_queries"] == 3
+    assert summary["total_time_spent"] == pytest.approx(1075.0)
+    assert summary["max_duration_overall"] == 410.0
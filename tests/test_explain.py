@@ -0,0 +1,92 @@
+import json
+
+from iqtoolkit_analyzer import parser
+from iqtoolkit_analyzer.analyzer import run_slow_query_analysis
+from iqtoolkit_analyzer.explain import parse_plan
+
+JSON_PLAN = {
+    "Query Text": "SELECT * FROM events ORDER BY created_at",
+    "Plan": {
+        "Node Type": "Sort",
+        "Plan Rows": 1000,
+        "Actual Rows": 1000,
+        "Actual Loops": 1,
+        "Sort Space Type": "Disk",
+        "Shared Hit Blocks": 5,
+        "Shared Read Blocks": 50,
+        "Temp Written Blocks": 30,
+        "Plans": [
+            {
+                "Node Type": "Seq Scan",
+                "Relation Name": "events",
+                "Plan Rows": 1000,
+                "Actual Rows": 1000,
+                "Shared Hit Blocks": 5,
+                "Shared Read Blocks": 50,
+            }
+        ],
+    },
+}
+
+
+def test_text_and_json_plans_are_summarized(text_plan):
+    query, stats = parse_plan(text_plan.splitlines(True)[1:])
+    assert query == (
+        "SELECT * FROM orders o JOIN customers c\n"
+        "  ON c.id = o.customer_id WHERE o.total > 100"
+    )
+    assert stats is not None
+    assert stats.node_types == {
+        "Hash Join": 1,
+        "Seq Scan": 1,
+        "Hash": 1,
+        "Index Scan": 1,
+    }
+    assert (stats.estimated_rows, stats.actual_rows) == (10, 5000)
+    assert stats.max_row_misestimate == 500.0
+    assert (stats.shared_hit_blocks, stats.shared_read_blocks) == (120, 880)
+    assert stats.temp_written_blocks == 40
+    assert (stats.sort_spills, stats.hash_spills) == (0, 1)
+
+    # The shape ignores costs and row counts
+    _, same_shape = parse_plan(
+        text_plan.replace("rows=5000", "rows=7").splitlines(True)[1:]
+    )
+    assert same_shape is not None
+    assert same_shape.fingerprint == stats.fingerprint
+
+    document = json.dumps(JSON_PLAN, indent=2).replace("\n", "\n\t")
+    query, stats = parse_plan(("\t" + document + "\n").splitlines(True))
+    assert query == "SELECT * FROM events ORDER BY created_at"
+    assert stats is not None
+    assert stats.node_types == {"Sort": 1, "Seq Scan": 1}
+    assert (stats.shared_read_blocks, stats.temp_written_blocks) == (50, 30)
+    assert (stats.sort_spills, stats.hash_spills) == (1, 0)
+
+
+def test_plans_are_attached_to_query_groups(tmp_path, text_plan):
+    log_file = tmp_path / "postgresql.log"
+    log_file.write_text(
+        "2025-10-28 10:00:00.000 UTC [101] LOG:  connection authorized\n"
+        + text_plan
+        + "2025-10-28 10:00:00.100 UTC [101] LOG:  duration: 250.000 ms  "
+        "statement: SELECT * FROM orders o JOIN customers c\n"
+        "\t  ON c.id = o.customer_id WHERE o.total > 100\n"
+        "2025-10-28 10:00:05.000 UTC [102] LOG:  duration: 40.000 ms  "
+        "statement: SELECT 1\n"
+    )
+
+    for engine in parser.PARSE_ENGINES:
+        df = parser.parse_postgres_log(str(log_file), engine=engine)
+        assert len(df) == 3
+        assert df["plan"].notna().tolist() == [True, False, False]
+
+        top, summary = run_slow_query_analysis(df, top_n=5)
+        # The auto_explain entry repeats the statement entry; it is not
+        # counted twice
+        assert summary["total_queries"] == 2
+        joined = top[top["plan_count"] > 0].iloc[0]
+        assert joined["frequency"] == 1
+        assert joined["shared_read_blocks"] == 880
+        assert joined["hash_spills"] == 1
+        assert top[top["plan_count"] == 0].iloc[0]["example_query"] == "SELECT 1"
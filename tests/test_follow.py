@@ -0,0 +1,57 @@
+from iqtoolkit_analyzer.follow import LogCheckpoint, read_new_entries
+
+
+def _entry(second, query, continuation=""):
+    return (
+        f"2025-10-28 10:00:{second:02d}.000 UTC [1]: LOG:  "
+        f"duration: {second + 1}.0 ms  statement: {query}\n{continuation}"
+    )
+
+
+def test_only_new_bytes_are_parsed(tmp_path):
+    log_file = tmp_path / "postgresql.log"
+    checkpoint_file = tmp_path / "state" / "checkpoint.json"
+    log_file.write_text(_entry(1, "SELECT 1") + _entry(2, "SELECT 2"))
+
+    df, checkpoint = read_new_entries(str(log_file))
+    # The last entry may still grow, so it is held back
+    assert df["query"].tolist() == ["SELECT 1"]
+    checkpoint.save(str(checkpoint_file))
+
+    with open(log_file, "a") as f:
+        f.write("\tFROM t\n" + _entry(3, "SELECT 3"))
+    checkpoint = LogCheckpoint.load(str(checkpoint_file))
+    df, checkpoint = read_new_entries(str(log_file), checkpoint)
+    assert df["query"].tolist() == ["SELECT 2\n\tFROM t"]
+
+    df, checkpoint = read_new_entries(str(log_file), checkpoint)
+    assert df.empty
+    assert checkpoint.pending == _entry(3, "SELECT 3")
+
+
+def test_rotation_and_truncation(tmp_path):
+    log_file = tmp_path / "postgresql.log"
+    log_file.write_text(_entry(1, "SELECT 1") + _entry(2, "SELECT 2"))
+    _, checkpoint = read_new_entries(str(log_file))
+
+    # Rotated by rename: the rest of the old file is still read
+    with open(log_file, "a") as f:
+        f.write(_entry(3, "SELECT 3"))
+    log_file.rename(tmp_path / "postgresql.log.1")
+    log_file.write_text(_entry(4, "SELECT 4") + _entry(5, "SELECT 5"))
+    df, checkpoint = read_new_entries(str(log_file), checkpoint)
+    assert df["query"].tolist() == ["SELECT 2", "SELECT 3", "SELECT 4"]
+
+    # Truncated in place: the saved trailing entry is flushed
+    log_file.write_text("")
+    df, checkpoint = read_new_entries(str(log_file), checkpoint)
+    assert df["query"].tolist() == ["SELECT 5"]
+    assert checkpoint.offset == 0
+
+    # Rotated away entirely: the saved trailing entry is flushed
+    log_file.write_text(_entry(6, "SELECT 6") + _entry(7, "SELECT 7"))
+    _, checkpoint = read_new_entries(str(log_file), checkpoint)
+    log_file.unlink()
+    log_file.write_text(_entry(8, "SELECT 8"))
+    df, checkpoint = read_new_entries(str(log_file), checkpoint)
+    assert df["query"].tolist() == ["SELECT 7"]
@@ -0,0 +1,61 @@
+import pytest
+
+from iqtoolkit_analyzer import parser
+from iqtoolkit_analyzer.log_prefix import compile_log_line_prefix
+
+LOG = (
+    "2025-10-28 10:00:00.123 UTC [101] app@orders LOG:  duration: 12.5 ms  "
+    "statement: SELECT 1\n"
+    "2025-10-28 10:00:01.000 UTC [102] LOG:  checkpoint starting: time\n"
+    "2025-10-28 10:00:02.500 UTC [103] etl@stats LOG:  duration: 900.0 ms  "
+    "statement: INSERT INTO audit VALUES (\n"
+    "2025-10-28 10:00:02 is a literal inside the statement)\n"
+    "2025-10-28 10:00:03.000 UTC [104] app@orders ERROR:  relation missing\n"
+)
+
+
+def test_prefix_fields_become_typed_columns(tmp_path):
+    log_file = tmp_path / "postgresql.log"
+    log_file.write_text(LOG)
+
+    for engine in parser.PARSE_ENGINES:
+        df = parser.parse_postgres_log(
+            str(log_file), engine=engine, log_line_prefix="%m [%p] %q%u@%d "
+        )
+        assert df["query"].tolist() == [
+            "SELECT 1",
+            "INSERT INTO audit VALUES (\n"
+            "2025-10-28 10:00:02 is a literal inside the statement)",
+        ]
+        assert df["pid"].tolist() == [101, 103]
+        assert str(df["pid"].dtype) == "Int64"
+        assert df["user"].tolist() == ["app", "etl"]
+        assert df["database"].dtype == "category"
+
+        df = parser.parse_postgres_log(
+            str(log_file),
+            engine=engine,
+            log_line_prefix="%m [%p] %q%u@%d ",
+            users=["etl"],
+        )
+        assert df["query"].str.startswith("INSERT").tolist() == [True]
+
+
+def test_compiled_prefix_rejects_other_lines():
+    prefix = compile_log_line_prefix("%t:%r:%u@%d:[%p]:%%")
+    match = prefix.entry_start.match(
+        "2025-10-28 10:00:00 UTC:10.0.0.5(5432):app@orders:[77]:%LOG:  x"
+    )
+    assert match is not None
+    assert prefix.timestamp(match) == "2025-10-28 10:00:00"
+    assert prefix.fields == ("connection_from", "user", "database", "pid")
+    assert prefix.field_values(match) == ("10.0.0.5(5432)", "app", "orders", "77")
+    assert prefix.identity(prefix.field_values(match)) == ("app", "orders")
+    assert prefix.entry_start.match("2025-10-28 10:00:00 UTC something else") is None
+
+    epoch = compile_log_line_prefix("%n [%p] ")
+    match = epoch.entry_start.match("1761645600.250 [7] LOG:  x")
+    assert epoch.timestamp(match) == "2025-10-28 10:00:00.250"
+
+    with pytest.raises(ValueError):
+        compile_log_line_prefix("[%p] %u@%d ")
@@ -0,0 +1,69 @@
+import bz2
+import gzip
+import lzma
+
+import pytest
+
+from iqtoolkit_analyzer import log_sources, parser
+
+
+def _log_bytes(count):
+    lines = []
+    for i in range(count):
+        lines.append(
+            f"2025-10-28 10:{i // 60:02d}:{i % 60:02d}.000 UTC [{i}]: LOG:  "
+            f"duration: {i + 1}.5 ms  statement: SELECT {i}\n\tFROM some_table\n"
+        )
+    return "".join(lines).encode()
+
+
+@pytest.mark.parametrize(
+    "suffix, compress, compression",
+    [
+        (".gz", gzip.compress, "gzip"),
+        (".bz2", bz2.compress, "bz2"),
+        (".xz", lzma.compress, "xz"),
+    ],
+)
+def test_compressed_logs_are_streamed(tmp_path, suffix, compress, compression):
+    data = _log_bytes(30)
+    plain_file = tmp_path / "postgresql.log"
+    plain_file.write_bytes(data)
+    # The extension is deliberately wrong: magic bytes win
+    compressed_file = tmp_path / "postgresql.log.1"
+    compressed_file.write_bytes(compress(data))
+
+    assert log_sources.detect_compression(str(plain_file)) is None
+    assert log_sources.detect_compression(str(compressed_file)) == compression
+
+    expected = parser.parse_postgres_log(str(plain_file))
+    for engine in parser.PARSE_ENGINES:
+        df = parser.parse_postgres_log(str(compressed_file), engine=engine)
+        assert df["query"].tolist() == expected["query"].tolist()
+
+
+def test_zstd_frames_are_parsed_in_parallel(tmp_path, monkeypatch):
+    zstandard = pytest.importorskip("zstandard")
+    data = _log_bytes(200)
+    compressor = zstandard.ZstdCompressor(write_checksum=True)
+    # Frame boundaries deliberately fall in the middle of lines
+    frames = [compressor.compress(data[i : i + 997]) for i in range(0, len(data), 997)]
+    log_file = tmp_path / "postgresql.log.zst"
+    log_file.write_bytes(b"".join(frames))
+
+    found = log_sources.zstd_frames(str(log_file))
+    assert [length for _, length in found] == [len(frame) for frame in frames]
+
+    serial = parser.parse_postgres_log(str(log_file))
+    assert len(serial) == 200
+
+    ranges = parser._plan_frame_ranges(found, workers=4)
+    assert len(ranges) > 1
+    chunked = parser._join_range_columns(
+        parser._parse_plain_range((str(log_file), start, end, "zstd", None, None))
+        for start, end in ranges
+    )
+    assert chunked.queries == serial["query"].tolist()
+
+    parallel = parser.parse_postgres_log(str(log_file), workers=2)
+    assert sorted(parallel["query"]) == sorted(serial["query"])
@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+
+from iqtoolkit_analyzer import analyzer
+from iqtoolkit_analyzer.analyzer import normalize_query, run_slow_query_analysis
+from iqtoolkit_analyzer.normalize_cache import NormalizeCache
+
+
+def test_cache_counts_hits_and_evicts_least_recently_used():
+    cache = NormalizeCache(normalize_query, "fingerprint", maxsize=2)
+    first = cache.lookup("SELECT 1")
+    assert cache.lookup("SELECT 1") is first
+    cache.lookup("SELECT 2")
+    cache.lookup("SELECT 1")
+    cache.lookup("SELECT 3")  # evicts "SELECT 2"
+    cache.lookup("SELECT 2")
+    assert cache.stats() == {"hits": 2, "misses": 4, "size": 2}
+    assert first[0] == "select ?"
+
+
+def test_cache_survives_a_save_and_load(tmp_path):
+    cache_file = str(tmp_path / "normalize.json")
+    cache = NormalizeCache(normalize_query, "fingerprint")
+    expected = cache.lookup("SELECT * FROM t WHERE id = 42")
+    cache.save(cache_file)
+
+    reloaded = NormalizeCache(normalize_query, "fingerprint")
+    assert reloaded.load(cache_file) == 1
+    assert reloaded.lookup("SELECT * FROM t WHERE id = 42") == expected
+    assert reloaded.stats()["hits"] == 1
+    # Entries of another mode are not reused
+    assert NormalizeCache(normalize_query, "legacy").load(cache_file) == 0
+
+
+@pytest.fixture
+def fresh_normalize_caches(monkeypatch):
+    """Empty process-wide normalization caches, restored after the test."""
+    monkeypatch.setattr(analyzer, "_NORMALIZE_CACHES", {})
+
+
+def test_analysis_reports_cache_counters(fresh_normalize_caches):
+    df = pd.DataFrame(
+        {
+            "timestamp": ["2025-10-28 10:00:00"] * 4,
+            "duration_ms": [100.0] * 4,
+            "query": ["SELECT * FROM cache_test WHERE id = 7"] * 3 + ["SELECT 9"],
+        }
+    )
+    _, summary = run_slow_query_analysis(
+        df, top_n=0, normalize_mode="legacy", engine="records"
+    )
+    assert summary["normalize_cache_hits"] == 2
+    assert summary["normalize_cache_misses"] == 2
+    # The columnar engine looks up each distinct statement once
+    _, summary = run_slow_query_analysis(df, top_n=0, normalize_mode="legacy")
+    assert summary["normalize_cache_hits"] == 2
+    assert summary["normalize_cache_misses"] == 0
@@ -0,0 +1,55 @@
+import pytest
+
+from iqtoolkit_analyzer import parser
+
+pytest.importorskip("pyarrow")
+
+LOG = (
+    "2025-10-28 10:00:00.100 UTC [101] LOG:  duration: 50.0 ms  statement: SELECT 1\n"
+    "2025-10-28 10:00:01.100 UTC [101] LOG:  duration: 250.000 ms  plan:\n"
+    "\tQuery Text: SELECT * FROM t\n"
+    "\tSeq Scan on t  (cost=0.00..35.50 rows=10 width=4) "
+    "(actual time=0.010..0.200 rows=2500 loops=1)\n"
+    "2025-10-28 10:00:02.100 UTC [102] LOG:  duration: 900.0 ms  statement: SELECT 2\n"
+)
+
+
+def test_parsed_log_is_reused_until_the_file_changes(tmp_path, monkeypatch):
+    log_file = tmp_path / "postgresql.log"
+    log_file.write_text(LOG)
+    cache_dir = tmp_path / "cache"
+
+    first = parser.parse_postgres_log(str(log_file), cache_dir=str(cache_dir))
+    assert len(list(cache_dir.iterdir())) == 1
+
+    parse = parser._parse_log_format
+
+    def no_parse(*args, **kwargs):
+        raise AssertionError("parsed again")
+
+    monkeypatch.setattr(parser, "_parse_log_format", no_parse)
+    cached = parser.parse_postgres_log(str(log_file), cache_dir=str(cache_dir))
+    assert cached["query"].tolist() == first["query"].tolist()
+    assert cached["timestamp"].tolist() == first["timestamp"].tolist()
+    assert cached["plan"].iloc[1].node_types == {"Seq Scan": 1}
+
+    # Thresholds and projection are applied to the cached frame
+    cached = parser.parse_postgres_log(
+        str(log_file),
+        cache_dir=str(cache_dir),
+        min_duration=100,
+        until="2025-10-28 10:00:02",
+        columns=["duration_ms", "query"],
+    )
+    assert list(cached.columns) == ["duration_ms", "query"]
+    assert cached["query"].tolist() == ["SELECT * FROM t"]
+
+    monkeypatch.setattr(parser, "_parse_log_format", parse)
+    with open(log_file, "a") as f:
+        f.write(
+            "2025-10-28 10:00:03.100 UTC [103] LOG:  duration: 5.0 ms  "
+            "statement: SELECT 3\n"
+        )
+    appended = parser.parse_postgres_log(str(log_file), cache_dir=str(cache_dir))
+    assert appended["query"].iloc[-1] == "SELECT 3"
+    assert len(list(cache_dir.iterdir())) == 2
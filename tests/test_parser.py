@@ -1,4 +1,11 @@
+import random
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
 from iqtoolkit_analyzer import parser
+from iqtoolkit_analyzer.analyzer import run_slow_query_analysis
 
 
 def test_multiline_query_parsing(tmp_path):
@@ -30,3 +37,497 @@ def test_unusual_characters(tmp_path):
     df = parser.parse_postgres_log(str(log_file))
     assert len(df) == 1
     assert "测试用户" in df.iloc[0]["query"]
+
+
+def test_streaming_parser_skips_non_slow_entries():
+    lines = [
+        "2025-10-28 10:15:30.123 UTC [1]: LOG:  connection received\n",
+        "2025-10-28 10:15:31.000 UTC [1]: LOG:  duration: 12.5 ms  "
+        "statement: SELECT a\n",
+        "\tFROM t\n",
+        "2025-10-28 10:15:32.000 UTC [2]: LOG:  checkpoint starting: time\n",
+        "\tnot part of any statement\n",
+        "2025-10-28 10:15:33.000 UTC [3]: LOG:  duration: 7 ms  "
+        "statement: SELECT 1\n",
+    ]
+    entries = list(parser.iter_plain_log_entries(iter(lines)))
+    assert [e.duration_ms for e in entries] == [12.5, 7.0]
+    assert entries[0].timestamp == "2025-10-28 10:15:31.000"
+    assert entries[0].query == "SELECT a\n\tFROM t"
+    assert entries[1].query == "SELECT 1"
+
+
+def _write_many_entries(path, count):
+    lines = []
+    for i in range(count):
+        lines.append(
+            f"2025-10-28 10:{i // 60:02d}:{i % 60:02d}.000 UTC [{i}]: LOG:  "
+            f"duration: {i + 1}.5 ms  statement: SELECT {i}\n"
+        )
+        lines.append("\tFROM some_table\n")
+        lines.append(
+            f"2025-10-28 10:{i // 60:02d}:{i % 60:02d}.500 UTC [{i}]: LOG:  x\n"
+        )
+    path.write_text("".join(lines))
+
+
+def test_byte_ranges_parse_each_entry_once(tmp_path):
+    log_file = tmp_path / "big.log"
+    _write_many_entries(log_file, 50)
+    serial = list(parser._iter_plain_file_entries(str(log_file)))
+
+    ranges = parser._plan_byte_ranges(log_file.stat().st_size, 4, min_chunk_bytes=64)
+    assert len(ranges) == 16
+    chunked = parser._join_range_columns(
+        parser._parse_plain_range((str(log_file), start, end, "stream", None, None))
+        for start, end in ranges
+    )
+
+    assert chunked == parser._collect_columns(serial)
+    assert len(chunked) == 50
+
+
+def test_parse_plain_log_range_reads_entries_starting_in_the_range(tmp_path):
+    log_file = tmp_path / "big.log"
+    _write_many_entries(log_file, 10)
+    serial = parser.parse_postgres_log(str(log_file))
+    middle = log_file.stat().st_size // 2
+    leading = ["2025-10-28 09:59:59 UTC [7]: LOG:  duration: 9.0 ms  statement: X\n"]
+
+    head = parser.parse_plain_log_range(str(log_file), 0, middle)
+    tail = parser.parse_plain_log_range(str(log_file), middle, leading_lines=leading)
+
+    assert head["query"].tolist() + tail["query"].tolist()[1:] == (
+        serial["query"].tolist()
+    )
+    assert tail["query"].iloc[0] == "X"
+
+
+def test_parallel_parse_matches_serial(tmp_path, monkeypatch):
+    log_file = tmp_path / "big.log"
+    _write_many_entries(log_file, 40)
+    monkeypatch.setattr(parser, "_MIN_CHUNK_BYTES", 256)
+
+    serial = parser.parse_postgres_log(str(log_file))
+    parallel = parser.parse_postgres_log(str(log_file), workers=2)
+
+    assert parallel["query"].tolist() == serial["query"].tolist()
+    assert parallel["timestamp"].is_monotonic_increasing
+
+
+@pytest.mark.parametrize("engine", ["stream", "mmap"])
+def test_parallel_parse_of_sample_logs_matches_serial(monkeypatch, engine):
+    # The sample logs pair statement and duration entries logged separately,
+    # which small ranges split apart
+    monkeypatch.setattr(parser, "_MIN_CHUNK_BYTES", 512)
+    for log_file in sorted(Path("docs/sample_logs/postgresql").glob("*.log.txt")):
+        serial = parser.parse_postgres_log(str(log_file), engine=engine)
+        parallel = parser.parse_postgres_log(str(log_file), engine=engine, workers=2)
+        assert parallel["query"].tolist() == serial["query"].tolist()
+        assert parallel["duration_ms"].tolist() == serial["duration_ms"].tolist()
+
+
+def _write_interleaved_log(path, backends, statements):
+    # log_statement=all with log_duration: each backend's duration arrives
+    # after other backends' entries, some with extended-protocol parameters
+    rng = random.Random(7)
+    running = set()
+    lines = []
+    for i in range(statements):
+        pid = 1000 + rng.randrange(backends)
+        timestamp = f"{10 + i // 3600:02d}:{i // 60 % 60:02d}:{i % 60:02d}"
+        prefix = f"2025-10-28 {timestamp}.000 UTC [{pid}] "
+        if pid in running:
+            running.discard(pid)
+            lines.append(f"{prefix}LOG:  duration: {rng.randrange(1, 5000)}.0 ms\n")
+        elif rng.random() < 0.2:
+            lines.append(
+                f"{prefix}LOG:  duration: {rng.randrange(1, 5000)}.5 ms  "
+                f"execute <unnamed>: UPDATE t SET x = $1 WHERE id = {i}\n"
+            )
+            lines.append(f"{prefix}DETAIL:  parameters: $1 = '{i}'\n")
+        elif rng.random() < 0.5:
+            running.add(pid)
+            lines.append(f"{prefix}LOG:  statement: SELECT *\n\tFROM t{i % 7}\n")
+        else:
+            running.add(pid)
+            lines.append(f"{prefix}LOG:  execute S_{i % 5}: SELECT $1 + {i}\n")
+            lines.append(f"{prefix}DETAIL:  parameters: $1 = '{i}'\n")
+        if i % 97 == 0:
+            lines.append(f"{prefix}LOG:  checkpoint starting: time\n")
+    path.write_text("".join(lines))
+
+
+@pytest.mark.parametrize("engine", ["stream", "mmap"])
+def test_parallel_parse_joins_pairs_split_across_ranges(tmp_path, monkeypatch, engine):
+    log_file = tmp_path / "interleaved.log"
+    _write_interleaved_log(log_file, backends=40, statements=20_000)
+    serial = parser.parse_postgres_log(str(log_file), engine=engine)
+    assert serial["parameters"].notna().sum() > 1000
+
+    def no_serial_parse(*args, **kwargs):
+        raise AssertionError("parsed serially")
+
+    monkeypatch.setattr(parser, "_MIN_CHUNK_BYTES", 16 * 1024)
+    monkeypatch.setattr(parser, "_parse_plain_serial", no_serial_parse)
+    for min_duration in (0, 2500):
+        expected = serial[serial["duration_ms"] >= min_duration].reset_index(drop=True)
+        parallel = parser.parse_postgres_log(
+            str(log_file), engine=engine, workers=4, min_duration=min_duration
+        )
+        pd.testing.assert_frame_equal(parallel, expected)
+
+
+def test_mmap_engine_matches_stream(tmp_path):
+    log_file = tmp_path / "big.log"
+    _write_many_entries(log_file, 30)
+
+    stream = list(parser._iter_plain_file_entries(str(log_file)))
+    scanned = list(parser.iter_plain_log_entries_mmap(str(log_file)))
+    assert scanned == stream
+
+    slow = list(
+        parser.iter_plain_log_entries_mmap(
+            str(log_file), parser.LogFilter(min_duration=25)
+        )
+    )
+    assert [e.duration_ms for e in slow] == [d + 0.5 for d in range(25, 31)]
+
+
+def test_mmap_engine_leaves_rejected_entries_undecoded(tmp_path, monkeypatch):
+    log_file = tmp_path / "big.log"
+    _write_many_entries(log_file, 30)
+    correlated = []
+    correlate = parser._correlate_mmap_entry
+
+    def counting_correlate(mm, start, *args):
+        correlated.append(start.group("timestamp"))
+        return correlate(mm, start, *args)
+
+    monkeypatch.setattr(parser, "_correlate_mmap_entry", counting_correlate)
+    slow = list(
+        parser.iter_plain_log_entries_mmap(
+            str(log_file), parser.LogFilter(min_duration=25)
+        )
+    )
+    assert len(slow) == 6
+    # Only the 30 "LOG:  x" entries, none of the combined duration entries
+    assert len(correlated) == 30
+    assert all(timestamp.endswith(b".500") for timestamp in correlated)
+
+
+def test_mmap_byte_ranges_parse_each_entry_once(tmp_path):
+    log_file = tmp_path / "big.log"
+    _write_many_entries(log_file, 20)
+    ranges = parser._plan_byte_ranges(log_file.stat().st_size, 2, min_chunk_bytes=50)
+    chunked = parser._join_range_columns(
+        parser._parse_plain_range((str(log_file), start, end, "mmap", None, None))
+        for start, end in ranges
+    )
+    serial = parser._iter_plain_file_entries(str(log_file))
+    assert chunked == parser._collect_columns(serial)
+
+
+def test_filters_are_applied_while_parsing(tmp_path):
+    log_content = (
+        "2025-10-28 10:00:00.000 UTC [1]: user=app,db=orders LOG:  "
+        "duration: 50.0 ms  statement: SELECT 1\n"
+        "2025-10-28 10:30:00.000 UTC [2]: user=app,db=orders LOG:  "
+        "duration: 2000.0 ms  statement: SELECT 2\n"
+        "2025-10-28 11:00:00.000 UTC [3]: user=etl,db=orders LOG:  "
+        "duration: 3000.0 ms  statement: SELECT 3\n"
+        "2025-10-28 11:30:00.000 UTC [4]: user=app,db=billing LOG:  "
+        "duration: 4000.0 ms  statement: SELECT 4\n"
+    )
+    log_file = tmp_path / "filtered.log"
+    log_file.write_text(log_content)
+
+    for engine in parser.PARSE_ENGINES:
+        df = parser.parse_postgres_log(str(log_file), engine=engine, min_duration=1000)
+        assert df["query"].tolist() == ["SELECT 2", "SELECT 3", "SELECT 4"]
+
+        df = parser.parse_postgres_log(
+            str(log_file),
+            engine=engine,
+            since="2025-10-28 10:30",
+            until="2025-10-28 11:30",
+        )
+        assert df["query"].tolist() == ["SELECT 2", "SELECT 3"]
+
+        df = parser.parse_postgres_log(
+            str(log_file), engine=engine, databases=["orders"], users=["app"]
+        )
+        assert df["query"].tolist() == ["SELECT 1", "SELECT 2"]
+
+
+def test_entry_columns_convert_in_one_pass():
+    columns = parser._EntryColumns(
+        timestamps=["2025-10-28 10:15:30.123", "garbage", "2025-10-28 10:15:31"],
+        durations=[1.5, 2.0, 3.0],
+        queries=["SELECT 1", "SELECT 2", "SELECT 3"],
+    )
+    df = columns.to_frame()
+    assert df["query"].tolist() == ["SELECT 1", "SELECT 3"]
+    assert str(df["timestamp"].dtype).startswith("datetime64")
+    assert df["duration_ms"].dtype == "float64"
+    assert df["timestamp"].iloc[0].microsecond == 123000
+
+
+def _write_entries_at(path, entries):
+    path.write_text(
+        "".join(
+            f"2025-10-28 {ts} UTC [1]: LOG:  duration: 10.0 ms  statement: {query}\n"
+            for ts, query in entries
+        )
+    )
+
+
+def test_multiple_files_are_merged_by_timestamp(tmp_path):
+    replica_a = tmp_path / "a" / "postgresql-10.log"
+    replica_b = tmp_path / "b" / "postgresql-10.log"
+    replica_a.parent.mkdir()
+    replica_b.parent.mkdir()
+    _write_entries_at(replica_a, [("10:00:01", "SELECT 1"), ("10:00:05", "SELECT 3")])
+    _write_entries_at(replica_b, [("10:00:02", "SELECT 2"), ("10:00:09", "SELECT 4")])
+    (tmp_path / "b" / "empty.log").write_text("no slow queries here\n")
+
+    paths = parser.expand_log_paths([str(tmp_path / "*" / "*.log")])
+    assert len(paths) == 3
+    assert parser.expand_log_paths([str(tmp_path / "a"), str(replica_a)]) == [
+        str(replica_a)
+    ]
+
+    df = parser.parse_postgres_logs(paths, workers=2)
+    assert df["query"].tolist() == ["SELECT 1", "SELECT 2", "SELECT 3", "SELECT 4"]
+    assert df["log_file"].tolist() == [
+        str(replica_a),
+        str(replica_b),
+        str(replica_a),
+        str(replica_b),
+    ]
+
+    with pytest.raises(FileNotFoundError):
+        parser.expand_log_paths([str(tmp_path / "*.csv")])
+
+
+def test_csvlog_parsing(tmp_path):
+    def row(ts, user, db, message, extra=""):
+        return (
+            f'2025-10-28 {ts} UTC,"{user}","{db}",4242,"10.0.0.1:5432",'
+            f'6720f1a2.1092,3,"SELECT",2025-10-28 09:00:00 UTC,3/17,0,LOG,00000,'
+            f'"{message}",,,,,,,,,"psql"{extra}\n'
+        )
+
+    log_file = tmp_path / "postgresql.csv"
+    log_file.write_text(
+        row("10:00:01.100", "app", "orders", "connection authorized: user=app")
+        + row(
+            "10:00:02.200",
+            "app",
+            "orders",
+            'duration: 1500.5 ms  statement: SELECT ""id""\nFROM orders',
+        )
+        + row("10:00:03.300", "etl", "stats", "duration: 20.0 ms")
+        + row(
+            "10:00:04.400",
+            "etl",
+            "stats",
+            "duration: 250.0 ms  execute S_1: DELETE FROM t",
+            extra=',"client backend",,-1234',
+        )
+    )
+
+    df = parser.parse_postgres_log(str(log_file), log_format="csvlog")
+    assert df["query"].tolist() == ['SELECT "id"\nFROM orders', "DELETE FROM t"]
+    assert df["duration_ms"].tolist() == [1500.5, 250.0]
+    assert df["user"].tolist() == ["app", "etl"]
+    assert df["session_id"].iloc[0] == "6720f1a2.1092"
+    assert df["application_name"].iloc[1] == "psql"
+    assert df["timestamp"].iloc[0].microsecond == 200000
+
+    df = parser.parse_postgres_log(
+        str(log_file), log_format="csvlog", databases=["stats"], min_duration=100
+    )
+    assert df["query"].tolist() == ["DELETE FROM t"]
+
+
+def test_malformed_csvlog_rows_are_counted(tmp_path):
+    good = (
+        '2025-10-28 10:00:02.200 UTC,"app","orders",4242,"10.0.0.1:5432",'
+        '6720f1a2.1092,3,"SELECT",2025-10-28 09:00:00 UTC,3/17,0,LOG,00000,'
+        '"duration: 1500.5 ms  statement: SELECT 1",,,,,,,,,"psql"\n'
+    )
+    log_file = tmp_path / "postgresql.csv"
+    log_file.write_text(
+        good
+        + "garbage that is not a csvlog row\n"
+        + '"duration: 2.0 ms  statement: SELECT 2",,,\n'
+        + good.replace("SELECT 1", "SELECT 3")
+    )
+
+    df = parser.parse_postgres_log(str(log_file), log_format="csvlog")
+    assert df["query"].tolist() == ["SELECT 1", "SELECT 3"]
+    assert df.attrs["parse_errors"] == {"malformed": 2}
+
+
+def test_jsonlog_parsing(tmp_path):
+    import json
+
+    records = [
+        {
+            "timestamp": "2025-10-28 10:00:01.100 UTC",
+            "user": "app",
+            "dbname": "orders",
+            "message": "connection authorized: user=app",
+        },
+        {
+            "timestamp": "2025-10-28 10:00:02.200 UTC",
+            "user": "app",
+            "dbname": "orders",
+            "session_id": "6720f1a2.1092",
+            "message": "duration: 1500.5 ms  statement: SELECT *\nFROM orders",
+            "application_name": "psql",
+            "backend_type": "client backend",
+            "query_id": -1234,
+        },
+        {
+            "timestamp": "2025-10-28 10:00:03.300 UTC",
+            "user": "etl",
+            "dbname": "stats",
+            "message": "duration: 250.0 ms  execute S_1: DELETE FROM t",
+        },
+    ]
+    log_file = tmp_path / "postgresql.json"
+    log_file.write_text(
+        "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records)
+        + '{"message":"duration: broken\n'
+    )
+
+    df = parser.parse_postgres_log(str(log_file), log_format="jsonlog")
+    assert df["query"].tolist() == ["SELECT *\nFROM orders", "DELETE FROM t"]
+    assert df["duration_ms"].tolist() == [1500.5, 250.0]
+    assert df["database"].tolist() == ["orders", "stats"]
+    assert df["backend_type"].iloc[0] == "client backend"
+    assert df["query_id"].iloc[0] == -1234
+    assert df["query_id"].isna().iloc[1]
+
+    df = parser.parse_postgres_log(str(log_file), log_format="jsonlog", users=["etl"])
+    assert df["query"].tolist() == ["DELETE FROM t"]
+
+
+def test_separate_statement_and_duration_lines_are_joined_by_pid(tmp_path):
+    log_file = tmp_path / "postgresql.log"
+    log_file.write_text(
+        "2025-10-28 10:00:00.000 EDT [101] LOG:  statement: SELECT *\n"
+        "\tFROM orders\n"
+        "2025-10-28 10:00:00.100 EDT [202] LOG:  execute S_1: "
+        "SELECT * FROM t WHERE id = $1\n"
+        "2025-10-28 10:00:00.100 EDT [202] DETAIL:  parameters: $1 = '42'\n"
+        "2025-10-28 10:00:00.500 EDT [303] LOG:  duration: 9.0 ms\n"
+        "2025-10-28 10:00:01.000 EDT [202] LOG:  duration: 900.0 ms\n"
+        "2025-10-28 10:00:02.000 EDT [101] LOG:  duration: 1500.0 ms\n"
+        "2025-10-28 10:00:03.000 EDT [404] LOG:  duration: 700.0 ms  "
+        "execute <unnamed>: UPDATE t SET x = $1\n"
+        "2025-10-28 10:00:03.000 EDT [404] DETAIL:  parameters: $1 = 'a\n"
+        "b'\n"
+        "2025-10-28 10:00:04.000 EDT [404] LOG:  duration: 1.0 ms\n"
+    )
+
+    for engine in parser.PARSE_ENGINES:
+        df = parser.parse_postgres_log(str(log_file), engine=engine)
+        assert df["query"].tolist() == [
+            "SELECT * FROM t WHERE id = $1",
+            "SELECT *\n\tFROM orders",
+            "UPDATE t SET x = $1",
+        ]
+        assert df["duration_ms"].tolist() == [900.0, 1500.0, 700.0]
+        assert df["timestamp"].dt.second.tolist() == [1, 2, 3]
+        assert df["parameters"].tolist() == ["$1 = '42'", None, "$1 = 'a\nb'"]
+
+        df = parser.parse_postgres_log(str(log_file), engine=engine, min_duration=1000)
+        assert df["query"].tolist() == ["SELECT *\n\tFROM orders"]
+
+        df = parser.parse_postgres_log(
+            str(log_file), engine=engine, log_line_prefix="%m [%p] "
+        )
+        assert df["pid"].tolist() == [202, 101, 404]
+        assert df["parameters"].notna().tolist() == [True, False, True]
+
+
+def test_damaged_entries_are_counted_and_skipped(tmp_path, caplog):
+    log_file = tmp_path / "postgresql.log"
+    log_file.write_bytes(
+        b"2025-10-28 10:00:00.000 UTC [101] LOG:  duration: 10.0 ms  "
+        b"statement: SELECT 1\n"
+        + b"".join(
+            b"2025-10-28 10:00:01.000 UTC [102] LOG:  duration: 1.2.%d ms  "
+            b"statement: SELECT 2\n" % i
+            for i in range(50)
+        )
+        + b"2025-10-28 10:00:02.000 UTC [103] LOG:  duration: 20.0 ms  "
+        b"statement: SELECT 'caf\xe9'\n"
+        b"2025-10-28 10:00:03.000 UTC [104] LOG:  duration: 30.0 ms  "
+        b"statement: SELECT 3\n\tFROM t" + b"\x00" * 4096 + b"\n" + b"\x00" * 100
+        # Written after the crash, with no line break before it
+        + b"2025-10-28 10:05:00.000 UTC [105] LOG:  duration: 40.0 ms  "
+        b"statement: SELECT 4\n"
+    )
+
+    for engine in parser.PARSE_ENGINES:
+        caplog.clear()
+        df = parser.parse_postgres_log(str(log_file), engine=engine)
+        assert df["query"].tolist() == [
+            "SELECT 1",
+            "SELECT 'caf'",
+            "SELECT 3\n\tFROM t",
+            "SELECT 4",
+        ]
+        assert df.attrs["parse_errors"] == {
+            "bad_duration": 50,
+            "truncated": 1,
+            "encoding": 1,
+        }
+        # A few examples and running counts, not one warning per entry
+        assert len(caplog.records) < 10
+
+    _, summary = run_slow_query_analysis(df)
+    assert summary["parse_errors"] == 52
+    assert summary["parse_errors_truncated"] == 1
+
+
+def test_csv_and_json_exports_are_parsed_into_columns(tmp_path):
+    csv_file = tmp_path / "slow.csv"
+    csv_file.write_text(
+        "timestamp,duration_ms,query,user\n"
+        "2025-10-28 10:00:00,120.5,SELECT 1,app\n"
+        "2025-10-28 10:00:01,oops,SELECT 2,app\n"
+        "2025-10-28 10:00:02,80,SELECT 3,batch\n"
+        "2025-10-28 10:00:03,5,SELECT 4,app\n"
+    )
+    json_file = tmp_path / "slow.json"
+    json_file.write_text(
+        '{"timestamp": "2025-10-28T10:00:00Z", "duration_ms": 120.5, '
+        '"query": "SELECT 1", "user": "app"}\n'
+        "not json\n"
+        '{"timestamp": "2025-10-28T10:00:02Z", "duration_ms": "80", '
+        '"query": "SELECT 3", "user": "batch", "plan_id": 7}\n'
+        '{"timestamp": "2025-10-28T10:00:03Z", "duration_ms": 5, '
+        '"query": "SELECT 4", "user": "app"}\n'
+    )
+    for log_file, log_format in ((csv_file, "csv"), (json_file, "json")):
+        df = parser.parse_postgres_log(
+            str(log_file), log_format=log_format, min_duration=10
+        )
+        assert df["query"].tolist() == ["SELECT 1", "SELECT 3"]
+        assert df["duration_ms"].tolist() == [120.5, 80.0]
+        assert df["user"].tolist() == ["app", "batch"]
+        assert df["timestamp"].dt.second.tolist() == [0, 2]
+
+        only_app = parser.parse_postgres_log(
+            str(log_file), log_format=log_format, users=["app"]
+        )
+        assert only_app["query"].tolist() == ["SELECT 1", "SELECT 4"]
+
+    json_df = parser.parse_postgres_log(str(json_file), log_format="json")
+    assert json_df["plan_id"].isna().tolist() == [True, False, True]
+    assert json_df.attrs["parse_errors"] == {"malformed": 1}
@@ -0,0 +1,63 @@
+import io
+
+from iqtoolkit_analyzer import parser
+from iqtoolkit_analyzer.progress import (
+    NullProgress,
+    ThrottledProgress,
+    default_progress,
+)
+
+
+class RecordingProgress(NullProgress):
+    def __init__(self):
+        self.updates = []
+        self.finished = False
+
+    def update(self, bytes_read, entries):
+        self.updates.append((bytes_read, entries))
+
+    def finish(self):
+        self.finished = True
+
+
+def test_throttled_progress_reports_rates():
+    stream = io.StringIO()
+    progress = ThrottledProgress(stream=stream, interval=0.0)
+    progress.start("Parsing test.log", total_bytes=2 * 1_048_576)
+    progress.update(1_048_576, 1000)
+    progress.finish()
+
+    output = stream.getvalue()
+    assert "Parsing test.log" in output
+    assert "50.0%" in output
+    assert "MB/s" in output
+    assert "1,000 entries" in output
+    assert output.endswith("\n")
+
+
+def test_throttled_progress_skips_updates_inside_interval():
+    stream = io.StringIO()
+    progress = ThrottledProgress(stream=stream, interval=3600)
+    progress.start("Parsing test.log")
+    for i in range(1000):
+        progress.update(i, i)
+    assert stream.getvalue() == ""
+
+
+def test_default_progress_is_silent_when_quiet():
+    assert type(default_progress(quiet=True)) is NullProgress
+
+
+def test_parser_reports_progress_per_block(tmp_path):
+    log_file = tmp_path / "test.log"
+    log_file.write_text(
+        "2025-10-28 10:15:30.123 UTC [1]: LOG:  duration: 5.0 ms  "
+        "statement: SELECT 1\n" * 10
+    )
+    progress = RecordingProgress()
+    df = parser.parse_postgres_log(str(log_file), progress=progress)
+
+    assert len(df) == 10
+    # One update for the single block; the last entry completes only at EOF
+    assert progress.updates == [(log_file.stat().st_size, 9)]
+    assert progress.finished
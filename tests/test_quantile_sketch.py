@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from iqtoolkit_analyzer.quantile_sketch import DurationSketch, grouped_quantiles
+
+
+def test_quantiles_are_within_the_relative_accuracy():
+    values = np.random.default_rng(7).lognormal(3.0, 1.5, 20_000)
+    sketch = DurationSketch()
+    for value in values:
+        sketch.add(float(value))
+    for q in (0.5, 0.9, 0.95, 0.99):
+        expected = float(np.quantile(values, q, method="inverted_cdf"))
+        assert sketch.quantile(q) == pytest.approx(expected, rel=0.01)
+    assert len(sketch) < 1000
+
+
+def test_merged_sketches_equal_one_sketch():
+    whole, left, right = DurationSketch(), DurationSketch(), DurationSketch()
+    for i in range(1, 1001):
+        whole.add(i / 10, weight=2.0)
+        (left if i % 2 else right).add(i / 10, weight=2.0)
+    left.merge(right)
+    assert left.count == whole.count == 2000
+    assert left.buckets == whole.buckets
+    assert left.quantile(0.99) == whole.quantile(0.99)
+
+
+def test_zero_durations_and_empty_sketch():
+    sketch = DurationSketch()
+    assert sketch.quantile(0.5) is None
+    sketch.add(0.0)
+    sketch.add(0.0)
+    sketch.add(50.0)
+    assert sketch.quantile(0.5) == 0.0
+    assert sketch.quantile(1.0) == pytest.approx(50.0, rel=0.01)
+    with pytest.raises(ValueError):
+        sketch.merge(DurationSketch(accuracy=0.05))
+
+
+def test_single_entry_group_reports_its_duration():
+    sketch = DurationSketch()
+    sketch.add(1500.0)
+    assert sketch.quantile(0.5) == sketch.quantile(0.99) == 1500.0
+
+    result = grouped_quantiles(
+        np.array([0, 1, 1]), np.array([1500.0, 10.0, 20.0]), None, [0.5, 0.99]
+    )
+    assert result[0].tolist() == [1500.0, 1500.0]
+    assert 10.0 <= result[1, 0] <= result[1, 1] <= 20.0
+
+
+def test_add_many_and_grouped_quantiles_match_per_group_sketches():
+    rng = np.random.default_rng(3)
+    groups = rng.integers(0, 5, 2_000)
+    durations = np.concatenate([rng.exponential(80.0, 1_990), np.zeros(10)])
+    weights = rng.choice([1.0, 4.0], 2_000)
+    quantiles = [0.0, 0.5, 0.9, 0.99, 1.0]
+
+    result = grouped_quantiles(groups, durations, weights, quantiles)
+    assert result.shape == (5, len(quantiles))
+    for code in range(5):
+        rows = groups == code
+        one_by_one, at_once = DurationSketch(), DurationSketch()
+        for duration, weight in zip(durations[rows], weights[rows]):
+            one_by_one.add(float(duration), float(weight))
+        at_once.add_many(durations[rows], weights[rows])
+        assert at_once.buckets == pytest.approx(one_by_one.buckets)
+        assert at_once.zero_count == one_by_one.zero_count
+        assert result[code].tolist() == [one_by_one.quantile(q) for q in quantiles]
@@ -0,0 +1,92 @@
+import pytest
+
+from iqtoolkit_analyzer import parser
+from iqtoolkit_analyzer.analyzer import run_slow_query_analysis
+from iqtoolkit_analyzer.sampling import Reservoir, SamplePlan, sample_frame
+
+
+def test_reservoir_keeps_a_uniform_sample():
+    hits = [0] * 100
+    for seed in range(400):
+        reservoir = Reservoir(10, SamplePlan(10, seed=seed).rng())
+        for item in range(100):
+            reservoir.offer(item)
+        assert len(set(reservoir.items)) == 10
+        assert reservoir.weight == 10.0
+        for item in reservoir.items:
+            hits[item] += 1
+    # Each item is kept with probability 0.1: 40 of 400 runs on average
+    assert min(hits) > 15 and max(hits) < 70
+
+
+def test_merged_reservoirs_keep_a_uniform_sample():
+    hits = [0] * 100
+    for seed in range(400):
+        plan = SamplePlan(10, seed=seed)
+        first, second = Reservoir(10, plan.rng(0)), Reservoir(10, plan.rng(1))
+        # Uneven parts: the merge must weight them by the items each saw
+        for item in range(80):
+            first.offer(item)
+        for item in range(80, 100):
+            second.offer(item)
+        first.merge(second)
+        assert len(set(first.items)) == 10
+        assert first.weight == 10.0
+        for item in first.items:
+            hits[item] += 1
+    assert min(hits) > 15 and max(hits) < 70
+    assert sum(hits[80:]) == pytest.approx(800, rel=0.25)
+
+
+def test_parallel_sampled_parse_keeps_the_sample_size(sampling_log, monkeypatch):
+    log_file, _ = sampling_log
+    monkeypatch.setattr(parser, "_MIN_CHUNK_BYTES", 16 * 1024)
+    plan = SamplePlan(size=300, keep_above=1000.0, seed=3)
+    for engine in parser.PARSE_ENGINES:
+        df = parser.parse_postgres_log(
+            str(log_file), engine=engine, sample=plan, workers=2
+        )
+        assert len(df) == 305
+        assert df["sample_weight"].sum() == pytest.approx(3005)
+        assert set(df["sample_weight"]) == {1.0, 10.0}
+
+
+def test_sampled_parse_keeps_slow_entries_and_estimates_totals(sampling_log):
+    log_file, total_time = sampling_log
+    plan = SamplePlan(size=300, keep_above=1000.0, seed=3)
+
+    for engine in parser.PARSE_ENGINES:
+        df = parser.parse_postgres_log(str(log_file), engine=engine, sample=plan)
+        assert len(df) == 305
+        assert df["timestamp"].is_monotonic_increasing
+        assert (df["duration_ms"] == 5000.0).sum() == 5
+        assert df["sample_weight"].sum() == pytest.approx(3005)
+
+    top, summary = run_slow_query_analysis(df, top_n=0)
+    assert summary["total_queries"] == pytest.approx(3005)
+    assert summary["sampled_entries"] == 305
+    assert (
+        summary["total_time_spent_ci_low"]
+        <= total_time
+        <= summary["total_time_spent_ci_high"]
+    )
+    groups = top.set_index("example_query")
+    sleep = groups.loc["SELECT pg_sleep(5)"]
+    assert sleep["frequency"] == 5
+    assert sleep["frequency_ci_low"] == sleep["frequency_ci_high"] == 5
+    orders = groups.loc["SELECT * FROM orders WHERE id = 1"]
+    assert orders["frequency_ci_low"] <= 2000 <= orders["frequency_ci_high"]
+
+
+def test_sample_frame_weights_fast_rows():
+    df = parser.pd.DataFrame(
+        {
+            "timestamp": parser.pd.date_range("2025-10-28", periods=100, freq="s"),
+            "duration_ms": [2000.0] * 10 + [10.0] * 90,
+            "query": ["SELECT 1"] * 100,
+        }
+    )
+    sampled = sample_frame(df, SamplePlan(size=30, keep_above=1000.0, seed=1))
+    assert len(sampled) == 40
+    assert sampled["sample_weight"].sum() == pytest.approx(100)
+    assert sampled["timestamp"].is_monotonic_increasing
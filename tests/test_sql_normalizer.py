@@ -0,0 +1,97 @@
+import pandas as pd
+import pytest
+
+from iqtoolkit_analyzer.analyzer import normalize_query, run_slow_query_analysis
+from iqtoolkit_analyzer.sql_normalizer import fingerprint_query
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        (
+            "SELECT * FROM t WHERE id IN (1, -2,3) -- x",
+            "select * from t where id in (?)",
+        ),
+        ("select * from t where id in ($1, $2)", "select * from t where id in (?)"),
+        ("SELECT 'it''s', E'a\\'b', x FROM t;", "select ?, ?, x from t"),
+        ("select $f$ 'x'; $$ $f$, $$a$$, a$1 from t", "select ?, ?, a$1 from t"),
+        ("select b'101', x'ff', U&'d\\0061t', u & '5'", "select ?, ?, ?, u & ?"),
+        (
+            "select 3.14, 1e-5, .5, 0xFF, t1.c2 from t1 /* a\n'b' */ where x=-1",
+            "select ?, ?, ?, ?, t1.c2 from t1 where x = ?",
+        ),
+        ("select a-1, a - 1, (-4), array[-1,2]", "select a - ?, a - ?, (?), array[?]"),
+        (
+            "SELECT data->>'k' FROM t WHERE data @> '{}' AND x<>-1",
+            "select data ->> ? from t where data @> ? and x <> ?",
+        ),
+        (
+            "select * from t where (a,b) in ((1, 'a'), (2, 'b'))",
+            "select * from t where (a, b) in (?)",
+        ),
+        (
+            "select count(*) from t where k in ( select id from u )",
+            "select count(*) from t where k in (select id from u)",
+        ),
+        ('SELECT "a--b", c FROM t WHERE x = 1', 'select "a--b", c from t where x = ?'),
+        (
+            'SELECT "col/*", c FROM t WHERE x = 1',
+            'select "col/*", c from t where x = ?',
+        ),
+        (
+            "SELECT \"it's\" FROM t WHERE x = 'a' AND y = 2",
+            'select "it\'s" from t where x = ? and y = ?',
+        ),
+        (
+            'SELECT "Weird 123", "a""B"  FROM  "T" WHERE x=1',
+            'select "Weird 123", "a""B" from "T" where x = ?',
+        ),
+        ("select N'abc', n'it''s', fn from t", "select ?, ?, fn from t"),
+        (
+            "select * from t where id in (1, (2), 3) and k in (N'a', 'b')",
+            "select * from t where id in (?) and k in (?)",
+        ),
+        (
+            "INSERT INTO t (a, b) VALUES (1, 'x'), (2, 'y'),(3,'z')",
+            "insert into t (a, b) values (?, ?)",
+        ),
+        (
+            "insert into t values (1, now()), (2, now())",
+            "insert into t values (?, now())",
+        ),
+        (
+            "insert into t values (1, 2), (3, 'a', 4)",
+            "insert into t values (?, ?), (?, ?, ?)",
+        ),
+    ],
+)
+def test_fingerprint_query(query, expected):
+    assert fingerprint_query(query) == expected
+
+
+def test_legacy_mode_keeps_the_original_grouping():
+    query = "SELECT * FROM t WHERE name = 'O''Reilly' AND id IN (1, 2)"
+    assert normalize_query(query, "legacy") == (
+        "select * from t where name = '?''?' and id in (?)"
+    )
+    with pytest.raises(ValueError):
+        normalize_query(query, "nonsense")
+
+
+def test_fingerprint_merges_groups_legacy_splits():
+    df = pd.DataFrame(
+        {
+            "timestamp": ["2025-10-28 10:00:00"] * 3,
+            "duration_ms": [100.0, 200.0, 300.0],
+            "query": [
+                "SELECT * FROM t WHERE x = -1.5",
+                "select * from t where x=2 -- retry",
+                "SELECT * FROM t WHERE x = E'a\\'b'",
+            ],
+        }
+    )
+    top, summary = run_slow_query_analysis(df, top_n=0)
+    assert summary["unique_queries"] == 1
+    assert top.iloc[0]["frequency"] == 3
+    _, legacy = run_slow_query_analysis(df, top_n=0, normalize_mode="legacy")
+    assert legacy["unique_queries"] == 3
@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+
+from iqtoolkit_analyzer import parser, time_seek
+
+
+def _write_ordered_log(path, entries=2000):
+    start = datetime(2025, 10, 28, 8, 0, 0)
+    with open(path, "w") as f:
+        for i in range(entries):
+            ts = (start + timedelta(seconds=3 * i)).strftime("%Y-%m-%d %H:%M:%S")
+            f.write(
+                f"{ts}.000 UTC [{i % 7}] LOG:  duration: {i}.0 ms  "
+                f"statement: SELECT {i}\n\tFROM t\n"
+                f"{ts}.500 UTC [{i % 7}] LOG:  connection authorized\n"
+            )
+
+
+def test_time_window_parses_only_its_byte_range(tmp_path, monkeypatch):
+    log_file = tmp_path / "postgresql.log"
+    _write_ordered_log(log_file)
+    monkeypatch.setattr(time_seek, "_PROBE_BYTES", 512)
+    window = {"since": "2025-10-28 08:30:00", "until": "2025-10-28 09:00:00"}
+
+    start, end = time_seek.seek_time_window(
+        str(log_file), window["since"], window["until"], parser.DEFAULT_LINE_PREFIX
+    )
+    assert 0 < start < end < log_file.stat().st_size
+    assert end - start < log_file.stat().st_size / 2
+
+    df = parser.parse_postgres_log(str(log_file), **window)
+    assert df["query"].iloc[0] == "SELECT 600\n\tFROM t"
+    assert df["query"].iloc[-1] == "SELECT 1199\n\tFROM t"
+    assert len(df) == 600
+
+    for engine in parser.PARSE_ENGINES:
+        indexed = parser.parse_postgres_log(
+            str(log_file), engine=engine, time_index=True, **window
+        )
+        assert indexed["query"].tolist() == df["query"].tolist()
+    index = time_seek.TimeIndex.load(str(log_file) + time_seek.TIME_INDEX_SUFFIX)
+    assert index is not None
+    assert index.minutes[:2] == ["2025-10-28 08:00", "2025-10-28 08:01"]
+    first_of_minute = log_file.read_bytes().index(b"2025-10-28 08:30:00.000")
+    assert index.bracket("2025-10-28 08:30:10")[0] == first_of_minute